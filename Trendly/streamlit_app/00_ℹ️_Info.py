@@ -1,14 +1,21 @@
+from time import perf_counter
+_page_started = perf_counter()
+
 import streamlit as st
 from datetime import datetime, time
 from modules.helper import (
     fetch_sp_tickers, 
-    fetch_stock_history, 
-    generate_investment_analysis,
     get_smart_investment_recommendation
 )
+from modules.analysis_cache import load_analysis_data, cached_investment_analysis
+from modules.scheduler import load_latest_snapshot, is_current
+from modules.tracing import aggregate_spans, format_span_table, tracing_enabled
+from modules.lazy_imports import start_warm_up, record_startup, import_report
 import pandas as pd
 import plotly.graph_objects as go
 
+record_startup("Info page: imports", _page_started)
+
 st.set_page_config(
     page_title="Trendly - AI Stock Analysis", 
     page_icon="📈",
@@ -626,31 +633,44 @@ with left_col:
 with right_col:
     # Smart Investment Recommendation Display
     if st.session_state.get('show_recommendation', False):
-        st.markdown("""
+        # Precomputed by the after-close scheduler (python -m modules.scheduler)
+        snapshot = load_latest_snapshot()
+        
+        if snapshot is not None:
+            subtitle = f"Ranked {snapshot.get('universe_size', 'all')} S&P 500 stocks after the close on {snapshot['session']}."
+        else:
+            subtitle = "Analyzing 450+ S&P 500 stocks to find the best opportunity... This may take a few minutes."
+        
+        st.markdown(f"""
         <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); padding: 30px; border-radius: 20px; margin-bottom: 30px; box-shadow: 0 10px 40px rgba(102, 126, 234, 0.3);'>
             <h2 style='color: white; text-align: center; margin-bottom: 15px; font-size: 32px;'>🎯 AI Investment Recommendation</h2>
-            <p style='color: rgba(255,255,255,0.9); text-align: center; font-size: 16px;'>Analyzing 450+ S&P 500 stocks to find the best opportunity... This may take a few minutes.</p>
+            <p style='color: rgba(255,255,255,0.9); text-align: center; font-size: 16px;'>{subtitle}</p>
         </div>
         """, unsafe_allow_html=True)
         
-        # Progress bar
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        def update_progress(current, total, ticker):
-            progress = current / total
-            progress_bar.progress(progress)
-            status_text.text(f"Analyzing {ticker}... ({current}/{total} stocks)")
-        
         try:
-            # Get recommendation - analyze ALL S&P 500 stocks
-            recommendation = get_smart_investment_recommendation(
-                top_stocks=None,  # This will analyze all 450+ S&P 500 stocks
-                progress_callback=update_progress
-            )
-            
-            progress_bar.empty()
-            status_text.empty()
+            if snapshot is not None:
+                recommendation = snapshot['recommendation']
+                if not is_current(snapshot):
+                    st.info(f"ℹ️ Showing the latest precomputed scan ({snapshot['session']}); today's scan is not ready yet.")
+            else:
+                # No precomputed scan yet: analyze ALL S&P 500 stocks now
+                progress_bar = st.progress(0)
+                status_text = st.empty()
+                
+                def update_progress(current, total, ticker):
+                    progress = current / total
+                    progress_bar.progress(progress)
+                    status_text.text(f"Analyzed {ticker} ({current}/{total} stocks)")
+                
+                recommendation = get_smart_investment_recommendation(
+                    top_stocks=None,  # This will analyze all 450+ S&P 500 stocks
+                    progress_callback=update_progress,
+                    profile='scan-lite'
+                )
+                
+                progress_bar.empty()
+                status_text.empty()
             
             if recommendation:
                 # Display recommended stock
@@ -713,6 +733,12 @@ with right_col:
                         for reason in stock_data['reasons']:
                             st.write(f"• {reason}")
                 
+                # Scan stage timings (only when the scan was traced)
+                if recommendation.get('trace'):
+                    with st.expander("⏱️ Scan Timing Breakdown", expanded=False):
+                        spans = pd.DataFrame(recommendation['trace']).set_index('span')
+                        st.dataframe(format_span_table(spans), use_container_width=True)
+                
                 # Analyze this stock button
                 st.markdown("<br>", unsafe_allow_html=True)
                 if st.button(f"📈 Analyze {ticker} in Detail", use_container_width=True):
@@ -732,8 +758,9 @@ with right_col:
                 st.error("❌ Could not generate recommendation. Please try again.")
                 
         except Exception as e:
-            progress_bar.empty()
-            status_text.empty()
+            if snapshot is None:
+                progress_bar.empty()
+                status_text.empty()
             st.error(f"❌ Error: {str(e)}")
             if st.button("Try Again"):
                 st.session_state['show_recommendation'] = False
@@ -742,7 +769,7 @@ with right_col:
     elif analyze_clicked:
         with st.spinner(f"🔄 Analyzing {ticker_symbol}..."):
             try:
-                stock_data = fetch_stock_history(ticker_symbol, period="2y")
+                stock_data, _ = load_analysis_data(ticker_symbol, period="2y")
                 
                 if stock_data.empty:
                     st.error("❌ No data available for this stock")
@@ -766,7 +793,9 @@ with right_col:
                     cutoff_date = datetime.now() - pd.Timedelta(days=days_back)
                     stock_data_filtered = stock_data[stock_data.index >= cutoff_date]
                     
-                    analysis = generate_investment_analysis(ticker_symbol, forecast_days)
+                    # Shares the cached history above: one fetch and one feature pass per
+                    # analysis, and reruns / other sessions reuse the finished result
+                    analysis = cached_investment_analysis(ticker_symbol, forecast_days)
                     score = analysis['investment_score']
                     
                     # Score card
@@ -1012,10 +1041,8 @@ with right_col:
                     ))
                     
                     if 'forecast' in analysis and len(analysis['forecast']) > 0:
-                        forecast_dates = pd.date_range(
-                            start=stock_data_filtered.index[-1] + pd.Timedelta(days=1),
-                            periods=len(analysis['forecast'])
-                        )
+                        # Forecast is indexed by the upcoming trading sessions
+                        forecast_dates = analysis['forecast'].index
                         
                         # Predicted price with enhanced styling
                         fig.add_trace(go.Scatter(
@@ -1149,6 +1176,12 @@ with right_col:
                 
                 st.markdown('</div>', unsafe_allow_html=True)
                 
+                # Per-stage timings (only when tracing is enabled, TRENDLY_TRACE=1)
+                if analysis.get('trace'):
+                    with st.expander("⏱️ Timing Breakdown", expanded=False):
+                        st.dataframe(format_span_table(aggregate_spans([analysis['trace']])),
+                                     use_container_width=True)
+                
                 # Key Takeaways Summary
                 st.markdown('<div class="section-title">🎯 Key Takeaways</div>', unsafe_allow_html=True)
                 
@@ -1285,3 +1318,13 @@ st.markdown("""
     </div>
 </div>
 """, unsafe_allow_html=True)
+
+record_startup("Info page: render", _page_started)
+
+# Import / startup timings of this server process (only when tracing is enabled, TRENDLY_TRACE=1)
+if tracing_enabled():
+    with st.expander("⏱️ Startup Import Times", expanded=False):
+        st.dataframe(import_report(), use_container_width=True)
+
+# The page is rendered: load the ML libraries in the background for the first analysis
+start_warm_up()
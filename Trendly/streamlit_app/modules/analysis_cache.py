@@ -0,0 +1,202 @@
+"""
+Layered caching for the Streamlit pages.
+
+Streamlit reruns the whole page script on every widget interaction, and every
+visitor's session runs its own copy. Two tiers keep repeat work out of reruns:
+
+1. An in-process LRU (TTLCache) for price histories, engineered features and
+   finished analyses. Keys are small (ticker, period, horizon) tuples, so lookups
+   never hash or pickle DataFrames the way st.cache_data arguments/results would.
+   Entries expire with the market: every 15 minutes while NYSE is trading, and at
+   the next session's open otherwise (daily bars do not change overnight).
+2. A cross-session st.cache_resource tier in front of the on-disk model registry,
+   holding fitted ensembles in memory for every session of the server process.
+"""
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+import pandas as pd
+import streamlit as st
+
+from modules.helper import fetch_stock_history, engineer_features, generate_investment_analysis
+from modules.model_registry import get_model_registry
+from modules.feature_store import current_feature_universe
+from modules.price_store import OHLCV_COLUMNS
+from modules.trading_calendar import (TRADING_DAY, MARKET_TIMEZONE, is_session, market_now,
+                                     session_open, session_settled)
+
+# How long price-derived results stay current while the market is trading
+INTRADAY_TTL = timedelta(minutes=15)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe LRU mapping whose entries may carry an absolute expiry time.
+
+    Args:
+        maxsize (int): Entries kept before the least recently used is dropped
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value, or default if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and market_now() >= expires_at:
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at=None):
+        """Store a value, evicting the least recently used entries beyond maxsize."""
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute, expires_at=None):
+        """
+        Return the cached value for key, or call compute() and cache its result.
+
+        Args:
+            key (tuple): Cheap, hashable key
+            compute (callable): Zero-argument function producing the value
+            expires_at (datetime, optional): When the computed value expires
+
+        Returns:
+            object: The cached or freshly computed value
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value, expires_at)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def cache_expiry(now=None):
+    """
+    When a result computed now from daily price data stops being current.
+
+    Args:
+        now (datetime, optional): Current time (default: now in New York)
+
+    Returns:
+        datetime: INTRADAY_TTL from now while the market is trading (until the close
+                  has settled), otherwise the next NYSE session's open
+    """
+    now = now.astimezone(MARKET_TIMEZONE) if now is not None else market_now()
+    today = pd.Timestamp(now.date())
+    trading_today = is_session(today)
+
+    market_open = session_open(today)
+    settled = session_settled(today)
+
+    if trading_today and market_open <= now < settled:
+        return min(now + INTRADAY_TTL, settled)
+
+    next_session = today if trading_today and now < market_open else today + TRADING_DAY
+    return session_open(next_session)
+
+
+# ========== Tier 1: in-process LRU ==========
+
+_history_cache = TTLCache(maxsize=64)
+_analysis_cache = TTLCache(maxsize=128)
+
+
+def load_analysis_data(stock_ticker, period="2y"):
+    """
+    Fetch a ticker's history and engineer its features, cached until cache_expiry().
+
+    When the scheduled scan's memory-mapped universe (modules.feature_store) is
+    current and covers the ticker, its frame is served without fetching or
+    engineering anything. The returned frames are shared between reruns and sessions: read them, don't
+    modify them in place.
+
+    Args:
+        stock_ticker (str): The stock ticker symbol
+        period (str): History period (default '2y', what the analysis uses)
+
+    Returns:
+        tuple: (stock_data, stock_data_enhanced)
+    """
+    def load():
+        universe = current_feature_universe()
+        if universe is not None and universe.period == period and stock_ticker in universe:
+            stock_data_enhanced = universe.frame(stock_ticker)
+            return stock_data_enhanced[OHLCV_COLUMNS], stock_data_enhanced
+
+        stock_data = fetch_stock_history(stock_ticker, period=period)
+        return stock_data, engineer_features(stock_data)
+
+    return _history_cache.get_or_compute((stock_ticker.upper(), period), load, cache_expiry())
+
+
+def cached_investment_analysis(stock_ticker, forecast_days=30):
+    """
+    generate_investment_analysis behind both cache tiers.
+
+    Args:
+        stock_ticker (str): The stock ticker symbol
+        forecast_days (int): Number of trading days to forecast
+
+    Returns:
+        dict: The (shared, read-only) analysis dict
+    """
+    use_shared_model_memory()
+
+    def analyze():
+        _, stock_data_enhanced = load_analysis_data(stock_ticker, "2y")
+        return generate_investment_analysis(
+            stock_ticker, forecast_days, stock_data_enhanced=stock_data_enhanced
+        )
+
+    return _analysis_cache.get_or_compute(
+        (stock_ticker.upper(), forecast_days), analyze, cache_expiry()
+    )
+
+
+def clear_caches():
+    """Drop every cached history and analysis (fitted models stay in the registry)."""
+    _history_cache.clear()
+    _analysis_cache.clear()
+
+
+# ========== Tier 2: cross-session fitted models ==========
+
+@st.cache_resource(show_spinner=False)
+def shared_model_memory(maxsize=64):
+    """
+    In-memory tier of fitted model artifacts shared by every session.
+
+    st.cache_resource returns the same object on every call instead of a pickled
+    copy, so fitted ensembles are handed out without serialisation.
+    """
+    return TTLCache(maxsize)
+
+
+def use_shared_model_memory():
+    """Put the shared in-memory tier in front of the process's on-disk model registry."""
+    registry = get_model_registry()
+    if registry.memory is None:
+        registry.memory = shared_model_memory()
+    return registry
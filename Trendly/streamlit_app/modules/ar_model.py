@@ -0,0 +1,230 @@
+"""
+Lean autoregressive (AR) model fitted by ordinary least squares.
+
+Drop-in replacement for the statsmodels AutoReg(y, lags=p).fit() calls in the
+analysis (constant trend, no exogenous variables). The lagged design matrix is a
+strided view over the series (sliding_window_view, no per-lag copies), the fit is
+a single least-squares solve, and predictions follow AutoReg's predict()
+semantics: one-step in-sample predictions, dynamic predictions from a chosen
+point, and recursive out-of-sample forecasts from the end of the training data.
+
+fit_ar_many fits many series at once with one batched QR solve per series length.
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def lagged_design(y, lags):
+    """
+    Targets and lag matrix for an AR(lags) regression, as views over y.
+
+    Args:
+        y (np.ndarray): 1-D series (or 2-D, one series per row)
+        lags (int): Number of lags
+
+    Returns:
+        tuple: (target, lag_matrix) where lag_matrix[..., t, i] = y[..., t + lags - 1 - i]
+               (column i is lag i + 1) and target[..., t] = y[..., t + lags]
+    """
+    windows = sliding_window_view(y, lags + 1, axis=-1)  # (..., n - lags, lags + 1)
+    return windows[..., -1], windows[..., -2::-1]
+
+
+def _with_constant(lag_matrix):
+    """Design matrix [1, y_{t-1}, ..., y_{t-p}], materialised once for the solver."""
+    design = np.empty(lag_matrix.shape[:-1] + (lag_matrix.shape[-1] + 1,))
+    design[..., 0] = 1.0
+    design[..., 1:] = lag_matrix
+    return design
+
+
+class ARModel:
+    """
+    Fitted AR(lags) model with a constant, y_t = c + phi_1 y_{t-1} + ... + phi_p y_{t-p}.
+
+    Args:
+        lags (int): Number of lags
+        params (np.ndarray): [c, phi_1, ..., phi_p]
+        data (pd.Series | np.ndarray): Training series
+    """
+
+    def __init__(self, lags, params, data):
+        self.lags = lags
+        self.params = np.asarray(params, dtype=float)
+        # Only date indexes carry labels; other series are labelled by position
+        self.index = data.index if isinstance(getattr(data, 'index', None), pd.DatetimeIndex) else None
+        self.endog = np.asarray(data, dtype=float)
+        self.nobs = len(self.endog)
+
+    @classmethod
+    def fit(cls, data, lags):
+        """
+        Fit by OLS with one least-squares solve.
+
+        Args:
+            data (pd.Series | np.ndarray): Training series
+            lags (int): Number of lags
+
+        Returns:
+            ARModel: The fitted model
+        """
+        y = np.asarray(data, dtype=float)
+        if len(y) <= lags:
+            raise ValueError(f"Need more than {lags} observations to fit AR({lags}).")
+        target, lag_matrix = lagged_design(y, lags)
+        params, *_ = np.linalg.lstsq(_with_constant(lag_matrix), target, rcond=None)
+        return cls(lags, params, data)
+
+    @property
+    def fittedvalues(self):
+        """One-step in-sample predictions for observations lags .. nobs - 1."""
+        _, lag_matrix = lagged_design(self.endog, self.lags)
+        return self.params[0] + lag_matrix @ self.params[1:]
+
+    # ========== Index handling ==========
+
+    def _position(self, label, default):
+        """Integer position of an int / date label; dates beyond the sample follow the index freq."""
+        if label is None:
+            return default
+        if isinstance(label, (int, np.integer)):
+            return int(label)
+        if self.index is None:
+            raise ValueError("Date labels need a series with a DatetimeIndex.")
+        label = pd.Timestamp(label)
+        if label <= self.index[-1]:
+            return self.index.get_loc(label)
+        if self.index.freq is None:
+            raise ValueError("Out-of-sample dates need an index with a fixed frequency.")
+        return self.nobs - 1 + len(pd.date_range(self.index[-1], label, freq=self.index.freq)) - 1
+
+    def _labels(self, start, end):
+        """Index labels for positions start .. end (extended with the index freq when needed)."""
+        if self.index is None or (end >= self.nobs and self.index.freq is None):
+            return pd.RangeIndex(start, end + 1)
+        if end < self.nobs:
+            return self.index[start:end + 1]
+        extended = pd.date_range(self.index[0], periods=end + 1, freq=self.index.freq)
+        return extended[start:end + 1]
+
+    # ========== Prediction ==========
+
+    def predict(self, start=None, end=None, dynamic=False):
+        """
+        In-sample prediction and out-of-sample forecasting, like AutoRegResults.predict.
+
+        Args:
+            start (int | date, optional): First prediction (default: first observation)
+            end (int | date, optional): Last prediction, inclusive (default: last observation)
+            dynamic (bool | int | date): Where to switch from true values to predicted
+                values as lags. True = at start, an int is an offset relative to start,
+                a date is an absolute position. Forecasts beyond the sample are always
+                recursive from the end of the training data.
+
+        Returns:
+            pd.Series: Predictions for positions start .. end (NaN for the first `lags`
+                       observations, which have no complete set of lags)
+        """
+        start = self._position(start, 0)
+        end = self._position(end, self.nobs - 1)
+
+        if dynamic is True:
+            dynamic_start = start
+        elif dynamic is False or dynamic is None:
+            dynamic_start = self.nobs
+        elif isinstance(dynamic, (int, np.integer)):
+            dynamic_start = start + int(dynamic)
+        else:
+            dynamic_start = self._position(dynamic, self.nobs)
+        dynamic_start = min(max(dynamic_start, self.lags), self.nobs)
+
+        predictions = np.full(end + 1, np.nan)
+        one_step_end = min(dynamic_start, end + 1)
+        if one_step_end > self.lags:
+            predictions[self.lags:one_step_end] = self.fittedvalues[:one_step_end - self.lags]
+
+        if end >= dynamic_start:
+            path = self.endog[dynamic_start - self.lags:dynamic_start]
+            predictions[dynamic_start:] = _recursive_forecast(
+                self.params[None, :], path[None, :], end + 1 - dynamic_start
+            )[0]
+
+        return pd.Series(predictions[start:], index=self._labels(start, end))
+
+    def forecast(self, steps=1):
+        """Recursive forecast for the `steps` observations after the training data."""
+        return self.predict(start=self.nobs, end=self.nobs + steps - 1)
+
+
+def _recursive_forecast(params, history, steps):
+    """
+    Recursive multi-step AR forecasts for several series at once.
+
+    Args:
+        params (np.ndarray): (k, lags + 1) parameters per series
+        history (np.ndarray): (k, lags) last observed values per series, oldest first
+        steps (int): Number of steps to forecast
+
+    Returns:
+        np.ndarray: (k, steps) forecasts
+    """
+    lags = params.shape[1] - 1
+    # Reversed lag coefficients line up with the oldest-first window
+    coefficients = params[:, :0:-1]
+    window = np.empty((len(params), lags + steps))
+    window[:, :lags] = history
+    for step in range(steps):
+        window[:, lags + step] = params[:, 0] + np.einsum(
+            'ij,ij->i', coefficients, window[:, step:lags + step]
+        )
+    return window[:, lags:]
+
+
+def fit_ar_many(series, lags):
+    """
+    Fit one AR(lags) model per series, batching the OLS solves.
+
+    Series of equal length share a stacked (k, n - lags, lags + 1) design tensor that
+    is solved with one batched QR decomposition.
+
+    Args:
+        series (dict): {name: pd.Series | np.ndarray} training series
+        lags (int): Number of lags
+
+    Returns:
+        dict: {name: ARModel}
+    """
+    by_length = {}
+    for name, data in series.items():
+        by_length.setdefault(len(data), []).append(name)
+
+    models = {}
+    for length, names in by_length.items():
+        if length <= lags:
+            raise ValueError(f"Need more than {lags} observations to fit AR({lags}).")
+        y = np.vstack([np.asarray(series[name], dtype=float) for name in names])
+        target, lag_matrix = lagged_design(y, lags)
+        q, r = np.linalg.qr(_with_constant(lag_matrix))
+        params = np.linalg.solve(r, np.einsum('kni,kn->ki', q, target)[..., None])[..., 0]
+        for name, coefficients in zip(names, params):
+            models[name] = ARModel(lags, coefficients, series[name])
+    return models
+
+
+def forecast_many(models, steps):
+    """
+    Recursive out-of-sample forecasts for many fitted models in one vectorised pass.
+
+    Args:
+        models (dict): {name: ARModel}, all with the same number of lags
+        steps (int): Number of steps after each model's training data
+
+    Returns:
+        pd.DataFrame: (steps x names) forecasts
+    """
+    names = list(models)
+    params = np.vstack([models[name].params for name in names])
+    lags = params.shape[1] - 1
+    history = np.vstack([models[name].endog[-lags:] for name in names])
+    return pd.DataFrame(_recursive_forecast(params, history, steps).T, columns=names)
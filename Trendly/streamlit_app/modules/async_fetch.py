@@ -0,0 +1,370 @@
+"""
+Asyncio price-history client with bounded concurrency.
+
+AsyncFetchClient fetches daily bars for many tickers concurrently:
+
+- a semaphore caps the number of requests in flight across all sources,
+- each source has its own token-bucket rate limit,
+- transient failures are retried with exponential backoff and jitter
+  (ValueError, i.e. "no data" / "data too old", and SourceTimeout move straight
+  to the next source),
+- a SyncSource runs at most `max_threads` blocking calls at a time, counting
+  timed-out calls whose threads are still running, so a hung provider cannot
+  pile up orphaned threads,
+- concurrent requests for the same ticker and start date share one in-flight fetch,
+- sources known to serve stale data (modules.source_health) are skipped, and every
+  request's outcome and latency is recorded there.
+
+All work runs on one background event loop owned by the client. Requests from
+Streamlit sessions (threads), the scanner and other event loops therefore
+coalesce with each other.
+
+A source is any object with a `name`, a `rate` (requests per second) and an
+async `fetch(ticker, start=None)` returning OHLCV bars from `start` onwards (the
+full history when start is None). SyncSource adapts blocking download functions;
+HTTPCSVSource reads CSV over HTTP (e.g. from a local fake server in development).
+"""
+import io
+import random
+import asyncio
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+from modules.price_store import OHLCV_COLUMNS, get_price_store, normalize_ohlcv
+from modules.source_health import get_source_health
+
+
+class RateLimiter:
+    """
+    Token bucket allowing `rate` requests per `per` seconds, with bursts up to `rate`.
+
+    Must only be used from a single event loop.
+    """
+
+    def __init__(self, rate, per=1.0):
+        self.capacity = float(rate)
+        self.tokens = float(rate)
+        self.fill_rate = rate / per
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.fill_rate)
+
+
+class SourceTimeout(Exception):
+    """A SyncSource call timed out, or all its worker threads are still busy."""
+
+
+class SyncSource:
+    """
+    Adapts a blocking fetch function to the async source interface.
+
+    Args:
+        name (str): Source name (used for rate limiting and error messages)
+        func (callable): func(ticker, start) -> OHLCV DataFrame; runs on a worker thread
+        rate (float): Maximum requests per second
+        timeout (float, optional): Seconds per request before it raises SourceTimeout;
+            the worker thread cannot be interrupted and finishes in the background
+        max_threads (int): Worker threads for this source. While that many calls are
+            still running (timed out or not), new requests fail fast with SourceTimeout.
+    """
+
+    def __init__(self, name, func, rate=5.0, timeout=None, max_threads=4):
+        self.name = name
+        self.func = func
+        self.rate = rate
+        self.timeout = timeout
+        self.max_threads = max_threads
+        self._executor = None
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def _release(self, _):
+        with self._lock:
+            self._running -= 1
+
+    async def fetch(self, ticker, start=None):
+        with self._lock:
+            if self._running >= self.max_threads:
+                raise SourceTimeout(f"{self._running} requests to {self.name} are still running")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_threads, thread_name_prefix=f"trendly-{self.name}")
+            self._running += 1
+        future = self._executor.submit(self.func, ticker, start)
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            if future.done():
+                raise  # The provider's own timeout: its thread has finished
+            raise SourceTimeout(f"No answer from {self.name} within {self.timeout}s") from None
+
+
+class HTTPCSVSource:
+    """
+    Daily bars from an HTTP endpoint that serves CSV (Date index + OHLCV columns).
+
+    Args:
+        name (str): Source name
+        url_template (str): URL with a {ticker} and optionally a {start} placeholder
+            ({start} is empty for the full history), e.g.
+            'http://127.0.0.1:8000/{ticker}.csv?start={start}'
+        rate (float): Maximum requests per second
+        timeout (float): Socket timeout in seconds
+    """
+
+    def __init__(self, name, url_template, rate=10.0, timeout=10.0):
+        self.name = name
+        self.url_template = url_template
+        self.rate = rate
+        self.timeout = timeout
+
+    def _get(self, url):
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                raise ValueError(f"No data at {url}")
+            raise  # 429 / 5xx are transient and retried
+
+    async def fetch(self, ticker, start=None):
+        start = pd.Timestamp(start) if start is not None else None
+        url = self.url_template.format(ticker=ticker, start=start.date() if start is not None else "")
+        body = await asyncio.to_thread(self._get, url)
+
+        data = pd.read_csv(io.BytesIO(body), index_col=0, parse_dates=True)
+        if start is not None:
+            data = data[data.index >= start]
+        if data.empty:
+            raise ValueError(f"No data found for ticker {ticker}.")
+        return data[OHLCV_COLUMNS]
+
+
+class AsyncFetchClient:
+    """
+    Concurrent, coalescing, rate-limited history fetcher.
+
+    Use the coroutines (fetch, fetch_many) from any event loop, or the blocking
+    fetch_sync / fetch_many_sync from plain threads; both run on the client's loop.
+
+    Args:
+        sources (list): Sources in order of preference
+        max_concurrency (int): Requests in flight at once across all sources
+        retries (int): Retries per source for transient errors
+        backoff (float): Initial retry delay in seconds (doubles each retry)
+        max_backoff (float): Upper bound of a retry delay in seconds
+        health (SourceHealth, optional): Freshness / statistics tracker
+            (default: the shared get_source_health())
+    """
+
+    def __init__(self, sources, max_concurrency=8, retries=3, backoff=0.5, max_backoff=8.0,
+                 health=None):
+        self.sources = list(sources)
+        self.health = health or get_source_health()
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self._limiters = {source.name: RateLimiter(source.rate) for source in self.sources}
+        self._inflight = {}  # (ticker, start) -> Task
+        self._semaphore = None
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+    # ========== Event loop ==========
+
+    def _ensure_loop(self):
+        """Start the background event loop thread on first use."""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="trendly-fetch", daemon=True).start()
+                self._loop = loop
+        return self._loop
+
+    def _submit(self, coroutine):
+        """Schedule a coroutine on the client's loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._ensure_loop())
+
+    # ========== Public API ==========
+
+    async def fetch(self, ticker, start=None):
+        """Fetch one ticker's bars from `start` onwards (full history if None)."""
+        return await asyncio.wrap_future(self._submit(self._fetch_coalesced(ticker, start)))
+
+    async def fetch_many(self, tickers, starts=None):
+        """
+        Fetch many tickers concurrently.
+
+        Args:
+            tickers (list): Ticker symbols
+            starts (dict, optional): {ticker: start date} for incremental fetches
+
+        Returns:
+            dict: {ticker: DataFrame or the Exception that fetch raised}
+        """
+        return await asyncio.wrap_future(self._submit(self._fetch_all(tickers, starts or {})))
+
+    def fetch_sync(self, ticker, start=None):
+        """Blocking fetch for callers without an event loop."""
+        return self._submit(self._fetch_coalesced(ticker, start)).result()
+
+    def fetch_many_sync(self, tickers, starts=None):
+        """Blocking fetch_many for callers without an event loop."""
+        return self._submit(self._fetch_all(tickers, starts or {})).result()
+
+    # ========== Internals (run on the client's loop) ==========
+
+    async def _fetch_all(self, tickers, starts):
+        tickers = list(tickers)
+        results = await asyncio.gather(
+            *(self._fetch_coalesced(ticker, starts.get(ticker)) for ticker in tickers),
+            return_exceptions=True
+        )
+        return dict(zip(tickers, results))
+
+    async def _fetch_coalesced(self, ticker, start):
+        key = (ticker.upper(), pd.Timestamp(start) if start is not None else None)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_from_sources(ticker, start))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: one caller giving up must not cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    async def _fetch_from_sources(self, ticker, start):
+        errors = []
+        for source in self.health.route(self.sources, ticker, name=lambda source: source.name):
+            try:
+                data = await self._fetch_with_retry(source, ticker, start)
+                return normalize_ohlcv(data)
+            except Exception as e:
+                errors.append(f"{source.name}: {e}")
+        raise Exception(f"Error fetching stock data for {ticker}: {'; '.join(errors)}")
+
+    async def _fetch_with_retry(self, source, ticker, start):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._semaphore:
+                    await self._limiters[source.name].acquire()
+                    started = time.perf_counter()
+                    try:
+                        data = await source.fetch(ticker, start)
+                    except Exception as e:
+                        self.health.record(source.name, ticker, time.perf_counter() - started, error=e)
+                        raise
+                    self.health.record(source.name, ticker, time.perf_counter() - started, data=data)
+                    return data
+            except (ValueError, SourceTimeout):
+                # No data / stale data: retrying the same source will not help. A timed-out
+                # call keeps its thread busy, so retrying would only pile up more threads.
+                raise
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+
+def default_sources(chain=None):
+    """
+    One source per provider of the market-data provider chain, as in fetch_stock_history.
+
+    Args:
+        chain (ProviderChain, optional): Defaults to get_provider_chain()
+    """
+    from modules.providers import get_provider_chain
+
+    chain = chain or get_provider_chain()
+    return [
+        SyncSource(provider.name, partial(_provider_fetch, provider), rate=provider.rate,
+                   timeout=chain.timeout_for(provider))
+        for provider in chain.providers
+    ]
+
+
+def _provider_fetch(provider, ticker, start):
+    return provider.fetch(ticker, "max", start=start)
+
+
+_fetch_client = None
+_fetch_client_lock = threading.Lock()
+
+
+def get_fetch_client():
+    """Shared AsyncFetchClient for this process (created on first use)."""
+    global _fetch_client
+    with _fetch_client_lock:
+        if _fetch_client is None:
+            _fetch_client = AsyncFetchClient(default_sources())
+    return _fetch_client
+
+
+def fetch_histories(tickers, period="2y", client=None, store=None):
+    """
+    Fetch many tickers through the price cache, with the network requests in parallel.
+
+    Cached fresh histories are served from disk, stale ones are refreshed from their
+    last cached bar and unknown tickers are downloaded in full, all concurrently.
+
+    Args:
+        tickers (list): Ticker symbols
+        period (str): Period slice to return ('2y', 'max', ...)
+        client (AsyncFetchClient, optional): Defaults to get_fetch_client()
+        store (PriceStore, optional): Defaults to get_price_store()
+
+    Returns:
+        dict: {ticker: OHLCV DataFrame}; tickers that could not be fetched are left out
+    """
+    client = client or get_fetch_client()
+    store = store or get_price_store()
+
+    histories, cached, starts = {}, {}, {}
+    for ticker in tickers:
+        data = store.load(ticker)
+        if data is None or data.empty:
+            starts[ticker] = None
+        elif store.needs_refresh(ticker, data):
+            cached[ticker] = data
+            # Re-fetch the last cached bar too, it may have been a partial session
+            starts[ticker] = data.index[-1]
+        else:
+            histories[ticker] = data
+
+    for ticker, result in client.fetch_many_sync(list(starts), starts).items():
+        if not isinstance(result, Exception):
+            histories[ticker] = store.merge(ticker, cached.get(ticker), result)
+        elif ticker in cached:
+            print(f"Price cache refresh failed for {ticker}, serving cached data: {result}")
+            store.mark_checked(ticker)
+            histories[ticker] = cached[ticker]
+        else:
+            print(f"Could not fetch {ticker}: {result}")
+
+    results = {}
+    for ticker in tickers:
+        if ticker in histories:
+            try:
+                results[ticker] = store.slice_period(ticker, histories[ticker], period)
+            except ValueError as ve:
+                print(str(ve))
+    return results
@@ -0,0 +1,281 @@
+"""
+Walk-forward backtest of the investment score and recommendations.
+
+Replays the analysis pipeline over rolling windows of each ticker's history: at
+the start of every fold the ensemble is trained on the bars known at that date,
+then every day of the fold is scored with the same ingredients
+generate_investment_analysis uses for the latest day (70/30 ML/AutoReg next-day
+blend, calculate_investment_score, get_investment_recommendation) and compared
+with the realised return over the following `horizon` sessions.
+
+The scores approximate the live path rather than reproduce it:
+- the AutoReg part is a one-step forecast from each day's own close (AR fitted at
+  the fold start), whereas the live path fits on the first 85% of closes and
+  forecasts dynamically from the end of that train split;
+- the model confidence is the per-row agreement of the ensemble on that day,
+  whereas the live path aggregates it once over the whole test split;
+- the ensemble is trained on all rows known at the fold start (no 85/15 split)
+  and updated once per fold, not refit for every scored day.
+
+To make a whole universe over several years tractable:
+- features are engineered once per ticker (or read from the feature store),
+- the ensemble is grown fold to fold with refresh_ensemble_artifacts (warm
+  start, periodic full refit) instead of being refit from scratch,
+- each fold's days are predicted in one batched call and all days are scored and
+  bucketed with vectorised NumPy / pandas operations,
+- tickers run in parallel on the scanner's process pool.
+
+Usage (from the streamlit_app directory):
+    python -m modules.backtest --tickers AAPL,MSFT,NVDA --period 5y
+    python -m modules.backtest --fast --workers 8 --output trades.csv
+"""
+import time
+import argparse
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from modules.helper import (fetch_stock_history, engineer_features, prepare_ml_features,
+                            fit_ensemble_artifacts, refresh_ensemble_artifacts,
+                            ensemble_predict_batch, calculate_investment_score_batch,
+                            get_investment_recommendation_batch, ENSEMBLE_PARAMS)
+from modules.ar_model import ARModel, lagged_design
+from modules.trading_calendar import calendar_days_to_sessions
+
+# Score bucket edges (the get_investment_recommendation thresholds)
+SCORE_BUCKETS = [-np.inf, 30, 40, 55, 70, np.inf]
+SCORE_BUCKET_LABELS = ['<30', '30-40', '40-55', '55-70', '70+']
+
+RECOMMENDATION_ORDER = ['STRONG BUY', 'BUY', 'CONSIDER BUY', 'HOLD', 'CAUTIOUS', 'SELL']
+
+# Smaller ensembles for quick universe-wide runs (--fast)
+FAST_PARAMS = {
+    name: {**params, 'n_estimators': 50} for name, params in ENSEMBLE_PARAMS.items()
+}
+
+
+def _feature_dates(stock_data_enhanced, feature_names):
+    """Dates of the rows prepare_ml_features keeps (same NaN filtering)."""
+    return (stock_data_enhanced[feature_names]
+            .assign(Target=stock_data_enhanced['Close'].shift(-1), Close=stock_data_enhanced['Close'])
+            .dropna().index)
+
+
+def _ar_one_step(close, params, lags, positions):
+    """AR next-day predictions made at each position from the closes up to it."""
+    _, lag_matrix = lagged_design(np.append(close, np.nan), lags)
+    return params[0] + lag_matrix[positions + 1 - lags] @ params[1:]
+
+
+def walk_forward(stock_data_enhanced, horizon=5, step=21, min_train=250, params=None,
+                 ml_features=None):
+    """
+    Walk-forward backtest of one ticker.
+
+    Each day uses a one-step AR forecast from its own close and per-row ensemble
+    confidence (see the module docstring for how this differs from the live path).
+
+    Args:
+        stock_data_enhanced (pd.DataFrame): engineer_features output for the whole period
+        horizon (int): Sessions over which each day's realised return is measured
+        step (int): Sessions per fold (models are updated at each fold start)
+        min_train (int): Feature rows in the first training window
+        params (dict, optional): Ensemble hyperparameters (default ENSEMBLE_PARAMS)
+        ml_features (tuple, optional): Precomputed prepare_ml_features output
+
+    Returns:
+        pd.DataFrame: One row per scored day with close, predicted_return, confidence,
+                      score, recommendation and forward_return (%), indexed by date
+    """
+    if ml_features is None:
+        ml_features = prepare_ml_features(stock_data_enhanced, lookback=60)
+    X, y, feature_names, _ = ml_features
+
+    dates = _feature_dates(stock_data_enhanced, feature_names)
+    positions = stock_data_enhanced.index.get_indexer(dates)
+    close = stock_data_enhanced['Close'].to_numpy(dtype=float)
+
+    # Only days whose forward return is already known can be scored
+    n_scored = int(np.searchsorted(positions, len(close) - horizon))
+    if n_scored <= min_train:
+        raise ValueError(f"Not enough history for a walk-forward backtest (need more than "
+                         f"{min_train} feature rows plus {horizon} sessions).")
+
+    ar_lags = calendar_days_to_sessions(60)
+    ml_pred, confidence, ar_pred = [], [], []
+    artifacts, previous_start = None, 0
+
+    for start in range(min_train, n_scored, step):
+        stop = min(start + step, n_scored)
+
+        # Train on the rows whose next-day target is known at the fold start
+        if artifacts is None:
+            artifacts = fit_ensemble_artifacts(X[:start], y[:start], params=params)
+        else:
+            artifacts, _ = refresh_ensemble_artifacts(
+                artifacts, X[:start], y[:start], X[previous_start:start], params=params
+            )
+        previous_start = start
+
+        batch = ensemble_predict_batch(artifacts['models'], artifacts['scaler'].transform(X[start:stop]))
+        ml_pred.append(batch['ensemble'].to_numpy())
+        confidence.append(batch['confidence'].to_numpy())
+
+        fold_end = positions[start]
+        ar_model = ARModel.fit(close[:fold_end + 1], lags=min(ar_lags, fold_end))
+        ar_pred.append(_ar_one_step(close, ar_model.params, ar_model.lags, positions[start:stop]))
+
+    rows = positions[min_train:n_scored]
+    latest = stock_data_enhanced.iloc[rows]
+    current_price = close[rows]
+    predicted_price = 0.70 * np.concatenate(ml_pred) + 0.30 * np.concatenate(ar_pred)
+    predicted_return = (predicted_price - current_price) / current_price * 100
+    confidence = np.concatenate(confidence)
+
+    score = calculate_investment_score_batch(
+        predicted_return, current_price,
+        latest['MA_5'], latest['MA_10'], latest['MA_20'],
+        latest['Volatility_10'], latest['Volume_Ratio'],
+        latest['RSI_14'], latest['MACD_Diff'], latest['BB_Position'],
+        latest['MA_50'], latest['MA_200'], confidence
+    )
+
+    return pd.DataFrame({
+        'close': current_price,
+        'predicted_return': predicted_return,
+        'confidence': confidence,
+        'score': score,
+        'recommendation': get_investment_recommendation_batch(score, predicted_return),
+        'forward_return': (close[rows + horizon] / current_price - 1) * 100,
+    }, index=pd.Index(dates[min_train:n_scored], name='Date'))
+
+
+def _backtest_ticker(ticker, horizon, period="5y", step=21, min_train=250, params=None, features=None):
+    """Scanner task: walk-forward backtest of one ticker."""
+    if features is not None and ticker in features and features.period == period:
+        trades = walk_forward(features.frame(ticker), horizon, step, min_train, params,
+                              ml_features=features.ml_features(ticker))
+    else:
+        stock_data = fetch_stock_history(ticker, period=period)
+        trades = walk_forward(engineer_features(stock_data), horizon, step, min_train, params)
+    return trades.assign(ticker=ticker)
+
+
+def summarize_backtest(trades):
+    """
+    Hit rate and returns by score bucket and by recommendation.
+
+    Args:
+        trades (pd.DataFrame): Rows from walk_forward (any number of tickers)
+
+    Returns:
+        dict: {'by_score', 'by_recommendation'} DataFrames with trades, hit_rate (share
+              of positive forward returns), direction_hit_rate (predicted vs realised
+              sign), mean/median forward return and mean predicted return; each has an
+              'ALL' row, the unconditional baseline
+    """
+    trades = trades.assign(
+        up=trades['forward_return'] > 0,
+        direction_hit=np.sign(trades['predicted_return']) == np.sign(trades['forward_return']),
+        bucket=pd.cut(trades['score'], SCORE_BUCKETS, right=False, labels=SCORE_BUCKET_LABELS),
+    )
+    aggregations = dict(
+        trades=('forward_return', 'size'),
+        hit_rate=('up', 'mean'),
+        direction_hit_rate=('direction_hit', 'mean'),
+        mean_return=('forward_return', 'mean'),
+        median_return=('forward_return', 'median'),
+        mean_predicted=('predicted_return', 'mean'),
+    )
+    baseline = trades.assign(group='ALL').groupby('group').agg(**aggregations)
+
+    by_score = trades.groupby('bucket', observed=False).agg(**aggregations)
+    by_score.index = by_score.index.astype(str)
+    by_recommendation = (trades.groupby('recommendation').agg(**aggregations)
+                         .reindex(RECOMMENDATION_ORDER).dropna(how='all'))
+
+    return {
+        'by_score': pd.concat([by_score, baseline]),
+        'by_recommendation': pd.concat([by_recommendation, baseline]),
+    }
+
+
+def run_backtest(tickers, period="5y", horizon=5, step=21, min_train=250, fast=False,
+                 max_workers=None, features=None, progress_callback=None):
+    """
+    Walk-forward backtest over many tickers in parallel.
+
+    Args:
+        tickers (list): Stock ticker symbols
+        period (str): History to replay ('5y', 'max', ...)
+        horizon (int): Sessions over which realised returns are measured
+        step (int): Sessions per fold
+        min_train (int): Feature rows in the first training window
+        fast (bool): Use FAST_PARAMS (smaller ensembles)
+        max_workers (int, optional): Worker processes (None = one per core)
+        features (FeatureUniverse, optional): Prepared universe to read from
+            (modules.feature_store); used for tickers it covers with the same period
+        progress_callback (function, optional): callback(completed, total, ticker)
+
+    Returns:
+        dict: {'trades': all scored days, 'by_score', 'by_recommendation'}
+    """
+    from modules.scanner import scan_tickers
+
+    task = partial(_backtest_ticker, period=period, step=step, min_train=min_train,
+                   params=FAST_PARAMS if fast else None, features=features)
+    tickers = list(tickers)
+
+    results = []
+    scan = scan_tickers(tickers, forecast_days=horizon, max_workers=max_workers, timeout=None, task=task)
+    for completed, (ticker, trades, error) in enumerate(scan, start=1):
+        if progress_callback:
+            progress_callback(completed, len(tickers), ticker)
+        if error is not None:
+            print(f"Skipping {ticker}: {error}")
+            continue
+        results.append(trades)
+
+    if not results:
+        raise ValueError("No ticker could be backtested.")
+
+    trades = pd.concat(results)
+    return {'trades': trades, **summarize_backtest(trades)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the Trendly investment score.")
+    parser.add_argument("--tickers", default=None, help="comma-separated tickers (default: the S&P 500)")
+    parser.add_argument("--period", default="5y", help="history to replay (default: 5y)")
+    parser.add_argument("--horizon", type=int, default=5, help="holding period in sessions (default: 5)")
+    parser.add_argument("--step", type=int, default=21, help="sessions per fold (default: 21)")
+    parser.add_argument("--fast", action="store_true", help="smaller ensembles for quick runs")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--output", default=None, help="write every scored day to this CSV file")
+    args = parser.parse_args(argv)
+
+    if args.tickers:
+        tickers = args.tickers.split(",")
+    else:
+        from modules.helper import fetch_sp_tickers
+        tickers = [symbol for symbol in fetch_sp_tickers() if '.' not in symbol and '-' not in symbol]
+
+    started = time.time()
+    result = run_backtest(tickers, period=args.period, horizon=args.horizon, step=args.step,
+                          fast=args.fast, max_workers=args.workers)
+    print(f"Backtested {result['trades']['ticker'].nunique()} tickers, "
+          f"{len(result['trades'])} stock-days in {time.time() - started:.0f}s")
+
+    with pd.option_context('display.width', 120, 'display.float_format', '{:.3f}'.format):
+        print("\nBy score bucket:")
+        print(result['by_score'])
+        print("\nBy recommendation:")
+        print(result['by_recommendation'])
+
+    if args.output:
+        result['trades'].to_csv(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Bulk multi-ticker download backends.
+
+A batch backend is a callable backend(symbols, period=None, start=None) that
+returns one wide DataFrame for many symbols at once, shaped like
+yf.download(..., group_by='ticker'): MultiIndex columns (ticker, field).
+split_batch_frame turns that into per-ticker OHLCV frames.
+"""
+import pandas as pd
+
+from modules.price_store import OHLCV_COLUMNS, period_start
+from modules.providers import LocalDirectoryProvider
+
+# Symbols requested per HTTP call to yfinance
+DEFAULT_BATCH_SIZE = 100
+
+
+def yfinance_batch_backend(symbols, period=None, start=None):
+    """
+    Download daily bars for many symbols in one yfinance request.
+
+    Args:
+        symbols (list): Ticker symbols
+        period (str, optional): yfinance period ('2y', 'max', ...)
+        start (datetime, optional): First date to download (overrides period)
+
+    Returns:
+        pd.DataFrame: Wide frame with (ticker, field) columns
+    """
+    import yfinance as yf
+
+    kwargs = {'start': start} if start is not None else {'period': period or "max"}
+    return yf.download(
+        list(symbols),
+        interval="1d",
+        group_by='ticker',
+        auto_adjust=True,
+        prepost=False,
+        threads=True,
+        progress=False,
+        **kwargs
+    )
+
+
+class LocalBatchBackend:
+    """
+    Offline stand-in for yfinance_batch_backend.
+
+    Reads pre-downloaded files named <TICKER>.csv or <TICKER>.parquet (Date index
+    plus OHLCV columns) from a directory and returns them in the same wide shape as
+    a real batch download, so the whole ingest path can run without network access.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._files = LocalDirectoryProvider(directory)
+
+    def __call__(self, symbols, period=None, start=None):
+        frames = {}
+        for symbol in symbols:
+            data = self._files.read(symbol)
+            if data is None:
+                continue  # Unknown symbols are simply absent, like in a real batch
+            if start is None:
+                start_date = period_start(period)
+            else:
+                start_date = pd.Timestamp(start)
+            if start_date is not None:
+                data = data[data.index >= start_date]
+            frames[symbol] = data[OHLCV_COLUMNS]
+
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+
+def split_batch_frame(batch, symbols):
+    """
+    Split a wide batch download into per-ticker OHLCV frames.
+
+    Args:
+        batch (pd.DataFrame): Output of a batch backend
+        symbols (list): Symbols that were requested
+
+    Returns:
+        dict: {ticker: DataFrame with ['Open', 'High', 'Low', 'Close', 'Volume']}.
+              Symbols without any data are left out.
+    """
+    if batch is None or batch.empty:
+        return {}
+
+    frames = {}
+    if not isinstance(batch.columns, pd.MultiIndex):
+        # Single-symbol downloads may come back with flat columns
+        if len(symbols) == 1:
+            frames[symbols[0]] = batch
+    else:
+        available = set(batch.columns.get_level_values(0))
+        for symbol in symbols:
+            if symbol in available:
+                frames[symbol] = batch[symbol]
+
+    result = {}
+    for symbol, data in frames.items():
+        # Rows where the symbol did not trade (e.g. before listing) come back as NaN
+        data = data[OHLCV_COLUMNS].dropna(how='all')
+        if not data.empty:
+            result[symbol] = data
+    return result
+
+
+def chunked(items, size):
+    """Split a list into consecutive chunks of at most `size` items."""
+    return [items[i:i + size] for i in range(0, len(items), size)]
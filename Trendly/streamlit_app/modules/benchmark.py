@@ -0,0 +1,386 @@
+"""
+Offline benchmark suite for the analysis pipeline.
+
+Every benchmark runs on seeded synthetic data (modules.synthetic), so the suite
+needs no network access and measures the same work on every run:
+
+    cold_import     importing modules.helper in a fresh interpreter (page cold start)
+    features        engineer_features on one 2y history
+    ml_features     prepare_ml_features
+    train           train_ensemble_models (fresh fit, no model registry)
+    predict         ensemble_predict over the test rows
+    exit_timing     calculate_exit_timing on a 30-session forecast
+    analysis        generate_investment_analysis end to end (deep profile, no model registry)
+    analysis_lite   the same with the scan-lite profile used by the universe scan
+    scan_<N>        per-ticker universe scan of N synthetic tickers on the scanner's
+                    process pool (as in the scan-lite universe scan of
+                    get_smart_investment_recommendation, minus the download)
+
+Fast stages are called in a loop until a sample takes at least MIN_SAMPLE_SECONDS
+(like timeit's autorange). Results are compared with a stored baseline (JSON) on
+the best sample, the least noisy statistic on a shared machine; a benchmark more
+than the tolerance slower than its baseline is reported as a regression and the
+command exits with status 1.
+
+The baseline is versioned with the code in benchmarks/baseline.json (next to the
+modules package), so a checkout compares against the timings it shipped with. A
+different file is used only when asked for explicitly, with --baseline or the
+TRENDLY_BENCHMARK_BASELINE environment variable (e.g. a per-machine baseline
+under TRENDLY_CACHE_DIR).
+
+Usage (from the streamlit_app directory):
+    python -m modules.benchmark                      # run and compare with the baseline
+    python -m modules.benchmark --save-baseline      # run and store as the new baseline
+    python -m modules.benchmark --only features,train --repeat 5
+    python -m modules.benchmark --universe 10,100,500 --workers 8
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from modules.synthetic import synthetic_history, synthetic_tickers
+from modules.trading_calendar import next_sessions
+
+# Synthetic history per ticker: about fetch_stock_history's 2y period
+BENCH_SESSIONS = 504
+
+# Universe sizes for the scan benchmarks
+DEFAULT_UNIVERSE_SIZES = (10, 100, 500)
+
+# Relative slowdown over the baseline reported as a regression
+DEFAULT_TOLERANCE = 0.20
+
+# Minimum duration of one timing sample; faster calls are looped
+MIN_SAMPLE_SECONDS = 0.2
+
+# Fixed last session, so every run and every worker generates identical data
+BENCH_END = "2024-12-31"
+
+# Baseline versioned with the code (streamlit_app/benchmarks/baseline.json)
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "benchmarks", "baseline.json")
+
+
+def default_baseline_path():
+    """Baseline file: TRENDLY_BENCHMARK_BASELINE if set, else the one in the repo."""
+    return os.environ.get("TRENDLY_BENCHMARK_BASELINE") or BASELINE_PATH
+
+
+def environment_info():
+    """Machine and library versions the timings were taken on."""
+    import sklearn
+    from modules.helper import xgboost_available
+
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cores = os.cpu_count()
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cores': cores,
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'xgboost': xgboost_available(),
+    }
+
+
+# ========== Benchmark cases ==========
+#
+# Each case takes the shared inputs and returns a zero-argument callable; only the
+# callable is timed.
+
+def _inputs():
+    """Synthetic history and the intermediate results the stage benchmarks start from."""
+    from modules.helper import engineer_features, prepare_ml_features
+    from sklearn.preprocessing import StandardScaler
+
+    stock_data = synthetic_history("BENCH", sessions=BENCH_SESSIONS, end=BENCH_END)
+    enhanced = engineer_features(stock_data)
+    X, y, feature_names, _ = prepare_ml_features(enhanced, lookback=60)
+    split = int(0.85 * len(X))
+    scaler = StandardScaler().fit(X[:split])
+    return {
+        'stock_data': stock_data,
+        'enhanced': enhanced,
+        'X_train': scaler.transform(X[:split]),
+        'y_train': y[:split],
+        'X_test': scaler.transform(X[split:]),
+    }
+
+
+def _bench_features(inputs):
+    from modules.helper import engineer_features
+    return partial(engineer_features, inputs['stock_data'])
+
+
+def _bench_ml_features(inputs):
+    from modules.helper import prepare_ml_features
+    return partial(prepare_ml_features, inputs['enhanced'], lookback=60)
+
+
+def _bench_train(inputs):
+    from modules.helper import train_ensemble_models
+    return partial(train_ensemble_models, inputs['X_train'], inputs['y_train'])
+
+
+def _bench_predict(inputs):
+    from modules.helper import train_ensemble_models, ensemble_predict
+    models = train_ensemble_models(inputs['X_train'], inputs['y_train'])
+    return partial(ensemble_predict, models, inputs['X_test'])
+
+
+def _bench_exit_timing(inputs):
+    from modules.helper import calculate_exit_timing
+    enhanced = inputs['enhanced']
+    current_price = enhanced['Close'].iloc[-1]
+    # A rise then a fall, so peak detection has something to find
+    path = current_price * (1 + 0.05 * np.sin(np.linspace(0, np.pi * 1.5, 30)))
+    forecast = pd.Series(path, index=next_sessions(enhanced.index[-1], 30))
+    return partial(calculate_exit_timing, forecast, current_price, enhanced.iloc[-1])
+
+
+def _bench_analysis(inputs, profile='deep'):
+    from modules.helper import generate_investment_analysis
+    return partial(generate_investment_analysis, "BENCH", 30, use_model_cache=False,
+                   stock_data=inputs['stock_data'], profile=profile)
+
+
+def _bench_cold_import(inputs):
+    from modules.lazy_imports import measure_cold_imports
+    return partial(measure_cold_imports, ('modules.helper',), repeat=1)
+
+
+STAGE_BENCHMARKS = {
+    'cold_import': _bench_cold_import,
+    'features': _bench_features,
+    'ml_features': _bench_ml_features,
+    'train': _bench_train,
+    'predict': _bench_predict,
+    'exit_timing': _bench_exit_timing,
+    'analysis': _bench_analysis,
+    'analysis_lite': partial(_bench_analysis, profile='scan-lite'),
+}
+
+
+def _scan_ticker(ticker, forecast_days, sessions=BENCH_SESSIONS, end=BENCH_END):
+    """Scanner task: scan-lite analysis of a synthetic ticker (generated in the worker)."""
+    from modules.helper import generate_investment_analysis, summarize_analysis
+
+    stock_data = synthetic_history(ticker, sessions=sessions, end=end)
+    analysis = generate_investment_analysis(ticker, forecast_days, use_model_cache=False,
+                                            stock_data=stock_data, profile='scan-lite')
+    return summarize_analysis(ticker, analysis)
+
+
+def run_synthetic_scan(n_tickers, max_workers=None):
+    """
+    Per-ticker universe scan over synthetic tickers.
+
+    Returns:
+        list: summarize_analysis dicts sorted by score (like 'all_analyses')
+    """
+    from modules.scanner import scan_tickers
+
+    results = []
+    for ticker, result, error in scan_tickers(synthetic_tickers(n_tickers), forecast_days=5,
+                                              max_workers=max_workers, timeout=None, task=_scan_ticker):
+        if error is not None:
+            raise RuntimeError(f"Synthetic scan failed for {ticker}: {error}")
+        results.append(result)
+    results.sort(key=lambda x: (x['score'], x['confidence']), reverse=True)
+    return results
+
+
+# ========== Running and comparing ==========
+
+def time_callable(func, repeat=3):
+    """
+    Wall-clock seconds per call of a callable.
+
+    A first (warm-up) call also calibrates how many calls make up one sample of at
+    least MIN_SAMPLE_SECONDS.
+
+    Returns:
+        dict: {'median', 'min', 'max'} seconds per call, 'repeat' samples, 'number' calls per sample
+    """
+    started = time.perf_counter()
+    func()
+    number = max(1, int(np.ceil(MIN_SAMPLE_SECONDS / max(time.perf_counter() - started, 1e-9))))
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - started) / number)
+    return {
+        'median': float(np.median(timings)),
+        'min': float(np.min(timings)),
+        'max': float(np.max(timings)),
+        'repeat': repeat,
+        'number': number,
+    }
+
+
+def run_benchmarks(only=None, repeat=3, universe_sizes=DEFAULT_UNIVERSE_SIZES, max_workers=None):
+    """
+    Run the suite.
+
+    Stage benchmarks take `repeat` samples after one warm-up call. Scans run
+    once each (a scan is already an average over N tickers) and also report the
+    seconds per ticker.
+
+    Args:
+        only (list, optional): Benchmark names to run (default: all)
+        repeat (int): Timed repetitions per stage benchmark
+        universe_sizes (tuple): Ticker counts for the scan benchmarks
+        max_workers (int, optional): Scanner worker processes (None = one per core)
+
+    Returns:
+        dict: {name: timing dict}
+    """
+    scan_names = {f"scan_{n}": n for n in universe_sizes}
+    selected = list(STAGE_BENCHMARKS) + list(scan_names)
+    if only:
+        unknown = set(only) - set(selected)
+        if unknown:
+            raise ValueError(f"Unknown benchmark(s): {', '.join(sorted(unknown))}. "
+                             f"Available: {', '.join(selected)}")
+        selected = [name for name in selected if name in only]
+
+    results = {}
+    stage_names = [name for name in selected if name in STAGE_BENCHMARKS]
+    if stage_names:
+        inputs = _inputs()
+        for name in stage_names:
+            results[name] = time_callable(STAGE_BENCHMARKS[name](inputs), repeat=repeat)
+            print(f"{name}: {results[name]['min'] * 1000:.2f} ms")
+
+    for name in selected:
+        if name in scan_names:
+            started = time.perf_counter()
+            run_synthetic_scan(scan_names[name], max_workers=max_workers)
+            elapsed = time.perf_counter() - started
+            results[name] = {'median': elapsed, 'min': elapsed, 'max': elapsed, 'repeat': 1,
+                             'number': 1, 'per_ticker': elapsed / scan_names[name]}
+            print(f"{name}: {elapsed:.1f} s ({results[name]['per_ticker']:.2f} s/ticker)")
+
+    return results
+
+
+def load_baseline(path=None):
+    """Stored baseline ({'environment', 'results'}), or None if there is none."""
+    try:
+        with open(path or default_baseline_path()) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(results, path=None):
+    """Store results as the baseline (merged over benchmarks not run this time)."""
+    path = path or default_baseline_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    previous = load_baseline(path) or {}
+    baseline = {
+        'environment': environment_info(),
+        'created': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'results': {**previous.get('results', {}), **results},
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(baseline, f, indent=2)
+    os.replace(tmp_path, path)
+    return baseline
+
+
+def compare_results(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare timings with a baseline.
+
+    Args:
+        results (dict): Output of run_benchmarks
+        baseline (dict): Output of load_baseline (may be None)
+        tolerance (float): Relative slowdown reported as a regression
+
+    Returns:
+        pd.DataFrame: One row per benchmark with the best and median time, the
+                      baseline's best time, their ratio and a status
+                      ('regression', 'faster', 'ok' or 'new')
+    """
+    baseline_results = (baseline or {}).get('results', {})
+    rows = []
+    for name, timing in results.items():
+        reference = baseline_results.get(name)
+        if reference is None:
+            ratio, status = np.nan, 'new'
+        else:
+            ratio = timing['min'] / reference['min']
+            if ratio > 1 + tolerance:
+                status = 'regression'
+            elif ratio < 1 - tolerance:
+                status = 'faster'
+            else:
+                status = 'ok'
+        rows.append({
+            'benchmark': name,
+            'best_s': timing['min'],
+            'median_s': timing['median'],
+            'baseline_s': reference['min'] if reference else np.nan,
+            'ratio': ratio,
+            'status': status,
+        })
+    return pd.DataFrame(rows).set_index('benchmark')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks of the Trendly analysis pipeline.")
+    parser.add_argument("--only", default=None, help="comma-separated benchmark names (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed repetitions per stage benchmark")
+    parser.add_argument("--universe", default=",".join(map(str, DEFAULT_UNIVERSE_SIZES)),
+                        help="comma-separated scan sizes (default: 10,100,500; empty to skip)")
+    parser.add_argument("--workers", type=int, default=None, help="scan worker processes (default: all cores)")
+    parser.add_argument("--baseline", default=None, help="baseline JSON file (default: benchmarks/baseline.json "
+                             "or TRENDLY_BENCHMARK_BASELINE)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="relative slowdown reported as a regression (default: 0.20)")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    args = parser.parse_args(argv)
+
+    universe_sizes = tuple(int(n) for n in args.universe.split(",") if n.strip())
+    only = args.only.split(",") if args.only else None
+
+    baseline = load_baseline(args.baseline)
+    if baseline is not None and baseline.get('environment', {}).get('cores') != environment_info()['cores']:
+        print("Warning: the baseline was recorded on a machine with a different core count")
+
+    results = run_benchmarks(only=only, repeat=args.repeat, universe_sizes=universe_sizes,
+                             max_workers=args.workers)
+    comparison = compare_results(results, baseline, tolerance=args.tolerance)
+    with pd.option_context('display.width', 120, 'display.float_format', '{:.5g}'.format):
+        print()
+        print(comparison)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"Baseline saved to {args.baseline or default_baseline_path()}")
+        return 0
+
+    regressions = comparison.index[comparison['status'] == 'regression']
+    if len(regressions):
+        print(f"Regressions: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""
+Memory-mapped store of a prepared stock universe.
+
+A universe scan engineers features for every ticker once (panel mode) and writes
+them to a directory of NumPy .npy files:
+
+    frames.npy   engineered frames, all tickers stacked (rows x float64 columns)
+    frames_<dtype>.npy  the columns of any other dtype (e.g. float32 / int8 of
+                 compact frames, see modules.compact), same rows
+    dates.npy    date of each frames row
+    X.npy        prepare_ml_features X, all tickers stacked
+    y.npy        prepare_ml_features y
+    close.npy    prepare_ml_features close
+    manifest.json  ticker -> row ranges, column names, session, period
+
+Readers open the arrays with np.load(mmap_mode='r') and hand out per-ticker
+slices, which are views into the page cache: scanner worker processes, the pooled
+model and the Streamlit process all read the same physical pages without
+unpickling or copying. A FeatureUniverse pickles as its path, so passing one to a
+worker process only sends a string.
+
+Each write is a new universe_<session> directory; older ones are removed once the
+new one is in place (processes still mapping them keep their unlinked files).
+"""
+import os
+import json
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+from modules.compact import compact_dtypes
+from modules.price_store import DEFAULT_CACHE_DIR
+from modules.trading_calendar import (market_now, is_session, session_open, session_settled,
+                                      latest_completed_session)
+
+
+class FeatureUniverse:
+    """
+    Read-only, memory-mapped view of a stored universe.
+
+    Args:
+        path (str): Universe directory written by FeatureStore.write
+    """
+
+    def __init__(self, path):
+        self.path = path
+        manifest_path = os.path.join(path, "manifest.json")
+        self.mtime = os.path.getmtime(manifest_path)
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        self.tickers = manifest['tickers']  # ticker -> [row_start, row_stop, ml_start, ml_stop]
+        self.columns = pd.Index(manifest['columns'])
+        self.feature_names = manifest['feature_names']
+        # [dtype, columns] per stacked file (universes written before dtype groups: one float64 file)
+        self.column_groups = manifest.get('column_groups', [['float64', manifest['columns']]])
+        self.session = pd.Timestamp(manifest['session'])
+        self.period = manifest['period']
+        self._arrays = {}
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        return open_feature_universe, (self.path,)
+
+    def __contains__(self, ticker):
+        return ticker.upper() in self.tickers
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def _array(self, name):
+        """Map an array file on first use."""
+        with self._lock:
+            array = self._arrays.get(name)
+            if array is None:
+                array = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode='r')
+                self._arrays[name] = array
+        return array
+
+    def frame(self, ticker):
+        """
+        A ticker's engineered features (engineer_features layout) backed by the mapped files.
+
+        Columns keep the dtypes they were written with, grouped by dtype (float64
+        first). The frame is read-only: copy it before modifying.
+        """
+        row_start, row_stop, _, _ = self.tickers[ticker.upper()]
+        index = pd.DatetimeIndex(self._array('dates')[row_start:row_stop], name='Date')
+        blocks = [
+            pd.DataFrame(self._array(frames_file(dtype))[row_start:row_stop], index=index,
+                         columns=columns, copy=False)
+            for dtype, columns in self.column_groups
+        ]
+        return blocks[0] if len(blocks) == 1 else pd.concat(blocks, axis=1, copy=False)
+
+    def ml_features(self, ticker):
+        """
+        A ticker's prepare_ml_features output as read-only views.
+
+        Returns:
+            tuple: (X, y, feature_names, close) like prepare_ml_features
+        """
+        _, _, ml_start, ml_stop = self.tickers[ticker.upper()]
+        return (self._array('X')[ml_start:ml_stop], self._array('y')[ml_start:ml_stop],
+                self.feature_names, self._array('close')[ml_start:ml_stop])
+
+
+def frames_file(dtype):
+    """Name of the stacked frames file holding the columns of one dtype."""
+    return "frames" if np.dtype(dtype) == np.float64 else f"frames_{np.dtype(dtype).name}"
+
+
+_open_universes = {}
+_open_universes_lock = threading.Lock()
+
+
+def open_feature_universe(path):
+    """FeatureUniverse for a directory, mapped once per process (remapped if rewritten)."""
+    with _open_universes_lock:
+        universe = _open_universes.get(path)
+        if universe is None or universe.mtime != os.path.getmtime(os.path.join(path, "manifest.json")):
+            universe = _open_universes[path] = FeatureUniverse(path)
+    return universe
+
+
+class FeatureStore:
+    """
+    Directory of prepared universes, one subdirectory per session.
+
+    Args:
+        root (str, optional): Store directory (default: TRENDLY_CACHE_DIR/features)
+        keep (int): Most recent universes kept on disk when a new one is written
+    """
+
+    LATEST = "latest"
+    PREFIX = "universe_"
+
+    def __init__(self, root=None, keep=1):
+        self.root = root or os.path.join(
+            os.environ.get("TRENDLY_CACHE_DIR", DEFAULT_CACHE_DIR), "features"
+        )
+        self.keep = keep
+        os.makedirs(self.root, exist_ok=True)
+
+    def write(self, enhanced_frames, period="2y", lookback=60, compact=False):
+        """
+        Store engineered frames and their prepare_ml_features output.
+
+        Tickers without enough data for prepare_ml_features are left out. Columns are
+        stored with the first frame's dtypes, or compact_dtypes when `compact`; X, y and
+        close are always prepared from the frames as given. Older universes beyond
+        `keep` are removed.
+
+        Args:
+            enhanced_frames (dict): {ticker: engineer_features output}
+            period (str): History period the frames cover (recorded for readers)
+            lookback (int): Minimum rows passed to prepare_ml_features
+            compact (bool): Store the frames with modules.compact.compact_dtypes
+
+        Returns:
+            FeatureUniverse: The stored universe, memory-mapped
+        """
+        from modules.helper import prepare_ml_features
+
+        tickers, frames, ml_parts = {}, [], []
+        row, ml_row = 0, 0
+        columns = feature_names = None
+        for ticker, frame in sorted(enhanced_frames.items()):
+            try:
+                X, y, feature_names, close = prepare_ml_features(frame, lookback=lookback)
+            except ValueError as ve:
+                print(f"Skipping {ticker} in feature store: {ve}")
+                continue
+            if columns is None:
+                columns = list(frame.columns)
+                dtypes = pd.Series(compact_dtypes(columns)).map(np.dtype) if compact else frame.dtypes
+            frames.append(frame)
+            ml_parts.append((X, y, close))
+            tickers[ticker.upper()] = [row, row + len(frame), ml_row, ml_row + len(X)]
+            row += len(frame)
+            ml_row += len(X)
+
+        if not tickers:
+            raise ValueError("No ticker had enough data for the feature store.")
+
+        session = max(frame.index[-1] for frame in frames)
+        name = f"{self.PREFIX}{session.date()}"
+        path = os.path.join(self.root, name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        # One stacked file per column dtype (float64 first), filled in place instead
+        # of concatenating in memory
+        column_groups = [[dtype.name, [column for column in columns if dtypes[column] == dtype]]
+                         for dtype in sorted(set(dtypes), key=lambda dtype: (dtype != np.float64, dtype.name))]
+        for dtype, group in column_groups:
+            stacked = np.lib.format.open_memmap(
+                os.path.join(tmp_path, f"{frames_file(dtype)}.npy"), mode='w+', dtype=dtype,
+                shape=(row, len(group))
+            )
+            for frame, (row_start, row_stop, _, _) in zip(frames, tickers.values()):
+                stacked[row_start:row_stop] = frame[group].to_numpy(dtype=dtype)
+            stacked.flush()
+            del stacked
+
+        dates = np.empty(row, dtype='datetime64[ns]')
+        for frame, (row_start, row_stop, _, _) in zip(frames, tickers.values()):
+            dates[row_start:row_stop] = frame.index.values
+        np.save(os.path.join(tmp_path, "dates.npy"), dates)
+
+        for i, part in enumerate(("X", "y", "close")):
+            np.save(os.path.join(tmp_path, f"{part}.npy"), np.concatenate([parts[i] for parts in ml_parts]))
+
+        with open(os.path.join(tmp_path, "manifest.json"), "w") as f:
+            json.dump({
+                'tickers': tickers,
+                'columns': columns,
+                'column_groups': column_groups,
+                'feature_names': list(feature_names),
+                'session': str(session.date()),
+                'period': period,
+            }, f)
+
+        # Readers still mapping a replaced universe keep their (unlinked) files
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        self._set_latest(name)
+        self.prune(keep=name)
+        return open_feature_universe(path)
+
+    def prune(self, keep=None):
+        """
+        Remove universes beyond the `self.keep` most recent sessions.
+
+        Args:
+            keep (str, optional): Universe directory name that is never removed
+        """
+        names = sorted((name for name in os.listdir(self.root)
+                        if name.startswith(self.PREFIX) and not name.endswith(".tmp")), reverse=True)
+        for name in names[self.keep:]:
+            if name != keep:
+                # Readers still mapping a removed universe keep their (unlinked) files
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+    def _set_latest(self, name):
+        """Atomically point LATEST at a universe directory name."""
+        pointer = os.path.join(self.root, self.LATEST)
+        tmp_pointer = f"{pointer}.{os.getpid()}.tmp"
+        with open(tmp_pointer, "w") as f:
+            f.write(name)
+        os.replace(tmp_pointer, pointer)
+
+    def open_latest(self):
+        """The most recently written universe, or None if there is none."""
+        try:
+            with open(os.path.join(self.root, self.LATEST)) as f:
+                name = f.read().strip()
+            return open_feature_universe(os.path.join(self.root, name))
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable feature store: {e}")
+            return None
+
+
+_feature_store = None
+
+
+def get_feature_store():
+    """Shared FeatureStore for this process (created on first use)."""
+    global _feature_store
+    if _feature_store is None:
+        _feature_store = FeatureStore()
+    return _feature_store
+
+
+def current_feature_universe(store=None, now=None):
+    """
+    The latest stored universe if it still matches live daily data, else None.
+
+    A universe is current when it includes the latest completed session and the
+    market is not trading (intraday, fresh downloads include a moving partial bar).
+
+    Args:
+        store (FeatureStore, optional): Defaults to get_feature_store()
+        now (datetime, optional): Current time (default: now in New York)
+
+    Returns:
+        FeatureUniverse | None
+    """
+    now = now or market_now()
+    today = pd.Timestamp(now.date())
+    if is_session(today) and session_open(today) <= now < session_settled(today):
+        return None
+
+    universe = (store or get_feature_store()).open_latest()
+    if universe is None or universe.session < latest_completed_session(now):
+        return None
+    return universe
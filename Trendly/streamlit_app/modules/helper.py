@@ -1,35 +1,44 @@
+import time
+_import_started = time.perf_counter()
+
 import pandas as pd
 import numpy as np
 import streamlit as st
-from statsmodels.tsa.ar_model import AutoReg
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import TimeSeriesSplit
-from sklearn.metrics import mean_absolute_error, r2_score
-
-# Try to import XGBoost, fallback gracefully if not available
-XGBOOST_AVAILABLE = False
-try:
-    import xgboost as xgb
-    XGBOOST_AVAILABLE = True
-except Exception as e:
-    print(f"XGBoost not available: {str(e)}")
-
-# Try to import defeatbeta_api, fallback gracefully if not available
-DEFEAT_API_AVAILABLE = False
-Ticker = None
-try:
-    from defeatbeta_api.data.ticker import Ticker
-    DEFEAT_API_AVAILABLE = True
-except Exception:
-    print("defeatbeta-api not available, using yfinance fallback")
-
-import ta  # Technical Analysis library
+
+# scikit-learn, XGBoost, ta and defeatbeta_api are imported on first use (or by the
+# warm-up thread the pages start), see modules.lazy_imports
+from modules.lazy_imports import optional_import, record_startup
+
 import os
+from modules.price_store import get_price_store, normalize_ohlcv, PriceStore
+from modules.model_registry import ModelRegistry, get_model_registry
+from modules.ar_model import ARModel
+from modules.trading_calendar import to_sessions, next_sessions, calendar_days_to_sessions
+from modules.source_health import StaleDataError, MAX_DATA_AGE_DAYS
+from modules.providers import get_provider_chain
+from modules.compact import frame_nbytes
+from modules.tracing import span, start_trace, current_tracer, aggregate_spans
+from modules.batch_download import split_batch_frame, chunked, DEFAULT_BATCH_SIZE
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+
+def xgboost_available():
+    """Whether XGBoost can be used (imports it on first call)."""
+    return optional_import('xgboost') is not None
+
+
+def defeat_api_available():
+    """Whether defeatbeta-api can be used (imports it on first call)."""
+    return optional_import('defeatbeta_api.data.ticker') is not None
+
+
+# Thread count used by the n_jobs-aware models (RandomForest, XGBoost).
+# The parallel scanner lowers this inside each worker process so that
+# workers x model threads never exceeds the machine's cores.
+MODEL_N_JOBS = -1
+
 @st.cache_data
 def fetch_sp_tickers():
     """Fetch the S&P tickers from the CSV file in the assets folder."""
@@ -53,79 +62,219 @@ def fetch_sp_tickers():
 
 
 
-def fetch_stock_history(stock_ticker, period="max", interval="1d"):
+def fetch_stock_history(stock_ticker, period="max", interval="1d", use_cache=True):
     """
-    Fetch historical stock data from Defeat Beta API or yfinance fallback with Volume included.
+    Fetch historical stock data with Volume included.
+    
+    Daily data is served from the on-disk price cache (modules.price_store), which
+    only downloads the bars after the last cached date. Cache misses and refreshes
+    go to the market-data provider chain (modules.providers; Defeat Beta API with
+    yfinance as fallback by default), through the shared async fetch client
+    (modules.async_fetch): concurrent requests for the same ticker share one
+    download, and transient errors are retried with backoff.
     Args:
         stock_ticker (str): The stock ticker symbol.
         period (str): The time period for the data ('max', '2y', etc.).
         interval (str): The interval for the data (only '1d' supported).
+        use_cache (bool): Read/refresh the on-disk price cache (daily data only).
     Returns:
         pd.DataFrame: A DataFrame containing stock data with columns ['Open', 'High', 'Low', 'Close', 'Volume'].
     """
-    # Try defeatbeta-api first if available
-    if DEFEAT_API_AVAILABLE:
+    if use_cache and interval == "1d":
+        from modules.async_fetch import get_fetch_client
+        return get_price_store().get(
+            stock_ticker,
+            period,
+            fetch=lambda start: get_fetch_client().fetch_sync(stock_ticker, start)
+        )
+    
+    return _download_stock_history(stock_ticker, period, interval)
+
+
+def fetch_stock_histories(tickers, period="2y", backend=None,
+                          batch_size=DEFAULT_BATCH_SIZE, use_cache=True):
+    """
+    Fetch daily history for many tickers using bulk multi-symbol requests.
+    
+    Tickers with fresh data in the price cache are read from disk. Missing tickers
+    are downloaded in full and stale ones from their earliest overlap bar, each
+    group `batch_size` symbols per request, then merged back into the cache (or
+    downloaded in full when the overlap bar shows the history was re-adjusted).
+    Args:
+        tickers (list): Stock ticker symbols.
+        period (str): The time period to return for each ticker ('2y', 'max', etc.).
+        backend (callable, optional): Batch backend (see modules.batch_download),
+            defaults to the first provider in the chain that has one (yfinance by
+            default, local files with a local provider). Without any, only fresh
+            cached data is returned and callers fetch the rest per ticker.
+        batch_size (int): Symbols per request.
+        use_cache (bool): Read/refresh the on-disk price cache.
+    Returns:
+        dict: {ticker: pd.DataFrame with ['Open', 'High', 'Low', 'Close', 'Volume']}.
+              Tickers that could not be fetched are left out.
+    """
+    backend = backend or get_provider_chain().batch_backend()
+    store = get_price_store() if use_cache else None
+    tickers = list(tickers)
+    
+    histories = {}
+    full_downloads = []
+    refreshes = {}  # ticker -> cached history
+    
+    for ticker in tickers:
+        cached = store.load(ticker) if store else None
+        if cached is None or cached.empty:
+            full_downloads.append(ticker)
+        elif store.needs_refresh(ticker, cached):
+            refreshes[ticker] = cached
+        else:
+            histories[ticker] = cached
+    
+    if backend is None:
+        full_downloads, refreshes = [], {}
+    requested = set(full_downloads) | set(refreshes)
+    
+    # Incremental refresh: one request per chunk from the earliest overlap bar
+    # (see PriceStore.refresh_start); re-adjusted histories join the full downloads
+    stale_tickers = list(refreshes)
+    for chunk in chunked(stale_tickers, batch_size):
+        start = min(store.refresh_start(refreshes[ticker]) for ticker in chunk)
         try:
-            # Initialize Defeat Beta Ticker
-            ticker = Ticker(stock_ticker)
-            
-            # Fetch price data (automatically gets full historical data)
-            # Force fresh data by not using cache
-            data = ticker.price()
-            
-            if data.empty:
-                raise ValueError(f"No data found for ticker {stock_ticker}.")
-            
-            # Rename columns to match expected format
-            data = data.rename(columns={
-                'open': 'Open',
-                'high': 'High',
-                'low': 'Low',
-                'close': 'Close',
-                'volume': 'Volume',
-                'report_date': 'Date'
-            })
-            
-            # Set Date as index
-            if 'Date' in data.columns:
-                data['Date'] = pd.to_datetime(data['Date'])
-                data = data.set_index('Date')
-            
-            # Sort by date (ascending)
-            data = data.sort_index()
-            
-            # Filter based on period
-            if period == "2y":
-                two_years_ago = datetime.now() - timedelta(days=730)
-                data = data[data.index >= two_years_ago]
-            
-            # Check data freshness and warn if stale
-            if not data.empty:
-                latest_date = data.index[-1].date() if hasattr(data.index[-1], 'date') else data.index[-1]
-                today = datetime.now().date()
-                days_old = (today - latest_date).days
-                if days_old > 3:
-                    print(f"⚠️ defeatbeta-api data is {days_old} days old, trying yfinance for fresher data...")
-                    raise ValueError("Data too old, trying yfinance")
-            
-            return data[['Open', 'High', 'Low', 'Close', 'Volume']]
-        
+            frames = split_batch_frame(backend(chunk, start=start), chunk)
+        except Exception as e:
+            print(f"Batch refresh failed for {len(chunk)} tickers, serving cached data: {e}")
+            frames = {}
+        for ticker in chunk:
+            if ticker in frames and store.adjustment_changed(refreshes[ticker], frames[ticker]):
+                print(f"Price history of {ticker} was re-adjusted, downloading it again")
+                full_downloads.append(ticker)
+                histories[ticker] = refreshes[ticker]
+            elif ticker in frames:
+                histories[ticker] = store.merge(ticker, refreshes[ticker], frames[ticker])
+            else:
+                store.mark_checked(ticker)
+                histories[ticker] = refreshes[ticker]
+    
+    # Full histories for tickers we have never seen (the cache keeps everything)
+    for chunk in chunked(full_downloads, batch_size):
+        try:
+            frames = split_batch_frame(backend(chunk, period="max" if store else period), chunk)
         except Exception as e:
-            print(f"defeatbeta-api failed, falling back to yfinance: {e}")
+            print(f"Batch download failed for {len(chunk)} tickers: {e}")
+            continue
+        for ticker, data in frames.items():
+            histories[ticker] = store.merge(ticker, None, data) if store else normalize_ohlcv(data)
+    
+    results = {}
+    for ticker in tickers:
+        if ticker not in histories:
+            # Only worth reporting if the batch download was asked for it
+            if ticker in requested:
+                print(f"No batch data for {ticker}")
+            continue
+        try:
+            results[ticker] = PriceStore.slice_period(ticker, histories[ticker], period) if store else histories[ticker]
+        except ValueError as ve:
+            print(str(ve))
     
-    # Fallback to yfinance
+    return results
+
+
+def _download_stock_history(stock_ticker, period="max", interval="1d", start=None):
+    """
+    Download historical stock data through the provider chain (modules.providers).
+    Intraday intervals are only available from yfinance.
+    Args:
+        stock_ticker (str): The stock ticker symbol.
+        period (str): The time period for the data ('max', '2y', etc.).
+        interval (str): The interval for the data (only '1d' supported).
+        start (datetime, optional): Only return bars from this date onwards (overrides period).
+    Returns:
+        pd.DataFrame: A DataFrame containing stock data with columns ['Open', 'High', 'Low', 'Close', 'Volume'].
+    """
+    if interval != "1d":
+        return _download_yfinance(stock_ticker, period, interval, start=start)
+    
+    # Providers in order (Defeat Beta, then yfinance by default), skipping lagging ones
+    return get_provider_chain().fetch(stock_ticker, period, start=start)
+
+
+def _download_defeatbeta(stock_ticker, period="max", start=None):
+    """
+    Download daily history from Defeat Beta API.
+    
+    Raises ValueError when there is no data (also after the start / period filter),
+    and StaleDataError (a ValueError) when the data is more than MAX_DATA_AGE_DAYS old
+    or ends before `start` (the cache already holds newer bars).
+    """
+    # Initialize Defeat Beta Ticker
+    ticker = optional_import('defeatbeta_api.data.ticker').Ticker(stock_ticker)
+    
+    # Fetch price data (automatically gets full historical data)
+    # Force fresh data by not using cache
+    data = ticker.price()
+    
+    if data.empty:
+        raise ValueError(f"No data found for ticker {stock_ticker}.")
+    
+    # Rename columns to match expected format
+    data = data.rename(columns={
+        'open': 'Open',
+        'high': 'High',
+        'low': 'Low',
+        'close': 'Close',
+        'volume': 'Volume',
+        'report_date': 'Date'
+    })
+    
+    # Set Date as index
+    if 'Date' in data.columns:
+        data['Date'] = pd.to_datetime(data['Date'])
+        data = data.set_index('Date')
+    
+    # Sort by date (ascending)
+    data = data.sort_index()
+    
+    # Check data freshness on the whole history (before any start / period filter)
+    latest_date = data.index[-1].date() if hasattr(data.index[-1], 'date') else data.index[-1]
+    today = datetime.now().date()
+    days_old = (today - latest_date).days
+    if days_old > MAX_DATA_AGE_DAYS:
+        print(f"⚠️ defeatbeta-api data is {days_old} days old, trying yfinance for fresher data...")
+        raise StaleDataError("Data too old, trying yfinance", latest_date=data.index[-1])
+    
+    # Filter based on start date / period
+    if start is not None:
+        if data.index[-1] < pd.Timestamp(start):
+            # An incremental refresh from a cache that is ahead of this source
+            raise StaleDataError(f"defeatbeta-api data for {stock_ticker} ends on {latest_date}, "
+                                 f"before {pd.Timestamp(start).date()}", latest_date=data.index[-1])
+        data = data[data.index >= pd.Timestamp(start)]
+    elif period == "2y":
+        two_years_ago = datetime.now() - timedelta(days=730)
+        data = data[data.index >= two_years_ago]
+    
+    if data.empty:
+        raise ValueError(f"No data found for ticker {stock_ticker}.")
+    
+    return data[['Open', 'High', 'Low', 'Close', 'Volume']]
+
+
+def _download_yfinance(stock_ticker, period="max", interval="1d", start=None):
+    """Download history from yfinance."""
     try:
         import yfinance as yf
     except ImportError:
-        # Try to install yfinance if not available
-        import subprocess
-        subprocess.check_call(['pip', 'install', 'yfinance', '--break-system-packages'])
-        import yfinance as yf
+        raise Exception("yfinance is not installed; install it or configure another "
+                        "market-data provider (TRENDLY_PROVIDERS, see modules.providers)")
     
     try:
         ticker = yf.Ticker(stock_ticker)
         # Add prepost=True to get pre/post market data, auto_adjust=True for adjusted prices
-        data = ticker.history(period=period, interval=interval, auto_adjust=True, prepost=False)
+        if start is not None:
+            data = ticker.history(start=start, interval=interval, auto_adjust=True, prepost=False)
+        else:
+            data = ticker.history(period=period, interval=interval, auto_adjust=True, prepost=False)
         
         if data.empty:
             raise ValueError(f"No data found for ticker {stock_ticker}.")
@@ -151,11 +300,18 @@ def engineer_features(stock_data):
     5. Volume Indicators - OBV, Volume Oscillator
     6. Pattern Recognition - Support/Resistance levels
     
+    For many tickers at once, modules.panel_features computes the same features
+    as 2-D NumPy operations over a (dates x tickers) panel. To add one new bar to
+    an existing history, modules.streaming_features.StreamingFeatures produces the
+    same row in O(1) without recomputing the history.
+    
     Args:
         stock_data (pd.DataFrame): Historical stock data with OHLCV columns
     Returns:
         pd.DataFrame: Enhanced dataframe with advanced engineered features
     """
+    import ta  # Technical Analysis library
+    
     df = stock_data.copy()
     
     # 1. PAST PRICES (Memory of the Market)
@@ -346,8 +502,8 @@ def calculate_exit_timing(forecast, current_price, indicators):
         # If declining more than 60% of the time and losing value
         if decline_ratio > 0.6 and total_decline_pct > 2.0:
             # Check technical indicators for confirmation
-            rsi = indicators.get('RSI_14', 50) if indicators else 50
-            macd = indicators.get('MACD_Diff', 0) if indicators else 0
+            rsi = indicators.get('RSI_14', 50) if indicators is not None else 50
+            macd = indicators.get('MACD_Diff', 0) if indicators is not None else 0
             
             confidence_factors = [40]  # Base confidence
             
@@ -593,6 +749,68 @@ def calculate_investment_score(predicted_return, current_price, ma_5, ma_10, ma_
     return round(total_score, 1), breakdown
 
 
+def calculate_investment_score_batch(predicted_return, current_price, ma_5, ma_10, ma_20,
+                                      volatility, volume_ratio, rsi, macd_diff, bb_position,
+                                      ma_50, ma_200, model_confidence):
+    """
+    Vectorised calculate_investment_score over arrays (one element per stock-day).
+    
+    Applies exactly the same point rules as calculate_investment_score; NaN inputs
+    score like they do there (no points for that rule). Used by the backtester to
+    score every day of every ticker at once.
+    
+    Args:
+        Same as calculate_investment_score, as equal-length arrays / Series
+    
+    Returns:
+        np.ndarray: Total score per element (rounded to 0.1)
+    """
+    r, price = np.asarray(predicted_return, dtype=float), np.asarray(current_price, dtype=float)
+    ma_5, ma_10, ma_20 = (np.asarray(x, dtype=float) for x in (ma_5, ma_10, ma_20))
+    ma_50, ma_200 = np.asarray(ma_50, dtype=float), np.asarray(ma_200, dtype=float)
+    volatility, volume_ratio = np.asarray(volatility, dtype=float), np.asarray(volume_ratio, dtype=float)
+    rsi, macd_diff = np.asarray(rsi, dtype=float), np.asarray(macd_diff, dtype=float)
+    bb = np.asarray(bb_position, dtype=float)
+    
+    return_score = np.select(
+        [r >= 5.0, r >= 3.0, r >= 2.0, r >= 1.0, r >= 0.5, r > 0, r > -0.5, r > -1.0],
+        [40, 38, 35, 30, 22, 12, 5, 2], 0
+    )
+    
+    trend_score = 6 * ((price > ma_5).astype(int) + (price > ma_10) + (price > ma_20))
+    trend_score = trend_score + np.select(
+        [(ma_50 > ma_200) & (price > ma_50), ma_50 > ma_200, (ma_50 < ma_200) & (price > ma_50)],
+        [12, 6, 3], -3
+    )
+    trend_score = np.maximum(0, trend_score)
+    
+    risk_score = np.select(
+        [volatility < 1.0, volatility < 1.5, volatility < 2.5, volatility < 4.0], [15, 12, 8, 4], 0
+    )
+    volume_score = np.select(
+        [volume_ratio > 2.0, volume_ratio > 1.5, volume_ratio > 1.2, volume_ratio > 1.0, volume_ratio > 0.8],
+        [10, 8, 6, 4, 2], 0
+    )
+    
+    technical_score = np.select(
+        [(rsi >= 40) & (rsi <= 60), (rsi >= 30) & (rsi < 40), (rsi > 60) & (rsi <= 70),
+         (rsi >= 20) & (rsi < 30), (rsi > 70) & (rsi <= 80)],
+        [6, 5, 4, 3, 2], 0
+    )
+    technical_score = technical_score + np.select(
+        [macd_diff > 0.5, macd_diff > 0, macd_diff > -0.5, macd_diff > -1.0], [5, 4, 2, 1], 0
+    )
+    technical_score = technical_score + np.select(
+        [(bb >= 0.3) & (bb <= 0.7), (bb >= 0.1) & (bb < 0.3), (bb > 0.7) & (bb <= 0.9), bb < 0.1],
+        [4, 3, 2, 2], 0
+    )
+    
+    confidence_score = np.asarray(model_confidence, dtype=float) * 10
+    
+    total_score = return_score + trend_score + risk_score + volume_score + technical_score + confidence_score
+    return np.round(total_score, 1)
+
+
 def get_investment_recommendation(score, predicted_return=None):
     """
     Convert investment score to clear recommendation with focus on predicted returns.
@@ -629,6 +847,28 @@ def get_investment_recommendation(score, predicted_return=None):
             return "❌ Avoid", "SELL", "red"
 
 
+def get_investment_recommendation_batch(score, predicted_return):
+    """
+    Vectorised get_investment_recommendation.
+    
+    Args:
+        score (array-like): Investment scores
+        predicted_return (array-like): Predicted return percentages
+    
+    Returns:
+        np.ndarray: Recommendation label per element ('STRONG BUY', 'BUY', ...)
+    """
+    score, predicted_return = np.asarray(score, dtype=float), np.asarray(predicted_return, dtype=float)
+    rising = predicted_return > 0
+    return np.select(
+        [rising & (score >= 70), rising & (score >= 55), rising & (score >= 40),
+         rising & (score >= 30), rising,
+         score >= 70, score >= 50, score >= 30],
+        ['STRONG BUY', 'BUY', 'CONSIDER BUY', 'HOLD', 'CAUTIOUS', 'BUY', 'HOLD', 'CAUTIOUS'],
+        'SELL'
+    )
+
+
 def prepare_ml_features(df, lookback=60):
     """
     Prepare features for machine learning models with proper lookback window.
@@ -653,81 +893,165 @@ def prepare_ml_features(df, lookback=60):
         'MA_5_10_Cross', 'MA_50_200_Cross'
     ]
     
-    # Create target: Next day's return
-    df['Target'] = df['Close'].shift(-1)
+    # Create target: Next day's return (without modifying the caller's frame)
+    df_clean = df[feature_columns].assign(Target=df['Close'].shift(-1), Close=df['Close'])
     
     # Remove rows with NaN values
-    df_clean = df[feature_columns + ['Target', 'Close']].dropna()
+    df_clean = df_clean.dropna()
     
     if len(df_clean) < lookback:
         raise ValueError(f"Not enough data after feature engineering. Need at least {lookback} days.")
     
-    X = df_clean[feature_columns].values
+    # Always float64: compact scans (modules.compact) prepare X from full frames
+    X = df_clean[feature_columns].to_numpy(dtype=float)
     y = df_clean['Target'].values
     
     return X, y, feature_columns, df_clean['Close'].values
 
 
-def train_ensemble_models(X_train, y_train):
+# Hyperparameters for each ensemble member (n_jobs is added at fit time from MODEL_N_JOBS)
+ENSEMBLE_PARAMS = {
+    # 1. Random Forest - Handles non-linear patterns well (ENHANCED)
+    'RandomForest': {
+        'n_estimators': 200,  # Increased from 100
+        'max_depth': 15,  # Increased from 10
+        'min_samples_split': 3,  # Reduced from 5 for better learning
+        'min_samples_leaf': 1,  # Reduced from 2 for finer patterns
+        'max_features': 'sqrt',  # Better feature selection
+        'random_state': 42,
+        'bootstrap': True,
+        'oob_score': True  # Out-of-bag score for validation
+    },
+    # 2. Gradient Boosting - Sequential error correction (ENHANCED)
+    'GradientBoosting': {
+        'n_estimators': 200,  # Increased from 100
+        'max_depth': 6,  # Increased from 5
+        'learning_rate': 0.05,  # Reduced for better convergence
+        'min_samples_split': 3,  # Reduced from 5
+        'min_samples_leaf': 1,  # Reduced from 2
+        'subsample': 0.8,  # Add subsample for regularization
+        'max_features': 'sqrt',  # Better feature selection
+        'random_state': 42
+    },
+    # 3. XGBoost - State-of-the-art gradient boosting (if available)
+    'XGBoost': {
+        'n_estimators': 200,
+        'max_depth': 7,
+        'learning_rate': 0.05,
+        'subsample': 0.8,
+        'colsample_bytree': 0.8,
+        'gamma': 0.1,  # Minimum loss reduction
+        'reg_alpha': 0.1,  # L1 regularization
+        'reg_lambda': 1.0,  # L2 regularization
+        'min_child_weight': 1,
+        'random_state': 42,
+        'tree_method': 'hist',  # Faster training
+        'early_stopping_rounds': 10
+    }
+}
+
+
+# Named amounts of work for generate_investment_analysis:
+#   members       ensemble members to train (XGBoost only if installed)
+#   n_estimators  trees / boosting stages per member (None: as in ENSEMBLE_PARAMS)
+#   test_metrics  AutoReg test-set predictions and per-model MAE / R² on the test split
+#   payload       'full' analysis dict, or 'summary': only the fields used for ranking
+#                 (no multi-day ML rollout, peak detection or exit timing)
+ANALYSIS_PROFILES = {
+    # Detail view: every model, every metric, every series
+    'deep': {
+        'members': ('RandomForest', 'GradientBoosting', 'XGBoost'),
+        'n_estimators': None,
+        'test_metrics': True,
+        'payload': 'full'
+    },
+    # Universe scan: the two cheapest members with fewer stages, only the ranking fields
+    'scan-lite': {
+        'members': ('GradientBoosting', 'XGBoost'),
+        'n_estimators': 60,
+        'test_metrics': False,
+        'payload': 'summary'
+    }
+}
+
+def get_analysis_profile(profile):
+    """
+    Settings of a named analysis profile.
+    
+    Args:
+        profile (str): Key of ANALYSIS_PROFILES ('deep' or 'scan-lite')
+    
+    Returns:
+        dict: The profile's settings
+    """
+    if profile not in ANALYSIS_PROFILES:
+        raise ValueError(f"Unknown analysis profile '{profile}', "
+                         f"expected one of: {', '.join(ANALYSIS_PROFILES)}")
+    return ANALYSIS_PROFILES[profile]
+
+
+def profile_ensemble_params(profile):
+    """
+    Ensemble hyperparameters for an analysis profile (its members and estimator counts).
+    
+    If XGBoost is not installed and that would leave fewer than two members, a
+    RandomForest / GradientBoosting member takes its place, so model agreement
+    still feeds the confidence.
+    
+    Args:
+        profile (str): Key of ANALYSIS_PROFILES
+    
+    Returns:
+        dict: Per-model hyperparameters in the ENSEMBLE_PARAMS format
+    """
+    settings = get_analysis_profile(profile)
+    members = list(settings['members'])
+    if 'XGBoost' in members and not xgboost_available() and len(members) <= 2:
+        members += [name for name in ('RandomForest', 'GradientBoosting') if name not in members][:1]
+    
+    params = {}
+    for name, member_params in ENSEMBLE_PARAMS.items():
+        if name in members:
+            if settings['n_estimators'] is not None:
+                member_params = {**member_params, 'n_estimators': settings['n_estimators']}
+            params[name] = member_params
+    return params
+
+
+def train_ensemble_models(X_train, y_train, params=None):
     """
     Train ensemble of ML models for better prediction accuracy.
     
     Args:
         X_train: Training features
         y_train: Training targets
+        params (dict, optional): Per-model hyperparameters, defaults to ENSEMBLE_PARAMS.
+            Only the models it lists are trained (see profile_ensemble_params).
     
     Returns:
         dict: Dictionary of trained models with their names
     """
+    from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+    
+    params = params or ENSEMBLE_PARAMS
     models = {}
+    xgb = optional_import('xgboost') if 'XGBoost' in params else None
     
-    # 1. Random Forest - Handles non-linear patterns well (ENHANCED)
-    rf_model = RandomForestRegressor(
-        n_estimators=200,  # Increased from 100
-        max_depth=15,  # Increased from 10
-        min_samples_split=3,  # Reduced from 5 for better learning
-        min_samples_leaf=1,  # Reduced from 2 for finer patterns
-        max_features='sqrt',  # Better feature selection
-        random_state=42,
-        n_jobs=-1,
-        bootstrap=True,
-        oob_score=True  # Out-of-bag score for validation
-    )
-    rf_model.fit(X_train, y_train)
-    models['RandomForest'] = rf_model
+    if 'RandomForest' in params:
+        with span("RandomForest"):
+            rf_model = RandomForestRegressor(n_jobs=MODEL_N_JOBS, **params['RandomForest'])
+            rf_model.fit(X_train, y_train)
+        models['RandomForest'] = rf_model
     
-    # 2. Gradient Boosting - Sequential error correction (ENHANCED)
-    gb_model = GradientBoostingRegressor(
-        n_estimators=200,  # Increased from 100
-        max_depth=6,  # Increased from 5
-        learning_rate=0.05,  # Reduced for better convergence
-        min_samples_split=3,  # Reduced from 5
-        min_samples_leaf=1,  # Reduced from 2
-        subsample=0.8,  # Add subsample for regularization
-        max_features='sqrt',  # Better feature selection
-        random_state=42
-    )
-    gb_model.fit(X_train, y_train)
-    models['GradientBoosting'] = gb_model
+    if 'GradientBoosting' in params:
+        with span("GradientBoosting"):
+            gb_model = GradientBoostingRegressor(**params['GradientBoosting'])
+            gb_model.fit(X_train, y_train)
+        models['GradientBoosting'] = gb_model
     
-    # 3. XGBoost - State-of-the-art gradient boosting (if available)
-    if XGBOOST_AVAILABLE:
+    if xgb is not None:
         try:
-            xgb_model = xgb.XGBRegressor(
-                n_estimators=200,
-                max_depth=7,
-                learning_rate=0.05,
-                subsample=0.8,
-                colsample_bytree=0.8,
-                gamma=0.1,  # Minimum loss reduction
-                reg_alpha=0.1,  # L1 regularization
-                reg_lambda=1.0,  # L2 regularization
-                min_child_weight=1,
-                random_state=42,
-                n_jobs=-1,
-                tree_method='hist',  # Faster training
-                early_stopping_rounds=10
-            )
+            xgb_model = xgb.XGBRegressor(n_jobs=MODEL_N_JOBS, **params['XGBoost'])
             
             # Split training data for early stopping
             split_idx = int(len(X_train) * 0.9)
@@ -736,30 +1060,167 @@ def train_ensemble_models(X_train, y_train):
             X_val = X_train[split_idx:]
             y_val = y_train[split_idx:]
             
-            xgb_model.fit(
-                X_train_fit, y_train_fit,
-                eval_set=[(X_val, y_val)],
-                verbose=False
-            )
+            with span("XGBoost"):
+                xgb_model.fit(
+                    X_train_fit, y_train_fit,
+                    eval_set=[(X_val, y_val)],
+                    verbose=False
+                )
             models['XGBoost'] = xgb_model
         except Exception as e:
             print(f"XGBoost model training failed: {e}")
-            print("Continuing with RandomForest and GradientBoosting")
+            print(f"Continuing with {' and '.join(models)}")
     
     return models
 
 
-def ensemble_predict(models, X_test, weights=None):
+# Incremental retraining policy for cached ensembles
+INCREMENTAL_TRAINING = {
+    'new_estimators': 20,     # Trees / boosting stages added per model on each update
+    'refit_every': 20,        # Full refit after this many incremental updates
+    'drift_threshold': 0.5    # Full refit if any feature mean moves > 0.5 std
+}
+
+
+def fit_ensemble_artifacts(X_train, y_train, data_end=None, params=None):
     """
-    Make ensemble predictions by combining multiple models with optimized weighting.
+    Fit the feature scaler and ensemble models from scratch.
     
     Args:
-        models (dict): Dictionary of trained models
-        X_test: Test features
-        weights (dict, optional): Weights for each model
+        X_train: Training features (unscaled)
+        y_train: Training targets
+        data_end: Last date of the data the models were trained on
+        params (dict, optional): Per-model hyperparameters, defaults to ENSEMBLE_PARAMS
     
     Returns:
-        tuple: (ensemble_prediction, individual_predictions, confidence)
+        dict: {'scaler', 'models', 'drift_scaler', 'n_updates', 'data_end'}
+    """
+    from sklearn.preprocessing import StandardScaler
+    
+    scaler = StandardScaler()
+    models = train_ensemble_models(scaler.fit_transform(X_train), y_train, params=params)
+    
+    # Separate copy whose statistics keep updating as new bars arrive
+    drift_scaler = StandardScaler().fit(X_train)
+    
+    return {
+        'scaler': scaler,
+        'models': models,
+        'drift_scaler': drift_scaler,
+        'n_updates': 0,
+        'data_end': data_end
+    }
+
+
+def update_ensemble_models(models, X_train, y_train, n_new_estimators=None):
+    """
+    Grow already-fitted ensemble models on updated training data instead of refitting.
+    
+    - RandomForest: warm_start adds n_new_estimators trees grown on the new data
+    - GradientBoosting: warm_start adds n_new_estimators boosting stages
+    - XGBoost: continues boosting from the previous booster
+    
+    Args:
+        models (dict): Models from train_ensemble_models (updated in place)
+        X_train: Scaled training features including the new bars
+        y_train: Training targets including the new bars
+        n_new_estimators (int, optional): Trees/stages to add per model
+    
+    Returns:
+        dict: The updated models
+    """
+    n_new = n_new_estimators or INCREMENTAL_TRAINING['new_estimators']
+    
+    for name in ('RandomForest', 'GradientBoosting'):
+        if name in models:
+            model = models[name]
+            model.set_params(warm_start=True, n_estimators=model.n_estimators + n_new)
+            with span(name):
+                model.fit(X_train, y_train)
+    
+    if 'XGBoost' in models:
+        try:
+            import xgboost as xgb
+            previous = models['XGBoost']
+            xgb_model = xgb.XGBRegressor(**{**previous.get_params(), 'n_estimators': n_new,
+                                            'n_jobs': MODEL_N_JOBS})
+            
+            # Same early-stopping split as in train_ensemble_models
+            split_idx = int(len(X_train) * 0.9)
+            with span("XGBoost"):
+                xgb_model.fit(
+                    X_train[:split_idx], y_train[:split_idx],
+                    eval_set=[(X_train[split_idx:], y_train[split_idx:])],
+                    xgb_model=previous.get_booster(),
+                    verbose=False
+                )
+            models['XGBoost'] = xgb_model
+        except Exception as e:
+            print(f"XGBoost incremental update failed, keeping previous booster: {e}")
+    
+    return models
+
+
+def feature_drift(reference_scaler, current_scaler):
+    """
+    Largest shift of a feature mean, measured in reference standard deviations.
+    
+    Args:
+        reference_scaler (StandardScaler): Statistics the models were trained with
+        current_scaler (StandardScaler): Statistics including the newest bars
+    
+    Returns:
+        float: max |mean_current - mean_reference| / std_reference over all features
+    """
+    scale = np.where(reference_scaler.scale_ > 0, reference_scaler.scale_, 1.0)
+    return float(np.max(np.abs(current_scaler.mean_ - reference_scaler.mean_) / scale))
+
+
+def refresh_ensemble_artifacts(artifacts, X_train, y_train, X_new, data_end=None, params=None):
+    """
+    Bring cached ensemble artifacts up to date with newly arrived bars.
+    
+    The drift scaler's statistics are updated incrementally with the new rows. The
+    models are then grown with update_ensemble_models, unless the refit schedule is
+    due or the features drifted too far, in which case everything is refit from
+    scratch. The scaler that feeds the models stays frozen between full refits,
+    since the existing trees were grown on its scale.
+    
+    Args:
+        artifacts (dict): Output of fit_ensemble_artifacts (or a previous refresh)
+        X_train: Training features (unscaled) including the new bars
+        y_train: Training targets including the new bars
+        X_new: Feature rows (unscaled) added since the artifacts were fitted. These
+            are the newest rows of the full feature matrix, which with a train/test
+            split lie after X_train rather than at its end
+        data_end: Last date of the updated data
+        params (dict, optional): Hyperparameters for a full refit, defaults to ENSEMBLE_PARAMS
+    
+    Returns:
+        tuple: (artifacts, mode) with mode 'warm' or 'refit'
+    """
+    drift_scaler = artifacts['drift_scaler']
+    if len(X_new) > 0:
+        drift_scaler.partial_fit(X_new)
+    
+    drift = feature_drift(artifacts['scaler'], drift_scaler)
+    refit_due = artifacts['n_updates'] + 1 >= INCREMENTAL_TRAINING['refit_every']
+    
+    if refit_due or drift > INCREMENTAL_TRAINING['drift_threshold']:
+        return fit_ensemble_artifacts(X_train, y_train, data_end=data_end, params=params), 'refit'
+    
+    X_train_scaled = artifacts['scaler'].transform(X_train)
+    artifacts['models'] = update_ensemble_models(artifacts['models'], X_train_scaled, y_train)
+    artifacts['n_updates'] += 1
+    artifacts['data_end'] = data_end
+    return artifacts, 'warm'
+
+
+def _resolve_ensemble_weights(models, weights=None):
+    """
+    Weight for each model in `models` order (see ensemble_predict for the defaults).
+    
+    Models missing from `weights` share the weight not yet assigned at that point.
     """
     if weights is None:
         # Optimized weights based on typical model performance
@@ -777,24 +1238,39 @@ def ensemble_predict(models, X_test, weights=None):
                 'GradientBoosting': 0.45
             }
     
-    predictions = {}
-    for name, model in models.items():
-        predictions[name] = model.predict(X_test)
-    
-    # Weighted ensemble
-    ensemble_pred = np.zeros(len(X_test))
+    resolved = []
     total_weight = 0
-    for name, pred in predictions.items():
+    for name in models:
         if name in weights:
-            ensemble_pred += predictions[name] * weights[name]
+            resolved.append(weights[name])
             total_weight += weights[name]
         else:
             # If model not in weights dict, use equal weight
             remaining_weight = 1.0 - total_weight
-            ensemble_pred += predictions[name] * (remaining_weight / (len(models) - len(weights)))
+            resolved.append(remaining_weight / (len(models) - len(weights)))
     
-    # Calculate confidence based on prediction agreement
-    pred_matrix = np.array(list(predictions.values()))
+    # Renormalise when only some members were trained (e.g. a scan-lite ensemble)
+    resolved = np.array(resolved)
+    total = resolved.sum()
+    return resolved / total if total > 0 else resolved
+
+
+def _direction_agreement(pred_matrix):
+    """Per-row share of models agreeing on the sign of the prediction (0-1)."""
+    return np.abs(np.mean(np.sign(pred_matrix), axis=0))
+
+
+def aggregate_confidence(pred_matrix, ensemble_pred):
+    """
+    Single confidence value (0-1) for a set of ensemble predictions.
+    
+    Args:
+        pred_matrix (np.ndarray): Predictions with one row per model
+        ensemble_pred (np.ndarray): Weighted ensemble prediction per sample
+    
+    Returns:
+        float: Confidence based on model agreement across all samples
+    """
     std_dev = np.std(pred_matrix, axis=0)
     avg_std = np.mean(std_dev)
     
@@ -803,41 +1279,174 @@ def ensemble_predict(models, X_test, weights=None):
     confidence = np.clip(1 - (avg_std / max_expected_std), 0, 1)
     
     # Boost confidence if all models agree on direction
-    if len(predictions) >= 2 and len(ensemble_pred) > 0:
+    if len(pred_matrix) >= 2 and len(ensemble_pred) > 0:
         try:
-            # Calculate direction agreement (all models predict up or down)
-            pred_directions = []
-            for pred in predictions.values():
-                pred_directions.append(np.sign(pred))
-            pred_signs = np.array(pred_directions)
-            agreement = np.mean(np.abs(np.mean(pred_signs, axis=0)))
+            agreement = np.mean(_direction_agreement(pred_matrix))
             confidence = confidence * 0.7 + agreement * 0.3  # Blend agreement into confidence
         except Exception:
             pass  # If direction calculation fails, just use base confidence
     
+    return confidence
+
+
+def ensemble_predict(models, X_test, weights=None):
+    """
+    Make ensemble predictions by combining multiple models with optimized weighting.
+    
+    Args:
+        models (dict): Dictionary of trained models
+        X_test: Test features
+        weights (dict, optional): Weights for each model
+    
+    Returns:
+        tuple: (ensemble_prediction, individual_predictions, confidence)
+    """
+    predictions = {}
+    for name, model in models.items():
+        predictions[name] = model.predict(X_test)
+    
+    # Weighted ensemble
+    pred_matrix = np.array(list(predictions.values()))
+    ensemble_pred = _resolve_ensemble_weights(models, weights) @ pred_matrix
+    
+    # Calculate confidence based on prediction agreement
+    confidence = aggregate_confidence(pred_matrix, ensemble_pred)
+    
     return ensemble_pred, predictions, confidence
 
 
-def generate_investment_analysis(stock_ticker, forecast_days=30):
+def ensemble_predict_batch(models, X, index=None, weights=None):
     """
-    Generate comprehensive investment analysis with advanced ML ensemble prediction and scoring.
-    Uses multiple models (AutoReg, RandomForest, GradientBoosting) for robust predictions.
+    Batched ensemble inference over a stacked feature matrix (many tickers or rows).
+    
+    Each model's predict runs once over all rows. The weighted ensemble and the
+    agreement/confidence statistics are computed per row, fully vectorised.
+    
+    Args:
+        models (dict): Dictionary of trained models
+        X: Stacked features, one row per ticker / sample
+        index (list, optional): Row labels such as tickers (default: 0..n-1)
+        weights (dict, optional): Weights for each model
     
     Returns:
-        dict: Complete analysis including predictions, scores, and recommendations
+        pd.DataFrame: Indexed by `index`, with one column of predictions per model plus
+                      'ensemble', 'std', 'agreement' and 'confidence' (0-1) per row
     """
+    pred_matrix = np.array([model.predict(X) for model in models.values()])
+    ensemble_pred = _resolve_ensemble_weights(models, weights) @ pred_matrix
+    
+    std_dev = np.std(pred_matrix, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        confidence = np.clip(1 - std_dev / (np.abs(ensemble_pred) * 0.08), 0, 1)
+    confidence = np.nan_to_num(confidence)
+    agreement = _direction_agreement(pred_matrix)
+    if len(pred_matrix) >= 2:
+        confidence = confidence * 0.7 + agreement * 0.3
+    
+    result = pd.DataFrame(dict(zip(models, pred_matrix)), index=index)
+    result['ensemble'] = ensemble_pred
+    result['std'] = std_dev
+    result['agreement'] = agreement
+    result['confidence'] = confidence
+    return result
+
+
+def build_reasons(predicted_return, latest_data, ml_success, final_confidence):
+    """
+    Explain an investment score in a few human-readable signals.
+    
+    Args:
+        predicted_return (float): Predicted return percentage
+        latest_data (pd.Series): Latest row of engineered features
+        ml_success (bool): Whether the ML ensemble produced the prediction
+        final_confidence (float): Model confidence (0-1)
+    
+    Returns:
+        list: Reason strings, most important first
+    """
+    reasons = []
+    
+    # Prediction-based reasons
+    if predicted_return > 1.5:
+        reasons.append(f"📈 Strong predicted return (+{predicted_return:.2f}%)")
+    elif predicted_return > 0:
+        reasons.append(f"📊 Positive predicted return (+{predicted_return:.2f}%)")
+    elif predicted_return < -1.0:
+        reasons.append(f"📉 Negative predicted return ({predicted_return:.2f}%)")
+    
+    # Trend-based reasons
+    if latest_data['Price_Above_MA20'] and latest_data['Price_Above_MA50']:
+        reasons.append("🔼 Strong upward trend (above key MAs)")
+    elif latest_data['MA_50_200_Cross'] == 1:
+        reasons.append("⭐ Golden Cross detected (MA50 > MA200)")
+    
+    # RSI-based reasons
+    if 'RSI_14' in latest_data:
+        rsi_val = latest_data['RSI_14']
+        if rsi_val < 30:
+            reasons.append(f"💎 RSI Oversold ({rsi_val:.1f}) - potential bounce")
+        elif rsi_val > 70:
+            reasons.append(f"⚠️ RSI Overbought ({rsi_val:.1f}) - caution")
+        elif 40 <= rsi_val <= 60:
+            reasons.append(f"✅ RSI Neutral ({rsi_val:.1f}) - healthy")
+    
+    # MACD-based reasons
+    if 'MACD_Diff' in latest_data and latest_data['MACD_Diff'] > 0:
+        reasons.append("⚡ MACD bullish momentum")
+    
+    # Volatility-based reasons
+    if latest_data['Volatility_10'] < 1.5:
+        reasons.append(f"🛡️ Low volatility ({latest_data['Volatility_10']:.2f}%) - stable")
+    elif latest_data['Volatility_10'] > 4.0:
+        reasons.append(f"⚠️ High volatility ({latest_data['Volatility_10']:.2f}%) - risky")
+    
+    # Volume-based reasons
+    if latest_data['Volume_Ratio'] > 1.5:
+        reasons.append(f"📊 Strong volume ({latest_data['Volume_Ratio']:.2f}x avg)")
+    elif latest_data['Volume_Ratio'] < 0.7:
+        reasons.append(f"⚠️ Low volume ({latest_data['Volume_Ratio']:.2f}x avg)")
+    
+    # Bollinger Bands
+    if 'BB_Position' in latest_data:
+        bb_pos = latest_data['BB_Position']
+        if bb_pos < 0.2:
+            reasons.append("📍 Near lower Bollinger Band - oversold")
+        elif bb_pos > 0.8:
+            reasons.append("📍 Near upper Bollinger Band - overbought")
+    
+    # Model confidence
+    if ml_success and final_confidence > 0.7:
+        reasons.append(f"🎯 High model confidence ({final_confidence*100:.0f}%)")
+    elif ml_success and final_confidence < 0.4:
+        reasons.append(f"⚠️ Low model confidence ({final_confidence*100:.0f}%)")
+    
+    if not reasons:
+        reasons.append("⚠️ Mixed signals - proceed with caution")
+    
+    return reasons
+
+
+def _investment_analysis(stock_ticker, forecast_days, use_model_cache, stock_data,
+                         stock_data_enhanced, ml_features, profile):
+    """Pipeline behind generate_investment_analysis, one span per stage."""
+    settings = get_analysis_profile(profile)
+    ensemble_params = profile_ensemble_params(profile)
     try:
-        # Fetch historical data with volume
-        stock_data = fetch_stock_history(stock_ticker, period="2y")
-        
-        # Engineer advanced features
-        stock_data_enhanced = engineer_features(stock_data)
+        if stock_data_enhanced is None:
+            # Fetch historical data with volume
+            if stock_data is None:
+                with span("fetch"):
+                    stock_data = fetch_stock_history(stock_ticker, period="2y")
+            
+            # Engineer advanced features
+            with span("features"):
+                stock_data_enhanced = engineer_features(stock_data)
         
-        # Prepare close prices for AutoReg (time series)
-        close_prices = stock_data_enhanced['Close'].asfreq('D', method='ffill')
+        # Prepare close prices for AutoReg (time series), one row per trading session
+        close_prices = to_sessions(stock_data_enhanced['Close'])
         
-        # Ensure enough data
-        if len(close_prices) < 250:
+        # Ensure enough data (~250 calendar days)
+        if len(close_prices) < calendar_days_to_sessions(250):
             raise ValueError("Not enough historical data available for this stock to generate predictions.")
         
         # ========== PART 1: AutoReg Model (Time Series) ==========
@@ -845,51 +1454,107 @@ def generate_investment_analysis(stock_ticker, forecast_days=30):
         train_data_ar = close_prices.iloc[:train_size]
         test_data_ar = close_prices.iloc[train_size:]
         
-        # Fit AutoReg model
-        ar_model = AutoReg(train_data_ar, lags=min(60, len(train_data_ar) - 1)).fit()
-        
-        # Predict on test data
-        predictions_ar = ar_model.predict(start=test_data_ar.index[0], end=test_data_ar.index[-1], dynamic=False)
-        
-        # Predict future values
-        forecast_index = pd.date_range(start=test_data_ar.index[-1] + pd.Timedelta(days=1), 
-                                       periods=forecast_days, freq='D')
-        forecast_ar = ar_model.predict(start=len(close_prices), end=len(close_prices) + forecast_days - 1)
-        forecast_ar = pd.Series(forecast_ar, index=forecast_index)
+        with span("autoreg"):
+            # Fit AutoReg model (closed-form OLS, cheaper than a registry round-trip)
+            # on ~60 calendar days of lags
+            ar_lags = calendar_days_to_sessions(60)
+            ar_model = ARModel.fit(train_data_ar, lags=min(ar_lags, len(train_data_ar) - 1))
+            
+            # Predict on test data
+            predictions_ar = None
+            if settings['test_metrics']:
+                predictions_ar = ar_model.predict(start=test_data_ar.index[0], end=test_data_ar.index[-1], dynamic=False)
+            
+            # Predict future values for the next trading sessions
+            forecast_index = next_sessions(test_data_ar.index[-1], forecast_days)
+            forecast_ar = ar_model.predict(start=len(close_prices), end=len(close_prices) + forecast_days - 1)
+            forecast_ar = pd.Series(forecast_ar, index=forecast_index)
         
         # ========== PART 2: ML Ensemble Models (Feature-based) ==========
         try:
-            X, y, feature_names, close_vals = prepare_ml_features(stock_data_enhanced, lookback=60)
+            if ml_features is None:
+                with span("prepare"):
+                    ml_features = prepare_ml_features(stock_data_enhanced, lookback=60)
+            X, y, feature_names, close_vals = ml_features
             
             # Train-test split (time series aware)
             train_size_ml = int(0.85 * len(X))
             X_train, X_test = X[:train_size_ml], X[train_size_ml:]
             y_train, y_test = y[:train_size_ml], y[train_size_ml:]
             
-            # Scale features
-            scaler = StandardScaler()
-            X_train_scaled = scaler.fit_transform(X_train)
+            # Scale features and train ensemble models. With the model cache, unchanged
+            # data reloads the fitted models and new bars warm-start the previous ones.
+            with span("train"):
+                data_end = stock_data_enhanced.index[-1]
+                if use_model_cache:
+                    registry = get_model_registry()
+                    ensemble_spec = {'ensemble': ensemble_params, 'xgboost': xgboost_available()}
+                    ensemble_key = ModelRegistry.make_key(
+                        stock_ticker, 'ensemble', data_end, ensemble_spec,
+                        feature_names=feature_names, data=(X_train, y_train)
+                    )
+                    artifacts = registry.load(ensemble_key)
+                    
+                    if artifacts is None:
+                        previous = registry.latest(
+                            ModelRegistry.spec_prefix(stock_ticker, 'ensemble', ensemble_spec, feature_names),
+                            before=data_end
+                        )
+                        if previous is not None:
+                            n_new_rows = int((stock_data_enhanced.index > previous['data_end']).sum())
+                            # The newest feature rows are the tail of X (beyond the train split)
+                            X_new = X[max(len(X) - n_new_rows, 0):]
+                            artifacts, mode = refresh_ensemble_artifacts(
+                                previous, X_train, y_train, X_new, data_end=data_end,
+                                params=ensemble_params
+                            )
+                            print(f"{stock_ticker}: ensemble {mode} update with {n_new_rows} new bar(s)")
+                        else:
+                            artifacts = fit_ensemble_artifacts(X_train, y_train, data_end=data_end,
+                                                               params=ensemble_params)
+                        registry.save(ensemble_key, artifacts)
+                else:
+                    artifacts = fit_ensemble_artifacts(X_train, y_train, data_end=data_end,
+                                                       params=ensemble_params)
+            scaler = artifacts['scaler']
+            ensemble_models = artifacts['models']
             X_test_scaled = scaler.transform(X_test)
             
-            # Train ensemble models
-            ensemble_models = train_ensemble_models(X_train_scaled, y_train)
-            
-            # Make predictions on test set (for accuracy metrics)
-            ensemble_pred, test_preds, model_confidence = ensemble_predict(ensemble_models, X_test_scaled)
-            
             # For next-day prediction, use the last data point
             last_features = X[-1:].reshape(1, -1)
             last_features_scaled = scaler.transform(last_features)
-            next_day_pred_ml, _, conf = ensemble_predict(ensemble_models, last_features_scaled)
-            predicted_price_ml = next_day_pred_ml[0]
+            
+            # One batched pass over the test set (for confidence and accuracy metrics) plus the last row
+            with span("predict"):
+                batch = ensemble_predict_batch(ensemble_models, np.vstack([X_test_scaled, last_features_scaled]))
+            test_rows = batch.iloc[:-1]
+            test_preds = {name: test_rows[name].values for name in ensemble_models}
+            model_confidence = aggregate_confidence(
+                np.array(list(test_preds.values())), test_rows['ensemble'].values
+            )
+            predicted_price_ml = batch['ensemble'].iloc[-1]
             
             # Calculate model accuracy metrics using TEST set predictions (not next-day predictions!)
-            mae_rf = mean_absolute_error(y_test, test_preds['RandomForest'])
-            mae_gb = mean_absolute_error(y_test, test_preds['GradientBoosting'])
-            mae_xgb = mean_absolute_error(y_test, test_preds['XGBoost']) if 'XGBoost' in test_preds else 0
-            r2_rf = r2_score(y_test, test_preds['RandomForest'])
-            r2_gb = r2_score(y_test, test_preds['GradientBoosting'])
-            r2_xgb = r2_score(y_test, test_preds['XGBoost']) if 'XGBoost' in test_preds else 0
+            model_metrics = None
+            if settings['test_metrics']:
+                with span("metrics"):
+                    from sklearn.metrics import mean_absolute_error, r2_score
+                    model_metrics = {}
+                    for metric, score_fn, digits in (('MAE', mean_absolute_error, 2), ('R2', r2_score, 3)):
+                        for name in ENSEMBLE_PARAMS:
+                            preds = test_preds.get(name)
+                            model_metrics[f'{name}_{metric}'] = round(score_fn(y_test, preds), digits) if preds is not None else 0
+            
+            # Multi-day ML path: recursive rollout with incremental feature updates
+            # (only the full payload uses the multi-day forecast)
+            forecast_ml = None
+            if settings['payload'] == 'full':
+                from modules.ml_forecast import recursive_ml_forecast
+                with span("rollout"):
+                    forecast_ml = pd.Series(
+                        recursive_ml_forecast(stock_data_enhanced, ensemble_models, scaler, feature_names, forecast_days),
+                        index=forecast_index
+                    )
             
             ml_success = True
             
@@ -898,8 +1563,8 @@ def generate_investment_analysis(stock_ticker, forecast_days=30):
             print(f"ML ensemble fallback: {e}")
             predicted_price_ml = forecast_ar.iloc[0]
             model_confidence = 0.5
-            mae_rf = mae_gb = mae_xgb = 0
-            r2_rf = r2_gb = r2_xgb = 0
+            model_metrics = None
+            forecast_ml = None
             ml_success = False
         
         # ========== PART 3: Combine Predictions ==========
@@ -910,9 +1575,13 @@ def generate_investment_analysis(stock_ticker, forecast_days=30):
         if ml_success:
             predicted_price = 0.70 * predicted_price_ml + 0.30 * forecast_ar.iloc[0]
             final_confidence = model_confidence
+            # Same blend for the multi-day path used by peak detection and exit timing
+            # (the summary payload has no ML rollout and skips both)
+            forecast = 0.70 * forecast_ml + 0.30 * forecast_ar if forecast_ml is not None else None
         else:
             predicted_price = forecast_ar.iloc[0]
             final_confidence = 0.5
+            forecast = forecast_ar
         
         predicted_return = ((predicted_price - current_price) / current_price) * 100
         
@@ -920,33 +1589,53 @@ def generate_investment_analysis(stock_ticker, forecast_days=30):
         latest_data = stock_data_enhanced.iloc[-1]
         
         # Calculate investment score with advanced indicators
-        score, breakdown = calculate_investment_score(
-            predicted_return=predicted_return,
-            current_price=current_price,
-            ma_5=latest_data['MA_5'],
-            ma_10=latest_data['MA_10'],
-            ma_20=latest_data['MA_20'],
-            volatility=latest_data['Volatility_10'],
-            volume_ratio=latest_data['Volume_Ratio'],
-            rsi=latest_data['RSI_14'] if 'RSI_14' in latest_data else None,
-            macd_diff=latest_data['MACD_Diff'] if 'MACD_Diff' in latest_data else None,
-            bb_position=latest_data['BB_Position'] if 'BB_Position' in latest_data else None,
-            ma_50=latest_data['MA_50'] if 'MA_50' in latest_data else None,
-            ma_200=latest_data['MA_200'] if 'MA_200' in latest_data else None,
-            model_confidence=final_confidence
-        )
+        with span("score"):
+            score, breakdown = calculate_investment_score(
+                predicted_return=predicted_return,
+                current_price=current_price,
+                ma_5=latest_data['MA_5'],
+                ma_10=latest_data['MA_10'],
+                ma_20=latest_data['MA_20'],
+                volatility=latest_data['Volatility_10'],
+                volume_ratio=latest_data['Volume_Ratio'],
+                rsi=latest_data['RSI_14'] if 'RSI_14' in latest_data else None,
+                macd_diff=latest_data['MACD_Diff'] if 'MACD_Diff' in latest_data else None,
+                bb_position=latest_data['BB_Position'] if 'BB_Position' in latest_data else None,
+                ma_50=latest_data['MA_50'] if 'MA_50' in latest_data else None,
+                ma_200=latest_data['MA_200'] if 'MA_200' in latest_data else None,
+                model_confidence=final_confidence
+            )
+        
+            # Get recommendation (pass predicted return for lenient logic)
+            decision, recommendation, color = get_investment_recommendation(score, predicted_return)
         
-        # Get recommendation (pass predicted return for lenient logic)
-        decision, recommendation, color = get_investment_recommendation(score, predicted_return)
+        # ========== PART 5: Generate Detailed Reasons ==========
+        reasons = build_reasons(predicted_return, latest_data, ml_success, final_confidence)
         
-        # ========== PART 5: Detect Peak and When to Sell ==========
+        if settings['payload'] == 'summary':
+            # Ranking fields only: no peak detection, exit timing, series or indicator snapshot
+            return {
+                'current_price': current_price,
+                'predicted_price': predicted_price,
+                'predicted_return': predicted_return,
+                'investment_score': score,
+                'decision': decision,
+                'recommendation': recommendation,
+                'color': color,
+                'reasons': reasons,
+                'model_confidence': final_confidence,
+                'ml_success': ml_success,
+                'profile': profile
+            }
+        
+        # ========== PART 6: Detect Peak and When to Sell ==========
         sell_signal = None
         sell_reason = None
         peak_detected = False
         
         # Analyze the forecast for peak detection
-        if len(forecast_ar) > 1:
-            forecast_values = forecast_ar.values
+        if len(forecast) > 1:
+            forecast_values = forecast.values
             # Find if there's a peak (price goes up then down)
             for i in range(1, len(forecast_values) - 1):
                 if forecast_values[i] > forecast_values[i-1] and forecast_values[i] > forecast_values[i+1]:
@@ -959,7 +1648,7 @@ def generate_investment_analysis(stock_ticker, forecast_days=30):
                         'days_to_peak': days_to_peak,
                         'peak_price': peak_price,
                         'peak_return': peak_return,
-                        'sell_date': forecast_ar.index[i]
+                        'sell_date': forecast.index[i]
                     }
                     
                     if peak_return > 2:
@@ -993,79 +1682,22 @@ def generate_investment_analysis(stock_ticker, forecast_days=30):
                 }
                 sell_reason = "⚠️ Death Cross (MA50 < MA200) - bearish signal"
         
-        # ========== PART 6: Generate Detailed Reasons ==========
-        reasons = []
-        
-        # Prediction-based reasons
-        if predicted_return > 1.5:
-            reasons.append(f"📈 Strong predicted return (+{predicted_return:.2f}%)")
-        elif predicted_return > 0:
-            reasons.append(f"📊 Positive predicted return (+{predicted_return:.2f}%)")
-        elif predicted_return < -1.0:
-            reasons.append(f"📉 Negative predicted return ({predicted_return:.2f}%)")
-        
-        # Trend-based reasons
-        if latest_data['Price_Above_MA20'] and latest_data['Price_Above_MA50']:
-            reasons.append("🔼 Strong upward trend (above key MAs)")
-        elif latest_data['MA_50_200_Cross'] == 1:
-            reasons.append("⭐ Golden Cross detected (MA50 > MA200)")
-        
-        # RSI-based reasons
-        if 'RSI_14' in latest_data:
-            rsi_val = latest_data['RSI_14']
-            if rsi_val < 30:
-                reasons.append(f"💎 RSI Oversold ({rsi_val:.1f}) - potential bounce")
-            elif rsi_val > 70:
-                reasons.append(f"⚠️ RSI Overbought ({rsi_val:.1f}) - caution")
-            elif 40 <= rsi_val <= 60:
-                reasons.append(f"✅ RSI Neutral ({rsi_val:.1f}) - healthy")
-        
-        # MACD-based reasons
-        if 'MACD_Diff' in latest_data and latest_data['MACD_Diff'] > 0:
-            reasons.append("⚡ MACD bullish momentum")
-        
-        # Volatility-based reasons
-        if latest_data['Volatility_10'] < 1.5:
-            reasons.append(f"🛡️ Low volatility ({latest_data['Volatility_10']:.2f}%) - stable")
-        elif latest_data['Volatility_10'] > 4.0:
-            reasons.append(f"⚠️ High volatility ({latest_data['Volatility_10']:.2f}%) - risky")
-        
-        # Volume-based reasons
-        if latest_data['Volume_Ratio'] > 1.5:
-            reasons.append(f"📊 Strong volume ({latest_data['Volume_Ratio']:.2f}x avg)")
-        elif latest_data['Volume_Ratio'] < 0.7:
-            reasons.append(f"⚠️ Low volume ({latest_data['Volume_Ratio']:.2f}x avg)")
-        
-        # Bollinger Bands
-        if 'BB_Position' in latest_data:
-            bb_pos = latest_data['BB_Position']
-            if bb_pos < 0.2:
-                reasons.append("📍 Near lower Bollinger Band - oversold")
-            elif bb_pos > 0.8:
-                reasons.append("📍 Near upper Bollinger Band - overbought")
-        
-        # Model confidence
-        if ml_success and final_confidence > 0.7:
-            reasons.append(f"🎯 High model confidence ({final_confidence*100:.0f}%)")
-        elif ml_success and final_confidence < 0.4:
-            reasons.append(f"⚠️ Low model confidence ({final_confidence*100:.0f}%)")
-        
-        if not reasons:
-            reasons.append("⚠️ Mixed signals - proceed with caution")
-        
-        # ========== PART 6: Calculate Exit Timing ==========
-        exit_timing = calculate_exit_timing(
-            forecast=forecast_ar,
-            current_price=current_price,
-            indicators=latest_data
-        )
+        # ========== PART 7: Calculate Exit Timing ==========
+        with span("exit_timing"):
+            exit_timing = calculate_exit_timing(
+                forecast=forecast,
+                current_price=current_price,
+                indicators=latest_data
+            )
         
-        # ========== PART 7: Compile Analysis ==========
+        # ========== PART 8: Compile Analysis ==========
         analysis = {
             'train_data': train_data_ar,
             'test_data': test_data_ar,
             'predictions': predictions_ar,
-            'forecast': forecast_ar,
+            'forecast': forecast,
+            'forecast_ar': forecast_ar,
+            'forecast_ml': forecast_ml,
             'current_price': current_price,
             'predicted_price': predicted_price,
             'predicted_return': predicted_return,
@@ -1077,6 +1709,7 @@ def generate_investment_analysis(stock_ticker, forecast_days=30):
             'reasons': reasons,
             'model_confidence': final_confidence,
             'ml_success': ml_success,
+            'profile': profile,
             'exit_signal': exit_timing['signal'],
             'exit_date': exit_timing['date'],
             'exit_reason': exit_timing['reason'],
@@ -1095,16 +1728,9 @@ def generate_investment_analysis(stock_ticker, forecast_days=30):
             }
         }
         
-        # Add model metrics if ML was successful
-        if ml_success:
-            analysis['model_metrics'] = {
-                'RandomForest_MAE': round(mae_rf, 2),
-                'GradientBoosting_MAE': round(mae_gb, 2),
-                'XGBoost_MAE': round(mae_xgb, 2),
-                'RandomForest_R2': round(r2_rf, 3),
-                'GradientBoosting_R2': round(r2_gb, 3),
-                'XGBoost_R2': round(r2_xgb, 3)
-            }
+        # Add model metrics if ML was successful (and the profile computes them)
+        if model_metrics is not None:
+            analysis['model_metrics'] = model_metrics
         
         return analysis
         
@@ -1114,12 +1740,56 @@ def generate_investment_analysis(stock_ticker, forecast_days=30):
         raise Exception(f"Error generating investment analysis: {e}")
 
 
+def generate_investment_analysis(stock_ticker, forecast_days=30, use_model_cache=True,
+                                 stock_data=None, stock_data_enhanced=None,
+                                 ml_features=None, trace=None, profile='deep'):
+    """
+    Generate comprehensive investment analysis with advanced ML ensemble prediction and scoring.
+    Uses multiple models (AutoReg, RandomForest, GradientBoosting) for robust predictions.
+    
+    The multi-day 'forecast' blends a recursive ML rollout (modules.ml_forecast) with the
+    AutoReg forecast; the AutoReg-only path is kept under 'forecast_ar'.
+    
+    Fitted ensembles are stored in the model registry (modules.model_registry), so repeat
+    analyses of unchanged data reload them instead of retraining.
+    
+    The profile (ANALYSIS_PROFILES) sets how much work is done: 'deep' trains every
+    ensemble member and returns the full analysis below; 'scan-lite' trains a smaller
+    ensemble, skips the test-set metrics and the multi-day forecast and returns only
+    the ranking fields (score, decision, recommendation, color, reasons, prices,
+    return, confidence).
+    
+    Args:
+        stock_ticker (str): The stock ticker symbol
+        forecast_days (int): Number of trading days to forecast
+        use_model_cache (bool): Reuse/persist fitted models through the model registry
+        stock_data (pd.DataFrame, optional): Already fetched 2y OHLCV history
+        stock_data_enhanced (pd.DataFrame, optional): Already engineered features
+            (engineer_features output); skips both the fetch and feature engineering
+        ml_features (tuple, optional): Already prepared (X, y, feature_names, close),
+            e.g. views from modules.feature_store; skips prepare_ml_features
+        trace (bool, optional): Record per-stage timing spans (modules.tracing) under
+            analysis['trace'] (None: TRENDLY_TRACE environment variable)
+        profile (str): Analysis profile, 'deep' or 'scan-lite'
+    
+    Returns:
+        dict: Complete analysis including predictions, scores, and recommendations
+    """
+    with start_trace(trace) as tracer:
+        with span("analysis"):
+            analysis = _investment_analysis(stock_ticker, forecast_days, use_model_cache, stock_data,
+                                            stock_data_enhanced, ml_features, profile)
+    if tracer is not None:
+        analysis['trace'] = tracer.records()
+    return analysis
+
+
 def generate_stock_prediction(stock_ticker, forecast_days=30):
     """
     Generate stock price predictions using AutoReg model (legacy function for compatibility).
     Args:
         stock_ticker (str): The stock ticker symbol.
-        forecast_days (int): The number of days to forecast.
+        forecast_days (int): The number of trading days to forecast.
     Returns:
         tuple: Training data, test data, predictions, and forecast values.
     """
@@ -1127,25 +1797,26 @@ def generate_stock_prediction(stock_ticker, forecast_days=30):
         # Fetch the last 2 years of historical stock data
         stock_data = fetch_stock_history(stock_ticker, period="2y")
 
-        # Prepare the close prices data
-        close_prices = stock_data['Close'].asfreq('D', method='ffill')
+        # Prepare the close prices data, one row per trading session
+        close_prices = to_sessions(stock_data['Close'])
 
         # Ensure there's enough data for the model
-        if len(close_prices) < 250:  # Minimum data required for lags
+        if len(close_prices) < calendar_days_to_sessions(250):  # Minimum data required for lags
             raise ValueError("Not enough historical data available for this stock to generate predictions.")
 
         # Split the data into train and test sets
         train_data = close_prices.iloc[:int(0.9 * len(close_prices))]
         test_data = close_prices.iloc[int(0.9 * len(close_prices)):]
 
-        # Fit the AutoReg model
-        model = AutoReg(train_data, lags=min(250, len(train_data) - 1)).fit()
+        # Fit the AutoReg model on ~250 calendar days of lags
+        lags = calendar_days_to_sessions(250)
+        model = ARModel.fit(train_data, lags=min(lags, len(train_data) - 1))
 
         # Predict on the test data
         predictions = model.predict(start=test_data.index[0], end=test_data.index[-1], dynamic=True)
 
         # Predict future values
-        forecast_index = pd.date_range(start=test_data.index[-1] + pd.Timedelta(days=1), periods=forecast_days, freq='D')
+        forecast_index = next_sessions(test_data.index[-1], forecast_days)
         forecast = model.predict(start=len(close_prices), end=len(close_prices) + forecast_days - 1)
         forecast = pd.Series(forecast, index=forecast_index)
 
@@ -1157,13 +1828,65 @@ def generate_stock_prediction(stock_ticker, forecast_days=30):
         raise Exception(f"Error generating prediction: {e}")
 
 
-def get_smart_investment_recommendation(top_stocks=None, progress_callback=None):
+def summarize_analysis(ticker, analysis):
+    """
+    Reduce a full investment analysis to the fields used for ranking stocks.
+    
+    Args:
+        ticker (str): The stock ticker symbol
+        analysis (dict): Output of generate_investment_analysis
+    
+    Returns:
+        dict: Key metrics for the ticker (score, confidence, return, recommendation...)
+    """
+    return {
+        'ticker': ticker,
+        'score': analysis['investment_score'],
+        'confidence': analysis.get('model_confidence', 0.5),
+        'predicted_return': analysis['predicted_return'],
+        'recommendation': analysis['recommendation'],
+        'decision': analysis['decision'],
+        'color': analysis['color'],
+        'reasons': analysis['reasons'][:3],  # Top 3 reasons
+        'current_price': analysis['current_price'],
+        'predicted_price': analysis['predicted_price'],
+        **({'trace': analysis['trace']} if 'trace' in analysis else {})
+    }
+
+
+def get_smart_investment_recommendation(top_stocks=None, progress_callback=None,
+                                        max_workers=None, ticker_timeout=None, pooled=False,
+                                        compact=False, shared_features=False, trace=None,
+                                        profile='deep'):
     """
     Analyze multiple stocks and recommend the best investment opportunity.
     
+    Stocks are analyzed in parallel on a process pool (see modules.scanner) and
+    results are collected as each ticker completes.
+    
     Args:
         top_stocks (list): List of stock tickers to analyze. If None, analyzes ALL S&P 500 stocks.
-        progress_callback (function): Optional callback to report progress
+        progress_callback (function): Optional callback to report progress, called from
+            the calling thread as callback(completed, total, ticker)
+        max_workers (int, optional): Number of worker processes. None uses all cores,
+            1 analyzes the stocks one after another on a single worker process.
+        ticker_timeout (float, optional): Seconds allowed per ticker before it is stopped
+            and skipped. None uses the scanner default.
+        pooled (bool): Train one shared model across all stocks (modules.pooled_model)
+            instead of one ensemble per stock, and score them in a single batch.
+        compact (bool): Retain less per stock in pooled / shared-feature scans (see
+            modules.compact): a pooled scan keeps only model inputs and latest rows,
+            the feature store holds compact frames. Model inputs stay float64, so the
+            ranking is the same as without it.
+        shared_features (bool): Engineer the whole universe once and write it to the
+            memory-mapped feature store (modules.feature_store); scan workers, the
+            pooled model and the Streamlit pages then read it without copies.
+        trace (bool, optional): Time the scan stages and every ticker's analysis stages
+            (modules.tracing) and add the aggregated spans under 'trace'
+            (None: TRENDLY_TRACE environment variable)
+        profile (str): Analysis profile of the per-stock analyses (ANALYSIS_PROFILES);
+            'deep' (default) runs the detail view's full analysis, 'scan-lite' ranks
+            fastest but with a smaller ensemble, so scores can differ slightly
     
     Returns:
         dict: {
@@ -1174,9 +1897,26 @@ def get_smart_investment_recommendation(top_stocks=None, progress_callback=None)
             'predicted_return': float,
             'recommendation': str,
             'reasons': list,
-            'all_analyses': list (all stock results sorted by score)
+            'all_analyses': list (all stock results sorted by score),
+            'data_session': str (median last bar date of the scanned histories),
+            'trace': list (aggregate_spans rows as dicts, only when tracing)
         }
     """
+    with start_trace(trace) as tracer:
+        recommendation = _smart_investment_recommendation(
+            top_stocks, progress_callback, max_workers, ticker_timeout, pooled, compact,
+            shared_features, trace=tracer is not None, profile=profile
+        )
+    if recommendation is not None and tracer is not None:
+        recommendation['trace'] = aggregate_spans([tracer.records()]).reset_index().to_dict('records')
+    return recommendation
+
+
+def _smart_investment_recommendation(top_stocks, progress_callback, max_workers, ticker_timeout,
+                                     pooled, compact, shared_features, trace, profile):
+    """Scan behind get_smart_investment_recommendation, one span per stage."""
+    from modules.scanner import scan_tickers, analyze_ticker_task, DEFAULT_TICKER_TIMEOUT
+    
     if top_stocks is None:
         # Analyze ALL S&P 500 stocks for comprehensive recommendation
         try:
@@ -1195,37 +1935,104 @@ def get_smart_investment_recommendation(top_stocks=None, progress_callback=None)
                 'META', 'TSLA', 'JPM', 'V', 'JNJ'
             ]
     
+    # Ingest stage: bulk-download every history into the price cache up front, so
+    # the per-ticker analyses below read from disk instead of one request each
+    prefetched = {}
+    with span("prefetch"):
+        try:
+            prefetched = fetch_stock_histories(top_stocks, period="2y")
+            print(f"Prefetched price history for {len(prefetched)}/{len(top_stocks)} stocks")
+        except Exception as e:
+            print(f"Bulk prefetch failed, stocks will be fetched individually: {e}")
+        
+        # Whatever the bulk download missed is fetched concurrently, per ticker
+        missing = [ticker for ticker in top_stocks if ticker not in prefetched]
+        if missing:
+            from modules.async_fetch import fetch_histories
+            prefetched.update(fetch_histories(missing, period="2y"))
+    
+    # Session the scanned data actually reaches (lagging sources can leave it behind the calendar)
+    data_session = None
+    if prefetched:
+        data_session = str(pd.Series([data.index[-1] for data in prefetched.values()]).median().date())
+    
+    # Prepare stage: engineer every stock at once (panel mode). With shared features the
+    # result is written to the memory-mapped feature store and the in-memory frames are
+    # replaced by views of it. A compact pooled scan engineers the panel in chunks and
+    # keeps only the model inputs and latest rows (modules.compact).
+    features = None
+    if compact and pooled and not shared_features:
+        from modules.compact import prepare_compact_universe
+        
+        with span("features"):
+            features = prepare_compact_universe(prefetched)
+        del prefetched
+        enhanced_frames = features.tails
+        print(f"Prepared model inputs for {len(features)} stocks: {features.nbytes() / 1e6:.0f} MB")
+    elif pooled or shared_features:
+        from modules.panel_features import engineer_features_universe
+        
+        with span("features"):
+            enhanced_frames = engineer_features_universe(prefetched)
+        del prefetched
+        print(f"Engineered features for {len(enhanced_frames)} stocks: "
+              f"{frame_nbytes(enhanced_frames) / 1e6:.0f} MB")
+        if shared_features:
+            from modules.feature_store import get_feature_store
+            with span("feature_store"):
+                features = get_feature_store().write(enhanced_frames, compact=compact)
+            enhanced_frames = {ticker: features.frame(ticker) for ticker in features.tickers}
+    
+    if pooled:
+        from modules.pooled_model import score_universe_pooled
+        
+        with span("pooled"):
+            all_results = score_universe_pooled(enhanced_frames, features=features)
+        if progress_callback:
+            for completed, result in enumerate(all_results, start=1):
+                progress_callback(completed, len(all_results), result['ticker'])
+        return build_recommendation(all_results, data_session)
+    
     all_results = []
     
-    for i, ticker in enumerate(top_stocks):
-        try:
+    scan = scan_tickers(
+        top_stocks,
+        forecast_days=5,
+        max_workers=max_workers,
+        timeout=ticker_timeout if ticker_timeout is not None else DEFAULT_TICKER_TIMEOUT,
+        task=analyze_ticker_task(features=features, trace=trace, profile=profile)
+    )
+    
+    with span("scan"):
+        for completed, (ticker, result, error) in enumerate(scan, start=1):
             if progress_callback:
-                progress_callback(i + 1, len(top_stocks), ticker)
+                progress_callback(completed, len(top_stocks), ticker)
             
-            # Analyze the stock
-            analysis = generate_investment_analysis(ticker, forecast_days=5)
-            
-            # Extract key metrics
-            result = {
-                'ticker': ticker,
-                'score': analysis['investment_score'],
-                'confidence': analysis.get('model_confidence', 0.5),
-                'predicted_return': analysis['predicted_return'],
-                'recommendation': analysis['recommendation'],
-                'decision': analysis['decision'],
-                'color': analysis['color'],
-                'reasons': analysis['reasons'][:3],  # Top 3 reasons
-                'current_price': analysis['current_price'],
-                'predicted_price': analysis['predicted_price']
-            }
+            if error is not None:
+                # Skip stocks that fail to analyze
+                print(f"Skipping {ticker}: {str(error)}")
+                continue
             
+            # Per-ticker spans (recorded in the workers) nest under the scan span
+            ticker_trace = result.pop('trace', None)
+            if ticker_trace:
+                current_tracer().extend(ticker_trace)
             all_results.append(result)
-            
-        except Exception as e:
-            # Skip stocks that fail to analyze
-            print(f"Skipping {ticker}: {str(e)}")
-            continue
     
+    return build_recommendation(all_results, data_session)
+
+
+def build_recommendation(all_results, data_session=None):
+    """
+    Rank per-stock results and describe the best investment opportunity.
+    
+    Args:
+        all_results (list): Dicts from summarize_analysis (or pooled scoring)
+        data_session (str, optional): Session the scanned price data reaches
+    
+    Returns:
+        dict | None: Recommendation (see get_smart_investment_recommendation), or None if empty
+    """
     # Sort by score (descending) and confidence
     all_results.sort(key=lambda x: (x['score'], x['confidence']), reverse=True)
     
@@ -1254,5 +2061,9 @@ def get_smart_investment_recommendation(top_stocks=None, progress_callback=None)
         'reasons': best_stock['reasons'],
         'current_price': best_stock['current_price'],
         'predicted_price': best_stock['predicted_price'],
-        'all_analyses': all_results  # Include all for comparison
+        'all_analyses': all_results,  # Include all for comparison
+        'data_session': data_session
     }
+
+
+record_startup("modules.helper", _import_started)
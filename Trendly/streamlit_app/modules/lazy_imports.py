@@ -0,0 +1,156 @@
+"""
+Deferred imports of the heavy analysis dependencies.
+
+scikit-learn, XGBoost, ta and defeatbeta_api take seconds to import, and every
+Streamlit page imports modules.helper before its first widget renders. helper
+therefore imports them inside the functions that use them, and the pages call
+start_warm_up() once they have rendered: a background thread imports the heavy
+modules while the user is still reading the page, so the first analysis usually
+finds them loaded. If it does not, it waits on Python's import lock for the
+warm-up thread instead of importing twice.
+
+Import durations are recorded (warm-up, on-demand optional imports, and the
+startup marks set by modules.helper and by each page: its imports and its first
+full render) for import_report(), which the pages show in a "Startup Import
+Times" expander when tracing is enabled (TRENDLY_TRACE=1). Marks are kept once
+per process, so they describe the cold start, not later reruns.
+measure_cold_imports() times imports in fresh interpreters, i.e. real
+cold-start cost:
+
+    python -m modules.lazy_imports
+"""
+import os
+import sys
+import time
+import threading
+import importlib
+import subprocess
+
+import pandas as pd
+
+# Imported by the warm-up thread, in order of first use by an analysis
+HEAVY_MODULES = (
+    'sklearn.ensemble',
+    'sklearn.preprocessing',
+    'sklearn.metrics',
+    'ta',
+    'xgboost',
+    'defeatbeta_api.data.ticker',
+)
+
+# Messages printed when an optional dependency is missing (as the eager imports did)
+_MISSING_MESSAGES = {
+    'xgboost': "XGBoost not available: {error}",
+    'defeatbeta_api.data.ticker': "defeatbeta-api not available, using yfinance fallback",
+}
+
+_lock = threading.Lock()
+_optional = {}   # module name -> module, or None if it cannot be imported
+_timings = {}    # name -> {'seconds', 'trigger', 'status'}
+_warm_up_thread = None
+
+
+def _record(name, seconds, trigger, status='ok'):
+    with _lock:
+        _timings.setdefault(name, {'seconds': seconds, 'trigger': trigger, 'status': status})
+
+
+def timed_import(name, trigger='on demand'):
+    """Import a module, recording how long it took if it was not loaded yet."""
+    if name in sys.modules:
+        return sys.modules[name]
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    _record(name, time.perf_counter() - started, trigger)
+    return module
+
+
+def optional_import(name, trigger='on demand'):
+    """
+    Import an optional dependency once.
+
+    Returns:
+        module | None: The module, or None if it is not installed or fails to import
+    """
+    if name in _optional:
+        return _optional[name]
+    started = time.perf_counter()
+    try:
+        module = timed_import(name, trigger)
+    except Exception as e:
+        _record(name, time.perf_counter() - started, trigger, status=f"unavailable: {e}")
+        message = _MISSING_MESSAGES.get(name)
+        if message:
+            print(message.format(error=e))
+        module = None
+    _optional[name] = module
+    return module
+
+
+def import_heavy_modules(trigger='warm-up'):
+    """Import every heavy module now (missing optional ones are skipped)."""
+    for name in HEAVY_MODULES:
+        optional_import(name, trigger)
+
+
+def start_warm_up():
+    """
+    Import the heavy modules on a background thread (once per process).
+
+    Returns:
+        threading.Thread: The warm-up thread
+    """
+    global _warm_up_thread
+    with _lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=import_heavy_modules, name="trendly-warm-up", daemon=True)
+            _warm_up_thread.start()
+    return _warm_up_thread
+
+
+def record_startup(name, started):
+    """Record a startup mark, e.g. how long a page took to import its modules."""
+    _record(name, time.perf_counter() - started, 'startup')
+
+
+def import_report():
+    """
+    Import timings recorded in this process.
+
+    Returns:
+        pd.DataFrame: One row per module / startup mark with seconds, trigger
+                      ('startup', 'warm-up' or 'on demand') and status
+    """
+    with _lock:
+        rows = dict(_timings)
+    return pd.DataFrame.from_dict(rows, orient='index', columns=['seconds', 'trigger', 'status'])
+
+
+def measure_cold_imports(modules=('modules.helper',) + HEAVY_MODULES, repeat=3):
+    """
+    Import time of each module in fresh interpreters (best of `repeat`).
+
+    Runs from the streamlit_app directory, so 'modules.*' names resolve.
+
+    Returns:
+        pd.DataFrame: seconds per module (NaN if it cannot be imported)
+    """
+    app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = ("import time, importlib, sys; started = time.perf_counter(); "
+            "importlib.import_module(sys.argv[1]); print(time.perf_counter() - started)")
+    rows = {}
+    for name in modules:
+        timings = []
+        for _ in range(repeat):
+            result = subprocess.run([sys.executable, "-c", code, name], cwd=app_dir,
+                                    capture_output=True, text=True)
+            if result.returncode != 0:
+                break
+            timings.append(float(result.stdout.strip().splitlines()[-1]))
+        rows[name] = {'seconds': min(timings) if timings else float('nan')}
+    return pd.DataFrame.from_dict(rows, orient='index')
+
+
+if __name__ == "__main__":
+    with pd.option_context('display.float_format', '{:.3f}'.format):
+        print(measure_cold_imports())
@@ -0,0 +1,80 @@
+"""
+Recursive multi-day forecasts from the ML ensemble.
+
+The ensemble is trained to predict the next day's close from one row of
+engineered features. To look several days ahead, each predicted close is turned
+into a synthetic bar and absorbed by StreamingFeatures, which emits the next
+feature row in O(1) time. A 30-day path therefore costs 30 single-row predicts,
+with no refit and no rebuild of the feature history per step.
+"""
+import copy
+import numpy as np
+
+from modules.helper import ensemble_predict_batch
+from modules.streaming_features import StreamingFeatures
+
+# Recent bars used to estimate the synthetic bars' intraday range and volume
+SYNTHETIC_BAR_WINDOW = 20
+
+
+def synthetic_bar(prev_close, close, range_pct, volume):
+    """
+    OHLCV bar for a predicted close.
+
+    The bar opens at the previous close and its high/low extend the body by the
+    typical intraday range, so range-based indicators (ATR, Stochastic, support /
+    resistance) do not collapse during the rollout.
+
+    Returns:
+        tuple: (open, high, low, close, volume)
+    """
+    half_range = close * range_pct / 2
+    return (
+        prev_close,
+        max(prev_close, close) + half_range,
+        min(prev_close, close) - half_range,
+        close,
+        volume
+    )
+
+
+def recursive_ml_forecast(stock_data_enhanced, models, scaler, feature_names, horizon,
+                          state=None, weights=None):
+    """
+    Roll the ensemble forward one trading day at a time.
+
+    Args:
+        stock_data_enhanced (pd.DataFrame): engineer_features output the models were trained on
+        models (dict): Trained ensemble models
+        scaler (StandardScaler): Scaler fitted on the training features
+        feature_names (list): Feature columns the models expect (from prepare_ml_features)
+        horizon (int): Number of trading days to forecast
+        state (StreamingFeatures, optional): Indicator state after the last bar of
+            stock_data_enhanced. Replayed from the history when not given; it is
+            copied, never modified.
+        weights (dict, optional): Ensemble weights (see ensemble_predict)
+
+    Returns:
+        np.ndarray: Predicted close for each of the next `horizon` trading days
+    """
+    if state is None:
+        state = StreamingFeatures.replay(stock_data_enhanced)
+    else:
+        state = copy.deepcopy(state)
+
+    recent = stock_data_enhanced.iloc[-SYNTHETIC_BAR_WINDOW:]
+    range_pct = ((recent['High'] - recent['Low']) / recent['Close']).mean()
+    volume = recent['Volume'].mean()
+
+    row = stock_data_enhanced.iloc[-1]
+    prev_close = row['Close']
+    path = np.empty(horizon)
+
+    for step in range(horizon):
+        features = np.asarray(row[feature_names], dtype=float).reshape(1, -1)
+        close = ensemble_predict_batch(models, scaler.transform(features), weights=weights)['ensemble'].iloc[0]
+        path[step] = close
+        row = state.update(*synthetic_bar(prev_close, close, range_pct, volume))
+        prev_close = close
+
+    return path
@@ -0,0 +1,253 @@
+"""
+On-disk registry of fitted model artifacts.
+
+Artifacts (fitted scaler + ensemble, warm-start state, ...) are persisted with
+joblib under a key built from the ticker, the training data's end date, a hash of
+the feature set and training data, and the hyperparameters. Repeat analyses of
+unchanged data reload the fitted models instead of retraining them.
+
+Each save supersedes the artifacts of the same ticker and configuration fitted on
+older data (keys share the spec prefix and differ in data end date / hash): only
+the newest keep_per_spec of them stay, so a daily universe scan keeps about one
+artifact per ticker instead of adding one every day. Beyond that, eviction is
+least-recently-used: every hit refreshes the file's mtime, and after each save the
+oldest artifacts beyond max_entries (or older than max_age) are removed.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import joblib
+import numpy as np
+from datetime import timedelta
+
+from modules.price_store import DEFAULT_CACHE_DIR
+
+
+def fingerprint(*arrays):
+    """Cheap content hash of NumPy arrays / pandas objects used as training data."""
+    digest = hashlib.sha1()
+    for array in arrays:
+        values = np.ascontiguousarray(getattr(array, 'values', array))
+        digest.update(str(values.shape).encode())
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Ticker-keyed joblib store of fitted models with LRU eviction.
+
+    Args:
+        root (str, optional): Directory for artifacts (default: TRENDLY_CACHE_DIR/models)
+        max_entries (int): Maximum number of artifacts kept on disk (enough for the
+            S&P 500 with two configurations each)
+        max_age (timedelta): Artifacts unused for longer than this are evicted
+        keep_per_spec (int): Artifacts kept per spec prefix (ticker / kind /
+            configuration), newest data first; the base for the next warm start
+        memory (optional): In-memory tier with get(key) / set(key, value), checked
+            before the disk (e.g. analysis_cache.shared_model_memory())
+    """
+
+    def __init__(self, root=None, max_entries=2000, max_age=timedelta(days=7), memory=None,
+                 keep_per_spec=1):
+        self.root = root or os.path.join(
+            os.environ.get("TRENDLY_CACHE_DIR", DEFAULT_CACHE_DIR), "models"
+        )
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.keep_per_spec = keep_per_spec
+        self.memory = memory
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def spec_prefix(ticker, kind, params, feature_names=()):
+        """
+        Key prefix shared by all artifacts of one ticker / model type / configuration.
+
+        Args:
+            ticker (str): The stock ticker symbol
+            kind (str): Artifact type, e.g. 'ensemble' or 'autoreg'
+            params (dict): Hyperparameters used for fitting
+            feature_names (list): Names of the feature columns
+
+        Returns:
+            str: File-name safe prefix
+        """
+        spec = json.dumps(
+            {'features': list(feature_names), 'params': params},
+            sort_keys=True, default=str
+        )
+        safe_ticker = re.sub(r"[^A-Za-z0-9.-]", "-", ticker.upper())
+        return f"{safe_ticker}_{kind}_{hashlib.sha1(spec.encode()).hexdigest()[:16]}"
+
+    @classmethod
+    def make_key(cls, ticker, kind, data_end, params, feature_names=(), data=()):
+        """
+        Build the registry key for one fitted artifact.
+
+        Args:
+            ticker (str): The stock ticker symbol
+            kind (str): Artifact type, e.g. 'ensemble' or 'autoreg'
+            data_end: Last date of the training data
+            params (dict): Hyperparameters used for fitting
+            feature_names (list): Names of the feature columns
+            data (tuple): Training arrays, hashed so revised bars invalidate the entry
+
+        Returns:
+            str: File-name safe key ('<spec prefix>_<end date>_<data hash>')
+        """
+        prefix = cls.spec_prefix(ticker, kind, params, feature_names)
+        end = str(data_end)[:10]
+        return f"{prefix}_{end}_{fingerprint(*data)[:12]}"
+
+    @staticmethod
+    def key_prefix(key):
+        """Spec prefix of a make_key key (everything before '_<end date>_<data hash>')."""
+        return key.rsplit("_", 2)[0]
+
+    def _spec_keys(self, prefix):
+        """(data end, key) of every artifact sharing a spec prefix."""
+        keys = []
+        for name in os.listdir(self.root):
+            if name.startswith(prefix + "_") and name.endswith(".joblib"):
+                key = name[:-len(".joblib")]
+                if self.key_prefix(key) == prefix:
+                    keys.append((key[len(prefix) + 1:].split("_")[0], key))
+        return keys
+
+    def latest(self, prefix, before=None):
+        """
+        Most recent artifact sharing a spec prefix (e.g. yesterday's models for a ticker).
+
+        Args:
+            prefix (str): Result of spec_prefix
+            before: Only consider artifacts whose data ends strictly before this date
+
+        Returns:
+            object | None: The artifact with the latest data end date
+        """
+        limit = str(before)[:10] if before is not None else None
+        candidates = [(end, key) for end, key in self._spec_keys(prefix)
+                      if limit is None or end < limit]
+
+        # Read from disk, not the memory tier: callers warm-start the returned models
+        # in place, which must not change the artifact cached under the older key
+        for _, key in sorted(candidates, reverse=True):
+            artifact = self._read(key)
+            if artifact is not None:
+                return artifact
+        return None
+
+    def path(self, key):
+        return os.path.join(self.root, f"{key}.joblib")
+
+    def load(self, key):
+        """Return the artifact stored under key, or None on a miss."""
+        if self.memory is not None:
+            artifact = self.memory.get(key)
+            if artifact is not None:
+                return artifact
+        artifact = self._read(key)
+        if artifact is not None and self.memory is not None:
+            self.memory.set(key, artifact)
+        return artifact
+
+    def _read(self, key):
+        """Load an artifact from disk, or None on a miss."""
+        path = self.path(key)
+        try:
+            # Mark as recently used before loading, so evict() in another
+            # process does not pick it; a file evicted already is a miss
+            os.utime(path)
+            return joblib.load(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable model artifact {key}: {e}")
+            return None
+
+    def save(self, key, artifact):
+        """Atomically persist an artifact, then drop the ones it supersedes and apply the eviction policy."""
+        path = self.path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        joblib.dump(artifact, tmp_path)
+        os.replace(tmp_path, path)
+        if self.memory is not None:
+            self.memory.set(key, artifact)
+        self.prune(self.key_prefix(key), keep=key)
+        self.evict()
+
+    def prune(self, prefix, keep=None):
+        """
+        Remove all but the newest keep_per_spec artifacts sharing a spec prefix.
+
+        Args:
+            prefix (str): Result of spec_prefix
+            keep (str, optional): Key that is never removed (the one just saved)
+        """
+        keys = sorted(self._spec_keys(prefix), reverse=True)
+        for _, key in keys[self.keep_per_spec:]:
+            if key == keep:
+                continue
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass  # Removed by another process
+
+    def get_or_fit(self, key, fit):
+        """
+        Load the artifact for key, or call fit() and store its result.
+
+        Args:
+            key (str): Key from make_key
+            fit (callable): Zero-argument function returning the fitted artifact
+
+        Returns:
+            object: The cached or freshly fitted artifact
+        """
+        artifact = self.load(key)
+        if artifact is None:
+            artifact = fit()
+            try:
+                self.save(key, artifact)
+            except Exception as e:
+                print(f"Could not cache model artifact {key}: {e}")
+        return artifact
+
+    def entries(self):
+        """(path, last used timestamp) for every stored artifact, oldest first."""
+        entries = []
+        for name in os.listdir(self.root):
+            if name.endswith(".joblib"):
+                path = os.path.join(self.root, name)
+                try:
+                    entries.append((path, os.path.getmtime(path)))
+                except FileNotFoundError:
+                    pass  # Evicted by another process
+        return sorted(entries, key=lambda entry: entry[1])
+
+    def evict(self):
+        """Remove artifacts unused for longer than max_age, then the least recently used beyond max_entries."""
+        entries = self.entries()
+        cutoff = time.time() - self.max_age.total_seconds()
+        excess = max(0, len(entries) - self.max_entries)
+
+        for i, (path, last_used) in enumerate(entries):
+            if i < excess or last_used < cutoff:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+
+_model_registry = None
+
+
+def get_model_registry():
+    """Shared ModelRegistry for this process (created on first use)."""
+    global _model_registry
+    if _model_registry is None:
+        _model_registry = ModelRegistry()
+    return _model_registry
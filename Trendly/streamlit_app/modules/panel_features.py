@@ -0,0 +1,284 @@
+"""
+Vectorized cross-sectional feature engine (panel mode for engineer_features).
+
+Takes one (dates x tickers) array per OHLCV field and computes every indicator
+from engineer_features as 2-D NumPy operations over the whole universe at once.
+Results match the per-ticker engineer_features output (which uses pandas and the
+`ta` library) within floating point tolerance.
+
+Tickers may have different histories (late listings, missing days): each ticker's
+valid rows are packed to the top of its column before computing, so indicators
+see exactly the bars a per-ticker run would see, then scattered back.
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Column order produced by engineer_features (after the OHLCV input columns)
+FEATURE_COLUMNS = [
+    'Prev_Close_1', 'Prev_Close_2', 'Prev_Close_5',
+    'MA_5', 'MA_10', 'MA_20', 'MA_50', 'MA_200',
+    'EMA_12', 'EMA_26',
+    'MA_5_10_Cross', 'MA_50_200_Cross',
+    'Price_Change', 'Daily_Return',
+    'RSI_14',
+    'MACD', 'MACD_Signal', 'MACD_Diff',
+    'Stoch_K', 'Stoch_D',
+    'ROC_10',
+    'High_Low_Range', 'Volatility_5', 'Volatility_10', 'Volatility_20',
+    'ATR_14',
+    'BB_High', 'BB_Mid', 'BB_Low', 'BB_Width', 'BB_Position',
+    'Avg_Volume_10', 'Avg_Volume_20', 'Volume_Ratio',
+    'OBV', 'VPT',
+    'Support_20', 'Resistance_20', 'Distance_Support', 'Distance_Resistance',
+    'Price_Above_MA5', 'Price_Above_MA10', 'Price_Above_MA20',
+    'Price_Above_MA50', 'Price_Above_MA200',
+]
+
+OHLCV_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+# ========== 2-D building blocks (axis 0 = time, axis 1 = ticker) ==========
+
+def _shift(a, periods):
+    """Shift rows down by `periods`, filling the top with NaN."""
+    out = np.full_like(a, np.nan)
+    if periods < len(a):
+        out[periods:] = a[:len(a) - periods]
+    return out
+
+
+def _rolling(a, window, func, **kwargs):
+    """Apply a reduction over trailing windows; NaN until a full window is available."""
+    out = np.full_like(a, np.nan)
+    if len(a) >= window:
+        windows = sliding_window_view(a, window, axis=0)  # (T - w + 1, N, w), no copy
+        out[window - 1:] = func(windows, axis=-1, **kwargs)
+    return out
+
+
+def _ewm(a, alpha, min_periods=0):
+    """
+    Exponentially weighted mean with adjust=False semantics, column by column.
+
+    `alpha` may be a scalar or one value per column, so several EMAs can be run in
+    a single pass over time. Leading NaNs are skipped like pandas does.
+    """
+    alpha = np.broadcast_to(np.asarray(alpha, dtype=float), a.shape[1:])
+    out = np.full_like(a, np.nan)
+    state = np.full(a.shape[1:], np.nan)
+    count = np.zeros(a.shape[1:])
+
+    for t in range(len(a)):
+        x = a[t]
+        valid = ~np.isnan(x)
+        started = ~np.isnan(state)
+        state = np.where(valid, np.where(started, (1 - alpha) * state + alpha * x, x), state)
+        count += valid
+        out[t] = np.where(count >= min_periods, state, np.nan)
+    return out
+
+
+def _wilder_atr(true_range, window):
+    """ATR exactly as ta.volatility.AverageTrueRange: zeros, SMA seed, then Wilder smoothing."""
+    atr = np.zeros_like(true_range)
+    if len(true_range) < window:
+        return atr
+    atr[window - 1] = true_range[:window].mean(axis=0)
+    for t in range(window, len(true_range)):
+        atr[t] = (atr[t - 1] * (window - 1) + true_range[t]) / float(window)
+    return atr
+
+
+def _pack(values, valid):
+    """Move each column's valid rows to the top (stable), returning the row order used."""
+    order = np.argsort(~valid, axis=0, kind='stable')
+    return np.take_along_axis(values, order, axis=0), order
+
+
+def _unpack(packed, order, valid):
+    """Inverse of _pack: scatter rows back to their original dates, NaN elsewhere."""
+    out = np.empty_like(packed)
+    np.put_along_axis(out, order, packed, axis=0)
+    out[~valid] = np.nan
+    return out
+
+
+# ========== Panel feature engine ==========
+
+def _compute_packed(o, h, l, c, v):
+    """Compute all indicators on packed (gap-free) arrays."""
+    f = {}
+
+    # 1. PAST PRICES
+    f['Prev_Close_1'] = _shift(c, 1)
+    f['Prev_Close_2'] = _shift(c, 2)
+    f['Prev_Close_5'] = _shift(c, 5)
+
+    # 2. MOVING AVERAGES
+    for window in (5, 10, 20, 50, 200):
+        f[f'MA_{window}'] = _rolling(c, window, np.mean)
+
+    # EMA_12 / EMA_26 (no warm-up) and RSI's Wilder averages share one time loop
+    n = c.shape[1]
+    diff = c - f['Prev_Close_1']
+    up = np.where(diff > 0, diff, 0.0)  # ta treats the first (NaN) diff as 0
+    down = np.where(diff < 0, -diff, 0.0)
+    stacked = np.hstack([c, c, up, down])
+    alphas = np.concatenate([
+        np.full(n, 2 / (12 + 1)), np.full(n, 2 / (26 + 1)),
+        np.full(n, 1 / 14), np.full(n, 1 / 14),
+    ])
+    ema = _ewm(stacked, alphas)
+    ema_12, ema_26, ema_up, ema_down = np.split(ema, 4, axis=1)
+    f['EMA_12'] = ema_12
+    f['EMA_26'] = ema_26
+
+    f['MA_5_10_Cross'] = (f['MA_5'] > f['MA_10']).astype(int)
+    f['MA_50_200_Cross'] = (f['MA_50'] > f['MA_200']).astype(int)
+
+    # 3. MOMENTUM INDICATORS
+    f['Price_Change'] = diff
+    daily_return = (c / f['Prev_Close_1'] - 1)
+    f['Daily_Return'] = daily_return * 100
+
+    # RSI and MACD: ta only reports EWM values once `window` observations were seen
+    rows = np.arange(len(c))[:, None]
+    ema_up = np.where(rows >= 14 - 1, ema_up, np.nan)
+    ema_down = np.where(rows >= 14 - 1, ema_down, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relative_strength = ema_up / ema_down
+        f['RSI_14'] = np.where(ema_down == 0, 100, 100 - (100 / (1 + relative_strength)))
+
+    macd = np.where(rows >= 12 - 1, ema_12, np.nan) - np.where(rows >= 26 - 1, ema_26, np.nan)
+    f['MACD'] = macd
+    f['MACD_Signal'] = _ewm(macd, 2 / (9 + 1), min_periods=9)
+    f['MACD_Diff'] = macd - f['MACD_Signal']
+
+    # Stochastic Oscillator
+    lowest_low = _rolling(l, 14, np.min)
+    highest_high = _rolling(h, 14, np.max)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f['Stoch_K'] = 100 * (c - lowest_low) / (highest_high - lowest_low)
+    f['Stoch_D'] = _rolling(f['Stoch_K'], 3, np.mean)
+
+    # Rate of Change
+    close_10 = _shift(c, 10)
+    f['ROC_10'] = ((c - close_10) / close_10) * 100
+
+    # 4. VOLATILITY MEASURES
+    f['High_Low_Range'] = h - l
+    for window in (5, 10, 20):
+        f[f'Volatility_{window}'] = _rolling(f['Daily_Return'], window, np.std, ddof=1)
+
+    prev_close = f['Prev_Close_1']
+    true_range = np.fmax(h - l, np.fmax(np.abs(h - prev_close), np.abs(l - prev_close)))
+    f['ATR_14'] = _wilder_atr(true_range, 14)
+
+    # Bollinger Bands (population std like ta)
+    bb_mid = f['MA_20']
+    bb_std = _rolling(c, 20, np.std, ddof=0)
+    f['BB_High'] = bb_mid + 2 * bb_std
+    f['BB_Mid'] = bb_mid
+    f['BB_Low'] = bb_mid - 2 * bb_std
+    f['BB_Width'] = f['BB_High'] - f['BB_Low']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f['BB_Position'] = (c - f['BB_Low']) / (f['BB_High'] - f['BB_Low'])
+
+    # 5. VOLUME INDICATORS
+    f['Avg_Volume_10'] = _rolling(v, 10, np.mean)
+    f['Avg_Volume_20'] = _rolling(v, 20, np.mean)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f['Volume_Ratio'] = v / f['Avg_Volume_10']
+
+    f['OBV'] = np.cumsum(np.where(c < prev_close, -v, v), axis=0)
+
+    vpt_step = daily_return * v
+    f['VPT'] = np.where(np.isnan(vpt_step), np.nan, np.nancumsum(vpt_step, axis=0))
+
+    # 6. PATTERN RECOGNITION
+    f['Support_20'] = lowest_low_20 = _rolling(l, 20, np.min)
+    f['Resistance_20'] = highest_high_20 = _rolling(h, 20, np.max)
+    f['Distance_Support'] = ((c - lowest_low_20) / lowest_low_20) * 100
+    f['Distance_Resistance'] = ((highest_high_20 - c) / c) * 100
+
+    for window in (5, 10, 20, 50, 200):
+        f[f'Price_Above_MA{window}'] = (c > f[f'MA_{window}']).astype(int)
+
+    return f
+
+
+def engineer_features_panel(open_, high, low, close, volume):
+    """
+    Engineer every engineer_features indicator for a whole universe in one pass.
+
+    Args:
+        open_, high, low, close, volume (pd.DataFrame | np.ndarray): One (dates x tickers)
+            panel per OHLCV field, NaN where a ticker has no bar for a date
+
+    Returns:
+        dict: {feature name: panel of the same shape/labels as the inputs}.
+              Includes the OHLCV inputs and all FEATURE_COLUMNS.
+    """
+    labels = close if isinstance(close, pd.DataFrame) else None
+    fields = [np.asarray(x, dtype=float) for x in (open_, high, low, close, volume)]
+
+    valid = ~np.isnan(fields[3])
+    packed, order = zip(*(_pack(x, valid) for x in fields))
+    features = _compute_packed(*packed)
+
+    result = dict(zip(OHLCV_FIELDS, fields))
+    for name in FEATURE_COLUMNS:
+        values = features[name].astype(float)
+        result[name] = _unpack(values, order[0], valid)
+
+    if labels is not None:
+        result = {
+            name: pd.DataFrame(values, index=labels.index, columns=labels.columns)
+            for name, values in result.items()
+        }
+    return result
+
+
+def build_panel(histories):
+    """
+    Align per-ticker OHLCV frames into one (dates x tickers) panel per field.
+
+    Args:
+        histories (dict): {ticker: DataFrame with OHLCV columns}, e.g. from fetch_stock_histories
+
+    Returns:
+        dict: {field: DataFrame indexed by the union of dates, one column per ticker}
+    """
+    return {
+        field: pd.DataFrame({ticker: data[field] for ticker, data in histories.items()})
+        for field in OHLCV_FIELDS
+    }
+
+
+def engineer_features_universe(histories):
+    """
+    Panel-mode replacement for calling engineer_features on each ticker.
+
+    Args:
+        histories (dict): {ticker: DataFrame with OHLCV columns}
+
+    Returns:
+        dict: {ticker: DataFrame shaped exactly like engineer_features(histories[ticker])}
+    """
+    panel = build_panel(histories)
+    features = engineer_features_panel(
+        panel['Open'], panel['High'], panel['Low'], panel['Close'], panel['Volume']
+    )
+    del panel
+
+    frames = {}
+    columns = OHLCV_FIELDS + FEATURE_COLUMNS
+    for ticker, data in histories.items():
+        frame = pd.DataFrame({name: features[name][ticker] for name in columns})
+        frame = frame.loc[data.index]
+        for name in columns:
+            if name.startswith('Price_Above') or name.endswith('_Cross'):
+                frame[name] = frame[name].astype(int)
+        frames[ticker] = frame
+    return frames
@@ -0,0 +1,252 @@
+"""
+Cross-ticker pooled model for the universe scan.
+
+Instead of training one RandomForest / GradientBoosting / XGBoost set per ticker,
+the pooled mode stacks every ticker's prepare_ml_features output into one training
+matrix, adds ticker (and, when known, sector) metadata, and trains a single shared
+ensemble on a return-normalised target. Every ticker is then scored with one batched predict.
+
+Price-denominated features (moving averages, MACD, ATR, ...) are divided by the
+close price and cumulative volume features (OBV, VPT) are z-scored per ticker, so
+rows from a $20 stock and a $2,000 stock are comparable.
+
+Tickers are encoded by a hash of the symbol, so a ticker keeps its code when the
+universe changes. The sector code is only added when the ticker CSV carries a
+sector column; the bundled file has none, and a constant column adds nothing.
+"""
+import os
+import zlib
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from modules.helper import (prepare_ml_features, train_ensemble_models, ensemble_predict_batch,
+                            calculate_investment_score, get_investment_recommendation,
+                            build_reasons)
+
+# Features expressed in price units: divided by the close to become scale-free
+PRICE_FEATURES = [
+    'MA_5', 'MA_10', 'MA_20', 'MA_50', 'MA_200', 'EMA_12', 'EMA_26',
+    'MACD', 'MACD_Signal', 'MACD_Diff', 'ATR_14', 'BB_Width'
+]
+
+# Cumulative volume features: z-scored within each ticker
+VOLUME_FEATURES = ['OBV', 'VPT']
+
+METADATA_FEATURES = ['Ticker_Code', 'Sector_Code']
+
+# Range of the hashed Ticker_Code
+TICKER_CODE_BUCKETS = 2 ** 16
+
+# Sector column names to look for in sp500_tickers.csv (the bundled file has none)
+SECTOR_COLUMNS = ('GICS Sector', 'Sector')
+
+
+class _PriceSpaceModel:
+    """Wraps a return-predicting model so predict() yields next-day prices for given closes."""
+
+    def __init__(self, model, close):
+        self.model = model
+        self.close = close
+
+    def predict(self, X):
+        return self.close * (1 + self.model.predict(X))
+
+
+def load_ticker_metadata():
+    """
+    Read ticker metadata from the S&P 500 CSV in the assets folder.
+
+    Returns:
+        pd.DataFrame: Indexed by Symbol with 'Security' and 'Sector' columns
+                      ('Unknown' sector when the CSV has no sector column)
+    """
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    csv_path = os.path.normpath(os.path.join(current_dir, "..", "..", "assets", "data", "sp500_tickers.csv"))
+    metadata = pd.read_csv(csv_path).set_index("Symbol")
+
+    sector_column = next((c for c in SECTOR_COLUMNS if c in metadata.columns), None)
+    metadata['Sector'] = metadata[sector_column] if sector_column else 'Unknown'
+    return metadata[['Security', 'Sector']]
+
+
+def ticker_code(ticker):
+    """Stable numeric code of a ticker (independent of the universe and PYTHONHASHSEED)."""
+    return zlib.crc32(ticker.upper().encode()) % TICKER_CODE_BUCKETS
+
+
+def normalize_features(X, feature_names, close):
+    """
+    Make one ticker's ML features comparable across tickers.
+
+    Args:
+        X (np.ndarray): Features from prepare_ml_features
+        feature_names (list): Column names of X
+        close (np.ndarray): Close price for each row of X
+
+    Returns:
+        np.ndarray: Normalised copy of X
+    """
+    X = np.array(X, dtype=float)
+    for i, name in enumerate(feature_names):
+        if name in PRICE_FEATURES:
+            X[:, i] = X[:, i] / close
+        elif name in VOLUME_FEATURES:
+            std = X[:, i].std()
+            X[:, i] = (X[:, i] - X[:, i].mean()) / (std if std > 0 else 1.0)
+    return X
+
+
+def build_pooled_dataset(enhanced_frames, metadata=None, lookback=60, features=None):
+    """
+    Stack every ticker's features into one pooled training matrix.
+
+    Each ticker's last feature row is held out for scoring, like the per-ticker
+    analysis uses X[-1] for its next-day prediction.
+
+    Args:
+        enhanced_frames (dict): {ticker: engineer_features output}
+        metadata (pd.DataFrame, optional): From load_ticker_metadata
+        lookback (int): Minimum rows required per ticker
+        features (FeatureUniverse, optional): Prepared universe (modules.feature_store)
+            to read prepare_ml_features output from instead of recomputing it
+
+    Returns:
+        dict: {
+            'X_train', 'y_train': pooled training matrix and next-day return target,
+            'X_score': one row per ticker to score,
+            'tickers': tickers in X_score order,
+            'close': close price behind each X_score row,
+            'feature_names': column names (features + Ticker_Code, plus Sector_Code
+                when the metadata has more than one sector),
+            'latest': {ticker: latest engineered row}
+        }
+    """
+    if metadata is None:
+        metadata = load_ticker_metadata()
+    sectors = {sector: code for code, sector in enumerate(sorted(metadata['Sector'].unique()))}
+    use_sector = len(sectors) > 1
+    metadata_features = METADATA_FEATURES if use_sector else METADATA_FEATURES[:1]
+
+    X_parts, y_parts, score_rows = [], [], []
+    tickers, closes, latest = [], [], {}
+    feature_names = None
+
+    for ticker, frame in sorted(enhanced_frames.items()):
+        try:
+            if features is not None and ticker in features:
+                X, y, feature_names, close = features.ml_features(ticker)
+            else:
+                X, y, feature_names, close = prepare_ml_features(frame, lookback=lookback)
+        except ValueError as ve:
+            print(f"Skipping {ticker} in pooled dataset: {ve}")
+            continue
+
+        X = normalize_features(X, feature_names, close)
+        meta = [ticker_code(ticker)]
+        if use_sector:
+            meta.append(sectors.get(metadata['Sector'].get(ticker, 'Unknown'), -1))
+        meta = np.tile(meta, (len(X), 1))
+        X = np.hstack([X, meta])
+
+        # Target: next-day return instead of next-day price
+        X_parts.append(X[:-1])
+        y_parts.append(y[:-1] / close[:-1] - 1)
+        score_rows.append(X[-1])
+        tickers.append(ticker)
+        closes.append(close[-1])
+        latest[ticker] = frame.iloc[-1]
+
+    if not tickers:
+        raise ValueError("No ticker had enough data for the pooled model.")
+
+    return {
+        'X_train': np.vstack(X_parts),
+        'y_train': np.concatenate(y_parts),
+        'X_score': np.vstack(score_rows),
+        'tickers': tickers,
+        'close': np.array(closes),
+        'feature_names': list(feature_names) + metadata_features,
+        'latest': latest
+    }
+
+
+def train_pooled_model(dataset):
+    """
+    Train one shared ensemble on the pooled dataset.
+
+    Returns:
+        dict: {'scaler': fitted StandardScaler, 'models': trained ensemble}
+    """
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(dataset['X_train'])
+    models = train_ensemble_models(X_train_scaled, dataset['y_train'])
+    return {'scaler': scaler, 'models': models}
+
+
+def score_universe_pooled(enhanced_frames, metadata=None, pooled=None, features=None):
+    """
+    Score every ticker with the pooled model in one batched predict.
+
+    Args:
+        enhanced_frames (dict): {ticker: engineer_features output}
+        metadata (pd.DataFrame, optional): From load_ticker_metadata
+        pooled (dict, optional): Already trained {'scaler', 'models'}; trained here if None
+        features (FeatureUniverse, optional): Prepared universe (see build_pooled_dataset)
+
+    Returns:
+        list: Result dicts in the summarize_analysis format, one per scored ticker
+    """
+    dataset = build_pooled_dataset(enhanced_frames, metadata, features=features)
+    if pooled is None:
+        pooled = train_pooled_model(dataset)
+
+    # Predict in price space so the ensemble confidence is on the same scale as
+    # the per-ticker analysis (it is relative to the predicted price level).
+    # Each ticker gets its own confidence from the models' agreement on its row.
+    X_score_scaled = pooled['scaler'].transform(dataset['X_score'])
+    price_models = {
+        name: _PriceSpaceModel(model, dataset['close'])
+        for name, model in pooled['models'].items()
+    }
+    scores = ensemble_predict_batch(price_models, X_score_scaled, index=dataset['tickers'])
+
+    results = []
+    for ticker, predicted_price, model_confidence in zip(
+            scores.index, scores['ensemble'], scores['confidence']):
+        latest_data = dataset['latest'][ticker]
+        current_price = latest_data['Close']
+        predicted_return = ((predicted_price - current_price) / current_price) * 100
+
+        score, _ = calculate_investment_score(
+            predicted_return=predicted_return,
+            current_price=current_price,
+            ma_5=latest_data['MA_5'],
+            ma_10=latest_data['MA_10'],
+            ma_20=latest_data['MA_20'],
+            volatility=latest_data['Volatility_10'],
+            volume_ratio=latest_data['Volume_Ratio'],
+            rsi=latest_data['RSI_14'],
+            macd_diff=latest_data['MACD_Diff'],
+            bb_position=latest_data['BB_Position'],
+            ma_50=latest_data['MA_50'],
+            ma_200=latest_data['MA_200'],
+            model_confidence=model_confidence
+        )
+        decision, recommendation, color = get_investment_recommendation(score, predicted_return)
+        reasons = build_reasons(predicted_return, latest_data, True, model_confidence)
+
+        results.append({
+            'ticker': ticker,
+            'score': score,
+            'confidence': float(model_confidence),
+            'predicted_return': predicted_return,
+            'recommendation': recommendation,
+            'decision': decision,
+            'color': color,
+            'reasons': reasons[:3],
+            'current_price': current_price,
+            'predicted_price': predicted_price
+        })
+
+    return results
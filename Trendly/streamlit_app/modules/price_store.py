@@ -0,0 +1,264 @@
+"""
+Persistent on-disk OHLCV cache.
+
+Each ticker's full daily history is stored as one columnar file (Parquet when
+pyarrow is installed, pickle otherwise). A refresh only downloads the bars after
+the last cached date and merges them in; period slices ('2y', 'max', ...) are
+served from disk.
+
+Sources return split- and dividend-adjusted prices, so a refresh also re-fetches
+one already cached bar: if its close no longer matches the cache, the source has
+re-adjusted the history and the whole history is downloaded again.
+
+The shared store's staleness rules come from the environment:
+
+    TRENDLY_MAX_STALENESS_SESSIONS=1     (default: 0)
+    TRENDLY_REFRESH_INTERVAL_HOURS=2     (default: 6)
+"""
+import os
+import re
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+
+from modules.trading_calendar import (MARKET_TIMEZONE, market_now, trading_sessions,
+                                      session_settled, latest_completed_session)
+
+# Try to use Parquet storage, fallback gracefully to pickle if not available
+PARQUET_AVAILABLE = False
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except Exception:
+    print("pyarrow not available, price cache will use pickle files")
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Cache location, overridable with the TRENDLY_CACHE_DIR environment variable
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "trendly")
+
+# Relative close difference on the overlap bar that means the history was re-adjusted
+ADJUSTMENT_TOLERANCE = 1e-4
+
+
+def period_start(period, now=None):
+    """
+    Convert a yfinance-style period string into the first date it covers.
+
+    Args:
+        period (str): 'max', 'ytd' or a number with unit d / wk / mo / y (e.g. '2y', '6mo')
+        now (datetime, optional): Reference time, defaults to datetime.now()
+
+    Returns:
+        datetime | None: Start of the period, or None for 'max'
+    """
+    now = now or datetime.now()
+    if period in (None, "max"):
+        return None
+    if period == "ytd":
+        return datetime(now.year, 1, 1)
+
+    match = re.fullmatch(r"(\d+)(d|wk|mo|y)", period)
+    if not match:
+        raise ValueError(f"Unsupported period '{period}'.")
+
+    count, unit = int(match.group(1)), match.group(2)
+    days_per_unit = {'d': 1, 'wk': 7, 'mo': 30, 'y': 365}
+    return now - timedelta(days=count * days_per_unit[unit])
+
+
+def normalize_ohlcv(data):
+    """
+    Bring downloaded price data into the cached shape.
+
+    Keeps the OHLCV columns, drops timezone information so sources can be
+    merged, sorts the index and removes duplicate dates (latest value wins).
+    """
+    data = data[OHLCV_COLUMNS].copy()
+    data.index = pd.to_datetime(data.index)
+    if data.index.tz is not None:
+        data.index = data.index.tz_localize(None)
+    data.index.name = 'Date'
+    data = data[~data.index.duplicated(keep='last')]
+    return data.sort_index()
+
+
+class PriceStore:
+    """
+    Ticker-keyed store of daily OHLCV history with incremental refresh.
+
+    Staleness rules (on the NYSE calendar, see modules.trading_calendar):
+        - max_staleness_sessions: cached data is fresh while the last bar is at most
+          this many completed trading sessions behind the latest completed session
+          (whose bar is final 30 minutes after the close). Weekends and exchange
+          holidays are not sessions, so they never make data stale.
+        - A bar for the latest completed session that was written before the session
+          settled may be partial, so it is downloaded again.
+        - refresh_interval: once a refresh has been attempted after the latest
+          session settled, stale data is served without asking the source again
+          until this much time has passed (covers sources that lag a day behind).
+    """
+
+    def __init__(self, root=None, max_staleness_sessions=0, refresh_interval=timedelta(hours=6)):
+        self.root = root or os.path.join(
+            os.environ.get("TRENDLY_CACHE_DIR", DEFAULT_CACHE_DIR), "prices"
+        )
+        self.max_staleness_sessions = max_staleness_sessions
+        self.refresh_interval = refresh_interval
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, ticker):
+        """File holding the cached history for a ticker."""
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", ticker.upper())
+        extension = "parquet" if PARQUET_AVAILABLE else "pkl"
+        return os.path.join(self.root, f"{safe_name}.{extension}")
+
+    def load(self, ticker):
+        """Return the cached history for a ticker, or None if nothing is cached."""
+        path = self.path(ticker)
+        if not os.path.exists(path):
+            return None
+        try:
+            if PARQUET_AVAILABLE:
+                return pd.read_parquet(path)
+            return pd.read_pickle(path)
+        except Exception as e:
+            print(f"Ignoring unreadable price cache for {ticker}: {e}")
+            return None
+
+    def save(self, ticker, data):
+        """Atomically write a ticker's full history to disk."""
+        path = self.path(ticker)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        if PARQUET_AVAILABLE:
+            data.to_parquet(tmp_path)
+        else:
+            data.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+
+    def is_fresh(self, data, now=None):
+        """True if the last cached bar satisfies the max_staleness_sessions rule at `now`."""
+        latest = latest_completed_session(now)
+        last_date = pd.Timestamp(data.index[-1].date())
+        sessions_behind = len(trading_sessions(last_date + pd.Timedelta(days=1), latest))
+        return sessions_behind <= self.max_staleness_sessions
+
+    def last_checked(self, ticker):
+        """When the ticker's cache was last written or refreshed (New York time), or None."""
+        path = self.path(ticker)
+        if not os.path.exists(path):
+            return None
+        return datetime.fromtimestamp(os.path.getmtime(path), MARKET_TIMEZONE)
+
+    def needs_refresh(self, ticker, data, now=None):
+        """
+        True if cached data is missing, stale and not checked recently, or ends with a
+        bar for the latest completed session that was written before its close settled.
+        """
+        if data is None or data.empty:
+            return True
+        now = now.astimezone(MARKET_TIMEZONE) if now is not None else market_now()
+        latest = latest_completed_session(now)
+        checked = self.last_checked(ticker)
+        checked_after_settle = checked is not None and checked >= session_settled(latest)
+
+        if self.is_fresh(data, now):
+            # A bar for the latest session written during that session may be partial
+            return pd.Timestamp(data.index[-1].date()) >= latest and not checked_after_settle
+        return not (checked_after_settle and now - checked < self.refresh_interval)
+
+    @staticmethod
+    def refresh_start(cached):
+        """
+        First bar to download on a refresh: the last settled cached bar (the overlap
+        bar compared by adjustment_changed), followed by the possibly partial last bar.
+        """
+        return cached.index[-2] if len(cached) > 1 else cached.index[-1]
+
+    def adjustment_changed(self, cached, new_bars):
+        """True if the re-fetched overlap bar's close differs from the cache (split or dividend)."""
+        overlap = self.refresh_start(cached)
+        new_bars = normalize_ohlcv(new_bars)
+        if overlap not in new_bars.index:
+            return False
+        return not np.isclose(new_bars['Close'].loc[overlap], cached['Close'].loc[overlap],
+                              rtol=ADJUSTMENT_TOLERANCE, atol=0)
+
+    def merge(self, ticker, cached, new_bars):
+        """Merge newly downloaded bars into the cached history and persist the result."""
+        new_bars = normalize_ohlcv(new_bars)
+        if cached is None or cached.empty:
+            data = new_bars
+        else:
+            data = normalize_ohlcv(pd.concat([cached, new_bars]))
+        self.save(ticker, data)
+        return data
+
+    def get(self, ticker, period, fetch):
+        """
+        Serve a period slice of a ticker's history, refreshing the cache if stale.
+
+        Args:
+            ticker (str): The stock ticker symbol
+            period (str): Period to return ('2y', 'max', ...)
+            fetch (callable): fetch(start) -> DataFrame of OHLCV bars from `start`
+                onwards (start=None means the full history)
+
+        A refresh that finds the history re-adjusted downloads it again in full.
+
+        Returns:
+            pd.DataFrame: OHLCV data for the requested period
+        """
+        cached = self.load(ticker)
+
+        if cached is None or cached.empty:
+            data = self.merge(ticker, None, fetch(None))
+
+        elif not self.needs_refresh(ticker, cached):
+            data = cached
+
+        else:
+            try:
+                # Re-fetch the last cached bar too (it may have been a partial session),
+                # plus the settled bar before it to detect re-adjusted prices
+                new_bars = fetch(self.refresh_start(cached))
+                if self.adjustment_changed(cached, new_bars):
+                    print(f"Price history of {ticker} was re-adjusted, downloading it again")
+                    data = self.merge(ticker, None, fetch(None))
+                else:
+                    data = self.merge(ticker, cached, new_bars)
+            except Exception as e:
+                print(f"Price cache refresh failed for {ticker}, serving cached data: {e}")
+                data = cached
+                self.mark_checked(ticker)
+
+        return self.slice_period(ticker, data, period)
+
+    def mark_checked(self, ticker):
+        """Record a refresh attempt so the source is not asked again until refresh_interval passes."""
+        os.utime(self.path(ticker))
+
+    @staticmethod
+    def slice_period(ticker, data, period):
+        """Cut a period slice ('2y', 'max', ...) out of a ticker's full history."""
+        start = period_start(period)
+        if start is not None:
+            data = data[data.index >= start]
+
+        if data.empty:
+            raise ValueError(f"No data found for ticker {ticker}.")
+        return data
+
+
+_price_store = None
+
+
+def get_price_store():
+    """Shared PriceStore for this process (created on first use, configured from the environment)."""
+    global _price_store
+    if _price_store is None:
+        _price_store = PriceStore(
+            max_staleness_sessions=int(os.environ.get("TRENDLY_MAX_STALENESS_SESSIONS", 0)),
+            refresh_interval=timedelta(hours=float(os.environ.get("TRENDLY_REFRESH_INTERVAL_HOURS", 6)))
+        )
+    return _price_store
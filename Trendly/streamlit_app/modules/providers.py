@@ -0,0 +1,388 @@
+"""
+Market-data providers and the ordered fallback chain behind fetch_stock_history.
+
+A provider is any object with:
+
+    name       source name (health statistics, rate limits, error messages)
+    rate       requests per second allowed by the async fetch client
+    timeout    default seconds per request (None = no limit)
+    fetch(ticker, period="max", start=None) -> OHLCV DataFrame
+               bars from `start` onwards, else the `period` slice; raises
+               ValueError when the ticker has no (fresh) data
+    batch_backend() -> modules.batch_download backend, or None if the provider
+               cannot download many tickers in one request
+
+ProviderChain tries its providers in order (skipping ones modules.source_health
+knows to be stale), with a per-provider timeout. Built-in providers:
+
+    defeatbeta         Defeat Beta API (when installed)
+    yfinance           yfinance (when installed)
+    local:<dir>        pre-downloaded <TICKER>.parquet / <TICKER>.csv files
+    replay:<dir>       files recorded by a RecordReplayProvider; missing tickers fail
+    synthetic          seeded synthetic bars (modules.synthetic), for development
+
+The process-wide chain comes from the environment:
+
+    TRENDLY_PROVIDERS="local:/data/prices,yfinance"   (default: defeatbeta,yfinance)
+    TRENDLY_PROVIDER_TIMEOUTS="yfinance=20,defeatbeta=60"
+    TRENDLY_RECORD_DIR=/data/recorded   record every network response to this directory
+
+so scans, benchmarks and air-gapped nodes can run from disk without network access.
+"""
+import os
+import re
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import pandas as pd
+
+from modules.price_store import PARQUET_AVAILABLE, normalize_ohlcv, period_start
+from modules.source_health import get_source_health
+
+DEFAULT_PROVIDERS = "defeatbeta,yfinance"
+
+
+def _slice(data, ticker, period="max", start=None):
+    """Bars from `start` onwards, else the `period` slice; ValueError when nothing is left."""
+    start_date = pd.Timestamp(start) if start is not None else period_start(period)
+    if start_date is not None:
+        data = data[data.index >= pd.Timestamp(start_date)]
+    if data.empty:
+        raise ValueError(f"No data found for ticker {ticker}.")
+    return data
+
+
+# ========== Network providers ==========
+
+class DefeatBetaProvider:
+    """Defeat Beta API dataset snapshots (may lag the market by days)."""
+
+    name = 'defeatbeta'
+    rate = 10.0
+    timeout = 60.0
+
+    @staticmethod
+    def available():
+        from modules.helper import defeat_api_available
+        return defeat_api_available()
+
+    def fetch(self, ticker, period="max", start=None):
+        from modules.helper import _download_defeatbeta
+        return _download_defeatbeta(ticker, period, start=start)
+
+    def batch_backend(self):
+        return None
+
+
+class YFinanceProvider:
+    """Yahoo Finance through yfinance."""
+
+    name = 'yfinance'
+    rate = 5.0
+    timeout = 30.0
+
+    @staticmethod
+    def available():
+        return importlib.util.find_spec("yfinance") is not None
+
+    def fetch(self, ticker, period="max", start=None):
+        from modules.helper import _download_yfinance
+        return _download_yfinance(ticker, period, start=start)
+
+    def batch_backend(self):
+        from modules.batch_download import yfinance_batch_backend
+        return yfinance_batch_backend
+
+
+# ========== Local providers ==========
+
+class LocalDirectoryProvider:
+    """
+    Pre-downloaded daily bars, one <TICKER>.parquet or <TICKER>.csv file per ticker
+    (Date index plus OHLCV columns).
+
+    Args:
+        directory (str): Directory holding the files
+        name (str): Provider name
+    """
+
+    rate = 1000.0
+    timeout = None
+
+    def __init__(self, directory, name='local'):
+        self.directory = directory
+        self.name = name
+
+    def _paths(self, ticker):
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", ticker)
+        names = dict.fromkeys([safe_name, safe_name.upper()])
+        for base in names:
+            yield os.path.join(self.directory, f"{base}.parquet"), pd.read_parquet
+            yield os.path.join(self.directory, f"{base}.csv"), self._read_csv
+
+    @staticmethod
+    def _read_csv(path):
+        return pd.read_csv(path, index_col=0, parse_dates=True)
+
+    def read(self, ticker):
+        """A ticker's stored history as in the file, or None if there is no file."""
+        for path, reader in self._paths(ticker):
+            if os.path.exists(path):
+                return reader(path)
+        return None
+
+    def fetch(self, ticker, period="max", start=None):
+        data = self.read(ticker)
+        if data is None:
+            raise ValueError(f"No data found for ticker {ticker} in {self.directory}.")
+        return _slice(normalize_ohlcv(data), ticker, period, start)
+
+    def save(self, ticker, data):
+        """Atomically write a ticker's history (Parquet when pyarrow is installed, else CSV)."""
+        os.makedirs(self.directory, exist_ok=True)
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", ticker.upper())
+        extension = "parquet" if PARQUET_AVAILABLE else "csv"
+        path = os.path.join(self.directory, f"{safe_name}.{extension}")
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if PARQUET_AVAILABLE:
+            data.to_parquet(tmp_path)
+        else:
+            data.to_csv(tmp_path)
+        os.replace(tmp_path, path)
+
+    def batch_backend(self):
+        from modules.batch_download import LocalBatchBackend
+        return LocalBatchBackend(self.directory)
+
+
+class RecordReplayProvider:
+    """
+    Records another provider's responses to a directory, or replays them offline.
+
+    In 'record' mode every successful fetch is merged into <TICKER> files in the
+    directory (incremental fetches extend the recording). In 'replay' mode the
+    files are served like a LocalDirectoryProvider, and tickers that were never
+    recorded raise ValueError instead of reaching the network.
+
+    Args:
+        directory (str): Recording directory
+        provider (object, optional): Provider to record (required in 'record' mode)
+        mode (str): 'record' or 'replay'
+    """
+
+    def __init__(self, directory, provider=None, mode='replay'):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown record/replay mode '{mode}'.")
+        if mode == 'record' and provider is None:
+            raise ValueError("Recording needs a provider to record.")
+        self.mode = mode
+        self.provider = provider
+        self.recording = LocalDirectoryProvider(directory, name='replay')
+        self._lock = threading.Lock()
+
+        # Recording is transparent: statistics and rate limits stay with the provider
+        source = provider if mode == 'record' else self.recording
+        self.name = source.name
+        self.rate = source.rate
+        self.timeout = source.timeout
+
+    def fetch(self, ticker, period="max", start=None):
+        if self.mode == 'replay':
+            return self.recording.fetch(ticker, period, start)
+
+        data = self.provider.fetch(ticker, period, start=start)
+        with self._lock:
+            recorded = self.recording.read(ticker)
+            merged = normalize_ohlcv(data) if recorded is None else normalize_ohlcv(
+                pd.concat([normalize_ohlcv(recorded), normalize_ohlcv(data)])
+            )
+            self.recording.save(ticker, merged)
+        return data
+
+    def batch_backend(self):
+        # Bulk downloads would bypass the recording
+        return self.recording.batch_backend() if self.mode == 'replay' else None
+
+
+class SyntheticProvider:
+    """
+    Seeded synthetic bars from modules.synthetic, ending at the latest completed session.
+
+    Args:
+        sessions (int): Sessions generated per ticker (the 'max' period)
+        seed (int): Base random seed
+    """
+
+    name = 'synthetic'
+    rate = 1000.0
+    timeout = None
+
+    def __init__(self, sessions=2520, seed=0):
+        self.sessions = sessions
+        self.seed = seed
+
+    def fetch(self, ticker, period="max", start=None):
+        from modules.synthetic import synthetic_history
+        data = synthetic_history(ticker, sessions=self.sessions, seed=self.seed)
+        return _slice(data, ticker, period, start)
+
+    def batch_backend(self):
+        return None
+
+
+# ========== Fallback chain ==========
+
+class ProviderChain:
+    """
+    Ordered provider fallback with per-provider timeouts.
+
+    A provider that times out keeps its worker thread until the request returns
+    (threads cannot be cancelled), but the chain moves on to the next provider.
+
+    Args:
+        providers (list): Providers in order of preference
+        timeouts (dict, optional): {provider name: seconds or None}, overriding the
+            providers' own timeout attribute
+        health (SourceHealth, optional): Defaults to get_source_health()
+        max_threads (int): Threads running requests that have a timeout
+    """
+
+    def __init__(self, providers, timeouts=None, health=None, max_threads=16):
+        self.providers = list(providers)
+        self.timeouts = dict(timeouts or {})
+        self.health = health or get_source_health()
+        self._executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="trendly-provider")
+
+    def timeout_for(self, provider):
+        """Seconds allowed per request to a provider (None = no limit)."""
+        return self.timeouts.get(provider.name, provider.timeout)
+
+    def _call(self, provider, ticker, period, start):
+        timeout = self.timeout_for(provider)
+        if timeout is None:
+            return provider.fetch(ticker, period, start=start)
+        future = self._executor.submit(provider.fetch, ticker, period, start=start)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(f"{provider.name} did not answer within {timeout:g}s")
+
+    def fetch(self, ticker, period="max", start=None):
+        """
+        Fetch a ticker's daily bars from the first provider that has them.
+
+        Args:
+            ticker (str): Ticker symbol
+            period (str): Period slice ('2y', 'max', ...) when start is None
+            start (datetime, optional): Only return bars from this date onwards
+
+        Returns:
+            pd.DataFrame: OHLCV bars
+
+        Raises:
+            ValueError: No provider has data for the ticker
+            Exception: At least one provider failed for another reason (network, timeout)
+        """
+        if not self.providers:
+            raise Exception("No market-data provider is configured (see TRENDLY_PROVIDERS).")
+
+        errors = []
+        for provider in self.health.route(self.providers, ticker, name=lambda provider: provider.name):
+            try:
+                return self.health.call(provider.name, ticker,
+                                        lambda: self._call(provider, ticker, period, start))
+            except Exception as e:
+                errors.append((provider.name, e))
+                if provider is not self.providers[-1]:
+                    print(f"{provider.name} failed for {ticker}, trying the next provider: {e}")
+
+        message = "; ".join(f"{name}: {error}" for name, error in errors)
+        if all(isinstance(error, ValueError) for _, error in errors):
+            raise ValueError(f"No data found for ticker {ticker} ({message})")
+        raise Exception(f"Error fetching stock data for {ticker}: {message}")
+
+    def batch_backend(self):
+        """Bulk backend of the first provider that has one (None if no provider does)."""
+        for provider in self.providers:
+            backend = provider.batch_backend()
+            if backend is not None:
+                return backend
+        return None
+
+
+def parse_timeouts(text):
+    """Parse 'name=seconds,...' ('none' for no limit) into {name: seconds or None}."""
+    timeouts = {}
+    for item in filter(None, (part.strip() for part in (text or "").split(","))):
+        name, _, value = item.partition("=")
+        timeouts[name.strip()] = None if value.strip().lower() in ("", "none") else float(value)
+    return timeouts
+
+
+def build_provider_chain(spec=None, timeouts=None, record_dir=None):
+    """
+    Build a ProviderChain from a comma-separated spec.
+
+    Args:
+        spec (str, optional): e.g. 'local:/data/prices,yfinance'
+            (default: TRENDLY_PROVIDERS, else 'defeatbeta,yfinance')
+        timeouts (dict, optional): {name: seconds} (default: TRENDLY_PROVIDER_TIMEOUTS)
+        record_dir (str, optional): Record the network providers' responses here
+            (default: TRENDLY_RECORD_DIR)
+
+    Returns:
+        ProviderChain
+    """
+    spec = spec or os.environ.get("TRENDLY_PROVIDERS") or DEFAULT_PROVIDERS
+    if timeouts is None:
+        timeouts = parse_timeouts(os.environ.get("TRENDLY_PROVIDER_TIMEOUTS"))
+    record_dir = record_dir or os.environ.get("TRENDLY_RECORD_DIR")
+
+    providers = []
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        kind, _, argument = entry.partition(":")
+        if kind in ('defeatbeta', 'yfinance'):
+            provider = DefeatBetaProvider() if kind == 'defeatbeta' else YFinanceProvider()
+            if not provider.available():
+                print(f"Market-data provider '{kind}' is not installed, skipping it")
+                continue
+            if record_dir:
+                provider = RecordReplayProvider(record_dir, provider, mode='record')
+        elif kind == 'local':
+            provider = LocalDirectoryProvider(argument)
+        elif kind == 'replay':
+            provider = RecordReplayProvider(argument, mode='replay')
+        elif kind == 'synthetic':
+            provider = SyntheticProvider()
+        else:
+            raise ValueError(f"Unknown market-data provider '{entry}'.")
+        providers.append(provider)
+
+    return ProviderChain(providers, timeouts=timeouts)
+
+
+_provider_chain = None
+_provider_chain_lock = threading.Lock()
+
+
+def get_provider_chain():
+    """Shared ProviderChain for this process (built from the environment on first use)."""
+    global _provider_chain
+    with _provider_chain_lock:
+        if _provider_chain is None:
+            _provider_chain = build_provider_chain()
+    return _provider_chain
+
+
+def set_provider_chain(chain):
+    """
+    Replace the shared ProviderChain (e.g. with an offline one); returns the previous chain.
+
+    Call it before the first fetch: the shared async fetch client takes its sources
+    from the chain when it is created.
+    """
+    global _provider_chain
+    with _provider_chain_lock:
+        previous, _provider_chain = _provider_chain, chain
+    return previous
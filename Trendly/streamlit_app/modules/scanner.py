@@ -0,0 +1,230 @@
+"""
+Parallel scanner engine for universe-wide stock analysis.
+
+Runs generate_investment_analysis (deep profile unless the task asks for
+another) for many tickers on a process pool and yields each ticker's ranking
+summary as soon as it completes, so callers (e.g. the Streamlit progress bar)
+can update from their own thread.
+"""
+import os
+import time
+import multiprocessing
+from collections import deque
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+# Seconds a single ticker may run before it is reported as timed out
+DEFAULT_TICKER_TIMEOUT = 300
+
+# How often the scheduler loop wakes up to check per-ticker deadlines
+_POLL_INTERVAL = 0.5
+
+_THREAD_ENV_VARS = (
+    'OMP_NUM_THREADS',
+    'OPENBLAS_NUM_THREADS',
+    'MKL_NUM_THREADS',
+)
+
+
+def default_worker_count():
+    """Default number of worker processes: one per available core."""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+
+def threads_per_worker(max_workers):
+    """
+    Split the machine's cores between the worker processes.
+
+    Each worker runs n_jobs-aware models (RandomForest, XGBoost), so their thread
+    count is capped at cores // workers to avoid oversubscribing the CPU.
+
+    Args:
+        max_workers (int): Number of worker processes
+
+    Returns:
+        int: Threads each worker's models may use (at least 1)
+    """
+    return max(1, default_worker_count() // max(1, max_workers))
+
+
+def _init_worker(n_threads):
+    """Process pool initializer: cap model and BLAS threads for this worker."""
+    for var in _THREAD_ENV_VARS:
+        os.environ[var] = str(n_threads)
+
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(n_threads)
+    except Exception:
+        pass  # threadpoolctl ships with scikit-learn, but stay usable without it
+
+    from modules import helper
+    helper.MODEL_N_JOBS = n_threads
+
+
+def _warm_up():
+    """Start-up task run on every worker before any ticker's clock runs: loads the heavy imports."""
+    from modules.lazy_imports import import_heavy_modules
+    import_heavy_modules()
+    return os.getpid()
+
+
+def _analyze_ticker(ticker, forecast_days, features=None, trace=False, profile='deep'):
+    """Worker task: analyze one ticker and return only its ranking summary."""
+    from modules.helper import generate_investment_analysis, summarize_analysis
+
+    if features is not None and ticker in features:
+        # Memory-mapped views of the prepared universe: no fetch, no feature engineering
+        analysis = generate_investment_analysis(
+            ticker, forecast_days=forecast_days,
+            stock_data_enhanced=features.frame(ticker), ml_features=features.ml_features(ticker),
+            trace=trace, profile=profile
+        )
+    else:
+        analysis = generate_investment_analysis(ticker, forecast_days=forecast_days,
+                                                trace=trace, profile=profile)
+    return summarize_analysis(ticker, analysis)
+
+
+def analyze_ticker_task(features=None, trace=False, profile='deep'):
+    """
+    Picklable scan_tickers task running the analysis per ticker.
+
+    Args:
+        features (FeatureUniverse, optional): Prepared universe from modules.feature_store;
+            it pickles as its path and each worker maps the files itself
+        trace (bool): Record timing spans; the summaries then carry them under 'trace'
+        profile (str): Analysis profile (helper.ANALYSIS_PROFILES), 'deep' by default
+
+    Returns:
+        callable: task(ticker, forecast_days) -> summarize_analysis dict
+    """
+    if features is None and not trace and profile == 'deep':
+        return _analyze_ticker
+    return partial(_analyze_ticker, features=features, trace=trace, profile=profile)
+
+
+def _start_pool(max_workers):
+    """Start a worker pool and wait until every worker has loaded the heavy imports."""
+    # Spawn (not fork) so workers never inherit the Streamlit server's threads
+    pool = ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(threads_per_worker(max_workers),)
+    )
+    # Worker start-up (spawn + heavy imports) should not count against ticker timeouts
+    wait([pool.submit(_warm_up) for _ in range(max_workers)])
+    return pool
+
+
+def _terminate_pool(pool):
+    """Shut a pool down without waiting and terminate its workers, stopping any running task."""
+    # ProcessPoolExecutor cannot cancel a running task, so its processes are stopped directly
+    processes = list((getattr(pool, '_processes', None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join(timeout=5)
+
+
+def _task_outcome(ticker, future):
+    """(ticker, result, error) for a finished future."""
+    error = future.exception()
+    if error is None:
+        return ticker, future.result(), None
+    return ticker, None, error
+
+
+def scan_tickers(tickers, forecast_days=5, max_workers=None,
+                 timeout=DEFAULT_TICKER_TIMEOUT, task=None):
+    """
+    Analyze tickers in parallel and yield results in completion order.
+
+    At most max_workers tickers are in flight at once, so a ticker's clock starts
+    when it is handed to an idle worker. A ticker that exceeds its timeout is
+    reported with a TimeoutError and stopped: a process pool cannot cancel one
+    running task, so the pool's workers are terminated and a fresh pool carries
+    on. Tickers that were still running on the other workers are queued again
+    (their clocks restart).
+
+    Args:
+        tickers (list): Stock ticker symbols to analyze
+        forecast_days (int): Forecast horizon passed to the analysis
+        max_workers (int, optional): Worker processes (None = one per core). With 1
+            and no timeout the tickers run one after another in this process,
+            without a pool; with a timeout a single worker process is used, so
+            the timeout can be enforced.
+        timeout (float, optional): Seconds allowed per ticker (None = no limit)
+        task (callable, optional): Picklable task(ticker, forecast_days) -> result.
+            Defaults to generate_investment_analysis + summarize_analysis.
+
+    Yields:
+        tuple: (ticker, result, error) - exactly one of result / error is None
+    """
+    task = task or _analyze_ticker
+    tickers = list(tickers)
+    if max_workers is None:
+        max_workers = default_worker_count()
+    max_workers = max(1, min(max_workers, len(tickers) or 1))
+
+    # Sequential path: same behaviour as the original loop, no pool overhead
+    if max_workers == 1 and timeout is None:
+        for ticker in tickers:
+            try:
+                yield ticker, task(ticker, forecast_days), None
+            except Exception as e:
+                yield ticker, None, e
+        return
+
+    pending = deque(tickers)
+    running = {}  # future -> (ticker, deadline)
+    pool = _start_pool(max_workers)
+
+    try:
+        while running or pending:
+            while pending and len(running) < max_workers:
+                ticker = pending.popleft()
+                future = pool.submit(task, ticker, forecast_days)
+                deadline = time.monotonic() + timeout if timeout is not None else None
+                running[future] = (ticker, deadline)
+
+            done, _ = wait(running, timeout=_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                ticker, _ = running.pop(future)
+                yield _task_outcome(ticker, future)
+
+            # Tickers that overran their deadline
+            now = time.monotonic()
+            expired = [future for future, (_, deadline) in running.items()
+                       if deadline is not None and now >= deadline]
+            if not expired:
+                continue
+
+            for future in expired:
+                ticker, _ = running.pop(future)
+                yield ticker, None, TimeoutError(f"Analysis exceeded {timeout:.0f}s timeout")
+
+            # Stop the overrunning work; whatever finished meanwhile is kept, the rest re-queued
+            requeue = []
+            for future, (ticker, _) in running.items():
+                if future.done():
+                    yield _task_outcome(ticker, future)
+                else:
+                    requeue.append(ticker)
+            running.clear()
+            pending.extendleft(reversed(requeue))
+            _terminate_pool(pool)
+            pool = _start_pool(max_workers)
+
+    finally:
+        if running:
+            # Closed early: don't wait for work nobody will collect
+            _terminate_pool(pool)
+        else:
+            pool.shutdown(wait=True, cancel_futures=True)
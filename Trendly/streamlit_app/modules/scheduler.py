@@ -0,0 +1,313 @@
+"""
+Background precompute of the universe scan.
+
+Runs outside Streamlit, either once or as a worker loop that wakes up after every
+NYSE close. It runs the full "What Should I Invest In?" scan and writes the
+ranked recommendation (including the all_analyses table) to a snapshot store,
+and the prepared feature universe to the memory-mapped feature store.
+The Info page then reads the latest snapshot instead of scanning ~500 tickers
+inside the user's request.
+
+Usage (from the streamlit_app directory):
+    python -m modules.scheduler --once          # scan now and write a snapshot
+    python -m modules.scheduler                 # run after every close, forever
+    python -m modules.scheduler --pooled --workers 8
+    python -m modules.scheduler --pooled --compact   # pooled scan holding only model inputs
+"""
+import os
+import json
+import time
+import argparse
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from modules.price_store import DEFAULT_CACHE_DIR, get_price_store
+from modules.tracing import format_span_table
+from modules.trading_calendar import (TRADING_DAY, MARKET_TIMEZONE, market_now, is_session,
+                                      session_settled, latest_completed_session)
+
+# Wait before retrying a failed scan, doubled while the data keeps lagging
+RETRY_DELAY = timedelta(minutes=15)
+MAX_RETRY_DELAY = timedelta(hours=2)
+
+# Tickers fetched to check whether new bars arrived before rescanning the universe
+PROBE_SIZE = 5
+
+
+def _to_json(value):
+    """json.dump fallback for NumPy / pandas scalars in analysis results."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class SnapshotStore:
+    """
+    Directory of precomputed recommendation snapshots, one JSON file per session.
+
+    Args:
+        root (str, optional): Snapshot directory (default: TRENDLY_CACHE_DIR/snapshots)
+        keep (int): Most recent session snapshots kept on disk when a new one is saved
+    """
+
+    LATEST = "latest.json"
+    PREFIX = "recommendation_"
+
+    def __init__(self, root=None, keep=30):
+        self.root = root or os.path.join(
+            os.environ.get("TRENDLY_CACHE_DIR", DEFAULT_CACHE_DIR), "snapshots"
+        )
+        self.keep = keep
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, name):
+        return os.path.join(self.root, name)
+
+    def _write(self, name, snapshot):
+        """Atomically write a JSON file (readers never see a partial snapshot)."""
+        path = self.path(name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f, default=_to_json)
+        os.replace(tmp_path, path)
+
+    def save(self, recommendation, session, **metadata):
+        """
+        Store a recommendation computed from the given session's closing data.
+
+        Args:
+            recommendation (dict): Output of get_smart_investment_recommendation
+            session: Trading session the scan is based on
+            **metadata: Extra fields stored alongside (e.g. mode, duration)
+
+        Returns:
+            dict: The stored snapshot
+        """
+        snapshot = {
+            'session': str(pd.Timestamp(session).date()),
+            'generated_at': market_now().isoformat(),
+            'recommendation': recommendation,
+            **metadata
+        }
+        name = f"{self.PREFIX}{snapshot['session']}.json"
+        self._write(name, snapshot)
+        self._write(self.LATEST, snapshot)
+        self.prune(keep=name)
+        return snapshot
+
+    def prune(self, keep=None):
+        """
+        Remove session snapshots beyond the `self.keep` most recent sessions.
+
+        Args:
+            keep (str, optional): Snapshot file name that is never removed
+        """
+        names = sorted((name for name in os.listdir(self.root)
+                        if name.startswith(self.PREFIX) and name.endswith(".json")), reverse=True)
+        for name in names[self.keep:]:
+            if name != keep:
+                try:
+                    os.remove(self.path(name))
+                except FileNotFoundError:
+                    pass
+
+    def load_latest(self):
+        """The most recent snapshot, or None if no scan has been stored yet."""
+        try:
+            with open(self.path(self.LATEST)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable snapshot: {e}")
+            return None
+
+
+def is_current(snapshot, now=None):
+    """Whether a snapshot covers the latest completed trading session."""
+    if snapshot is None:
+        return False
+    return pd.Timestamp(snapshot['session']) >= latest_completed_session(now)
+
+
+def data_advanced(snapshot, probe_tickers):
+    """
+    Whether price data has moved past a snapshot's session, judged on a few tickers.
+
+    Fetches the probe tickers through the price cache (much cheaper than a scan)
+    and compares their median last bar with the snapshot's session, so one odd
+    ticker does not trigger a rescan.
+
+    Args:
+        snapshot (dict | None): Latest stored snapshot
+        probe_tickers (list): Tickers to fetch
+
+    Returns:
+        bool: True if the data is newer, there is no snapshot, or nothing could
+              be fetched (the scan then decides)
+    """
+    from modules.helper import fetch_stock_histories
+
+    if snapshot is None:
+        return True
+    histories = fetch_stock_histories(probe_tickers, period="1mo")
+    last_bars = [data.index[-1] for data in histories.values() if not data.empty]
+    if not last_bars:
+        return True
+    return sorted(last_bars)[len(last_bars) // 2] > pd.Timestamp(snapshot['session'])
+
+
+def next_run_time(now=None):
+    """
+    When the next scan should start: once the next session's daily bars are final.
+
+    Args:
+        now (datetime, optional): Current time (default: now in New York)
+
+    Returns:
+        datetime: Settle time of today's session if still ahead, else of the next session
+    """
+    now = now.astimezone(MARKET_TIMEZONE) if now is not None else market_now()
+    today = pd.Timestamp(now.date())
+    if is_session(today) and now < session_settled(today):
+        return session_settled(today)
+    return session_settled(today + TRADING_DAY)
+
+
+def run_scan(top_stocks=None, pooled=False, max_workers=None, store=None, compact=False):
+    """
+    Run the universe scan once and store its snapshot.
+
+    Args:
+        top_stocks (list, optional): Tickers to scan (default: the S&P 500)
+        pooled (bool): Use the pooled cross-ticker model
+        max_workers (int, optional): Worker processes for the per-ticker scan
+        store (SnapshotStore, optional): Where to write (default: SnapshotStore())
+        compact (bool): Retain less memory per stock (see modules.compact)
+
+    The stocks are ranked with the scan-lite analysis profile. The snapshot is
+    labelled with the latest completed session, or with the session the
+    downloaded data actually reaches if a source lags behind, so is_current()
+    keeps asking for a rescan until the new bars are in.
+
+    Returns:
+        dict | None: The stored snapshot, or None if no stock could be analyzed
+    """
+    from modules.helper import get_smart_investment_recommendation
+    from modules.source_health import get_source_health
+
+    store = store or SnapshotStore()
+    session = latest_completed_session()
+    started = time.time()
+
+    def report(completed, total, ticker):
+        if completed % 25 == 0 or completed == total:
+            print(f"Scanned {completed}/{total} stocks")
+
+    recommendation = get_smart_investment_recommendation(
+        top_stocks=top_stocks,
+        progress_callback=report,
+        max_workers=max_workers,
+        pooled=pooled,
+        compact=compact,
+        shared_features=True,
+        profile='scan-lite'
+    )
+    if recommendation is None:
+        print("Scan produced no results, keeping the previous snapshot")
+        return None
+    data_session = recommendation.get('data_session')
+    if data_session is not None and pd.Timestamp(data_session) < session:
+        print(f"Price data only reaches {data_session}, not the {session.date()} session")
+        session = pd.Timestamp(data_session)
+
+    snapshot = store.save(
+        recommendation, session,
+        mode='pooled' if pooled else 'per-ticker',
+        universe_size=len(recommendation['all_analyses']),
+        duration_seconds=round(time.time() - started, 1),
+        source_stats=get_source_health().summary().to_dict(orient='index')
+    )
+    for source, stats in snapshot['source_stats'].items():
+        print(f"  {source}: {stats['requests']} requests, {stats['stale']} stale, "
+              f"{stats['errors']} errors, mean latency {stats['mean_latency']:.2f}s")
+    print(f"Stored snapshot for {snapshot['session']}: {recommendation['recommended_stock']} "
+          f"({snapshot['universe_size']} stocks in {snapshot['duration_seconds']}s)")
+    if recommendation.get('trace'):
+        # Scan traced (TRENDLY_TRACE=1): per-stage timings summed over every ticker
+        spans = pd.DataFrame(recommendation['trace']).set_index('span')
+        print(format_span_table(spans).round(3).to_string())
+    return snapshot
+
+
+def run_forever(top_stocks=None, pooled=False, max_workers=None, store=None, compact=False):
+    """
+    Worker loop: scan whenever the stored snapshot is behind, then sleep until the next close.
+
+    While a source lags, the universe is only rescanned once PROBE_SIZE probe
+    tickers show bars past the stored snapshot (data_advanced); until then, and
+    after a failed scan, the loop waits RETRY_DELAY, doubling up to MAX_RETRY_DELAY.
+    """
+    from modules.helper import fetch_sp_tickers
+
+    store = store or SnapshotStore()
+    probe_tickers = list(top_stocks or fetch_sp_tickers())[:PROBE_SIZE]
+    # Ask lagging sources again on every retry, not only after the cache's refresh_interval
+    price_store = get_price_store()
+    price_store.refresh_interval = min(price_store.refresh_interval, RETRY_DELAY)
+    delay = RETRY_DELAY
+    while True:
+        snapshot = store.load_latest()
+        if not is_current(snapshot):
+            try:
+                if not data_advanced(snapshot, probe_tickers):
+                    print(f"Price data has not moved past {snapshot['session']} yet, checking again in {delay}")
+                    time.sleep(delay.total_seconds())
+                    delay = min(delay * 2, MAX_RETRY_DELAY)
+                    continue
+                run_scan(top_stocks, pooled=pooled, max_workers=max_workers, store=store,
+                         compact=compact)
+            except Exception as e:
+                print(f"Scheduled scan failed, retrying in {delay}: {e}")
+                time.sleep(delay.total_seconds())
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+                continue
+            if not is_current(store.load_latest()):
+                print(f"Snapshot still behind the latest session, retrying in {delay}")
+                time.sleep(delay.total_seconds())
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+                continue
+
+        delay = RETRY_DELAY
+        wake_at = next_run_time()
+        print(f"Next scan at {wake_at:%Y-%m-%d %H:%M %Z}")
+        time.sleep(max(0.0, (wake_at - market_now()).total_seconds()))
+
+
+def load_latest_snapshot():
+    """Latest precomputed snapshot from the default store (None if there is none)."""
+    return SnapshotStore().load_latest()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute the Trendly universe scan after market close.")
+    parser.add_argument("--once", action="store_true", help="scan once and exit")
+    parser.add_argument("--pooled", action="store_true", help="use the pooled cross-ticker model")
+    parser.add_argument("--compact", action="store_true", help="retain less memory per stock (see modules.compact)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--tickers", default=None, help="comma-separated tickers (default: the S&P 500)")
+    args = parser.parse_args(argv)
+
+    top_stocks = args.tickers.split(",") if args.tickers else None
+    if args.once:
+        run_scan(top_stocks, pooled=args.pooled, max_workers=args.workers, compact=args.compact)
+    else:
+        run_forever(top_stocks, pooled=args.pooled, max_workers=args.workers, compact=args.compact)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Per-source data freshness and health tracking.
+
+Defeat Beta API serves dataset snapshots that can lag the market by days.
+fetch_stock_history used to download a ticker's whole history from it, notice
+the data was stale, throw it away and go to yfinance, paying for two downloads
+per ticker. SourceHealth remembers the last data date each source returned per ticker,
+so requests are routed straight to a fresh source. A whole source is skipped
+only once a quorum of tickers has been observed and their median data date is
+stale (a single delisted or thinly traded ticker does not count). Stale
+observations expire after `recheck_after`, after which the lagging source is
+probed again.
+
+It also keeps request / hit / stale / error counts and latency per source.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+# Data older than this many calendar days counts as stale (weekend + holiday gap)
+MAX_DATA_AGE_DAYS = 3
+
+# Tickers observed before a source's median data date can mark the whole source stale
+SOURCE_QUORUM = 5
+
+
+class StaleDataError(ValueError):
+    """A source returned data whose latest bar is too old."""
+
+    def __init__(self, message, latest_date):
+        super().__init__(message)
+        self.latest_date = pd.Timestamp(latest_date)
+
+
+class SourceHealth:
+    """
+    Freshness and request statistics for each data source.
+
+    Args:
+        max_age_days (int): Calendar days after which a source's data is stale
+        recheck_after (timedelta): How long a stale observation keeps a source skipped
+        quorum (int): Unexpired ticker observations needed to judge a whole source
+    """
+
+    def __init__(self, max_age_days=MAX_DATA_AGE_DAYS, recheck_after=timedelta(hours=6),
+                 quorum=SOURCE_QUORUM):
+        self.max_age_days = max_age_days
+        self.recheck_after = recheck_after
+        self.quorum = quorum
+        self._lock = threading.Lock()
+        self._latest = {}  # source -> {ticker: (latest data date, observed at)}
+        self._newest = {}  # source -> (newest data date over all tickers, observed at), for summary()
+        self._stats = {}   # source -> counters
+
+    def _counters(self, source):
+        return self._stats.setdefault(source, {
+            'requests': 0, 'hits': 0, 'stale': 0, 'no_data': 0, 'errors': 0,
+            'total_latency': 0.0, 'max_latency': 0.0
+        })
+
+    def _observe(self, source, ticker, latest_date):
+        now = time.time()
+        latest_date = pd.Timestamp(latest_date)
+        if latest_date.tzinfo is not None:
+            latest_date = latest_date.tz_localize(None)
+        self._latest.setdefault(source, {})[ticker.upper()] = (latest_date, now)
+        newest = self._newest.get(source)
+        if newest is None or latest_date >= newest[0] or now - newest[1] > self.recheck_after.total_seconds():
+            self._newest[source] = (latest_date, now)
+
+    def record(self, source, ticker, latency, data=None, error=None):
+        """
+        Record the outcome of one request.
+
+        Args:
+            source (str): Source name
+            ticker (str): Requested ticker
+            latency (float): Seconds the request took
+            data (pd.DataFrame, optional): Returned bars (on success)
+            error (Exception, optional): Raised error (on failure)
+        """
+        with self._lock:
+            counters = self._counters(source)
+            counters['requests'] += 1
+            counters['total_latency'] += latency
+            counters['max_latency'] = max(counters['max_latency'], latency)
+
+            if error is None:
+                counters['hits'] += 1
+                if data is not None and not data.empty:
+                    self._observe(source, ticker, data.index[-1])
+            elif isinstance(error, StaleDataError):
+                counters['stale'] += 1
+                self._observe(source, ticker, error.latest_date)
+            elif isinstance(error, ValueError):
+                counters['no_data'] += 1
+            else:
+                counters['errors'] += 1
+
+    def _is_old(self, observation, now):
+        latest_date, observed_at = observation
+        if time.time() - observed_at > self.recheck_after.total_seconds():
+            return False  # Observation expired: probe the source again
+        return (now.date() - latest_date.date()).days > self.max_age_days
+
+    def _source_lagging(self, source, now):
+        """True if at least `quorum` unexpired observations have a stale median date."""
+        observed_after = time.time() - self.recheck_after.total_seconds()
+        observations = [observation for observation in self._latest.get(source, {}).values()
+                        if observation[1] >= observed_after]
+        if len(observations) < self.quorum:
+            return False
+        median_date = pd.Series([latest_date for latest_date, _ in observations]).median()
+        return (now.date() - median_date.date()).days > self.max_age_days
+
+    def is_stale(self, source, ticker=None, now=None):
+        """
+        Whether a source is known to serve stale data for a ticker.
+
+        A source is stale for a ticker when that ticker's last observed data date is
+        too old, or when the median data date over at least `quorum` tickers is too
+        old (the whole source is lagging). Unknown sources/tickers are not stale.
+        """
+        now = now or datetime.now()
+        with self._lock:
+            if self._source_lagging(source, now):
+                return True
+            if ticker is not None:
+                observation = self._latest.get(source, {}).get(ticker.upper())
+                if observation is not None and self._is_old(observation, now):
+                    return True
+        return False
+
+    def route(self, sources, ticker, name=lambda source: source):
+        """
+        Sources to try for a ticker, leaving out the ones known to be stale.
+
+        Args:
+            sources (list): Sources in order of preference
+            ticker (str): Requested ticker
+            name (callable): Maps a source to its name
+
+        Returns:
+            list: Fresh (or unknown) sources in the original order, or all sources if
+                  every one of them is stale
+        """
+        fresh = [source for source in sources if not self.is_stale(name(source), ticker)]
+        return fresh or list(sources)
+
+    def call(self, source, ticker, func):
+        """Run func() as a request to `source`, recording its outcome and latency."""
+        started = time.perf_counter()
+        try:
+            data = func()
+        except Exception as e:
+            self.record(source, ticker, time.perf_counter() - started, error=e)
+            raise
+        self.record(source, ticker, time.perf_counter() - started, data=data)
+        return data
+
+    def summary(self):
+        """
+        Per-source statistics.
+
+        Returns:
+            pd.DataFrame: One row per source with requests, hits, hit_rate, stale,
+                          no_data, errors, mean/max latency and the newest data date seen
+        """
+        with self._lock:
+            rows = {}
+            for source, counters in self._stats.items():
+                requests = counters['requests']
+                newest = self._newest.get(source)
+                rows[source] = {
+                    'requests': requests,
+                    'hits': counters['hits'],
+                    'hit_rate': counters['hits'] / requests if requests else 0.0,
+                    'stale': counters['stale'],
+                    'no_data': counters['no_data'],
+                    'errors': counters['errors'],
+                    'mean_latency': counters['total_latency'] / requests if requests else 0.0,
+                    'max_latency': counters['max_latency'],
+                    'newest_data': newest[0] if newest else None,
+                }
+        return pd.DataFrame.from_dict(rows, orient='index')
+
+
+_source_health = None
+_source_health_lock = threading.Lock()
+
+
+def get_source_health():
+    """Shared SourceHealth for this process (created on first use)."""
+    global _source_health
+    with _source_health_lock:
+        if _source_health is None:
+            _source_health = SourceHealth()
+    return _source_health
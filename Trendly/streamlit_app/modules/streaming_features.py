@@ -0,0 +1,282 @@
+"""
+Incremental (streaming) indicator state for engineer_features.
+
+StreamingFeatures keeps the running state behind every engineered feature
+(rolling windows, EMAs, Wilder RSI/ATR smoothing, OBV/VPT accumulators and
+monotonic min/max deques). Each new daily bar is absorbed in O(1) time with
+respect to history length, and the emitted row equals the last row
+engineer_features would produce for the full history.
+"""
+import math
+import numpy as np
+import pandas as pd
+from collections import deque
+
+from modules.panel_features import FEATURE_COLUMNS, OHLCV_FIELDS
+
+NAN = float('nan')
+
+
+class _RollingWindow:
+    """Fixed-size trailing window with a running sum; NaN-aware like pandas min_periods=window."""
+
+    def __init__(self, size):
+        self.size = size
+        self.values = deque(maxlen=size)
+        self.total = 0.0
+        self.nan_count = 0
+
+    def push(self, value):
+        if len(self.values) == self.size:
+            old = self.values[0]
+            if math.isnan(old):
+                self.nan_count -= 1
+            else:
+                self.total -= old
+        self.values.append(value)
+        if math.isnan(value):
+            self.nan_count += 1
+        else:
+            self.total += value
+
+    @property
+    def ready(self):
+        return len(self.values) == self.size and self.nan_count == 0
+
+    def mean(self):
+        return self.total / self.size if self.ready else NAN
+
+    def std(self, ddof=1):
+        # At most `size` values, so this stays O(1) in the history length
+        return float(np.std(self.values, ddof=ddof)) if self.ready else NAN
+
+
+class _RollingExtreme:
+    """Rolling min or max over a trailing window using a monotonic deque."""
+
+    def __init__(self, size, mode):
+        self.size = size
+        self.is_max = mode == 'max'
+        self.window = deque()  # (position, value), values monotonic
+        self.position = -1
+
+    def push(self, value):
+        self.position += 1
+        while self.window and (
+            self.window[-1][1] <= value if self.is_max else self.window[-1][1] >= value
+        ):
+            self.window.pop()
+        self.window.append((self.position, value))
+        if self.window[0][0] <= self.position - self.size:
+            self.window.popleft()
+
+    def value(self):
+        return self.window[0][1] if self.position >= self.size - 1 else NAN
+
+
+class _EWM:
+    """adjust=False exponential mean that only reports after min_periods observations."""
+
+    def __init__(self, alpha, min_periods=0):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.state = NAN
+        self.count = 0
+
+    def push(self, value):
+        if not math.isnan(value):
+            if math.isnan(self.state):
+                self.state = value
+            else:
+                self.state = (1 - self.alpha) * self.state + self.alpha * value
+            self.count += 1
+        return self.state if self.count >= self.min_periods else NAN
+
+
+class StreamingFeatures:
+    """
+    Stateful equivalent of engineer_features for one ticker.
+
+    Usage:
+        state, features = StreamingFeatures.from_history(stock_data)
+        row = state.update(open_, high, low, close, volume, date)  # one new bar
+    """
+
+    def __init__(self):
+        self.closes = deque(maxlen=11)  # Close[t-10] .. Close[t] for shifts and ROC
+        self.bars = 0
+
+        self.close_windows = {w: _RollingWindow(w) for w in (5, 10, 20, 50, 200)}
+        self.return_windows = {w: _RollingWindow(w) for w in (5, 10, 20)}
+        self.volume_windows = {w: _RollingWindow(w) for w in (10, 20)}
+        self.stoch_k_window = _RollingWindow(3)
+
+        self.ema_12 = _EWM(2 / (12 + 1))
+        self.ema_26 = _EWM(2 / (26 + 1))
+        self.macd_fast = _EWM(2 / (12 + 1), min_periods=12)
+        self.macd_slow = _EWM(2 / (26 + 1), min_periods=26)
+        self.macd_signal = _EWM(2 / (9 + 1), min_periods=9)
+        self.rsi_up = _EWM(1 / 14, min_periods=14)
+        self.rsi_down = _EWM(1 / 14, min_periods=14)
+
+        self.low_14 = _RollingExtreme(14, 'min')
+        self.high_14 = _RollingExtreme(14, 'max')
+        self.low_20 = _RollingExtreme(20, 'min')
+        self.high_20 = _RollingExtreme(20, 'max')
+
+        self.atr = 0.0
+        self.atr_seed = []  # First 14 true ranges, averaged to seed Wilder's ATR
+        self.obv = 0.0
+        self.vpt = NAN
+
+    @classmethod
+    def from_history(cls, stock_data):
+        """
+        Build the state by replaying an OHLCV history once.
+
+        Args:
+            stock_data (pd.DataFrame): Historical stock data with OHLCV columns
+
+        Returns:
+            tuple: (StreamingFeatures, pd.DataFrame of engineered features for the history)
+        """
+        state = cls()
+        rows = [state._advance(*bar) for bar in stock_data[OHLCV_FIELDS].itertuples(index=False)]
+        return state, pd.DataFrame(rows, index=stock_data.index, columns=OHLCV_FIELDS + FEATURE_COLUMNS)
+
+    @classmethod
+    def replay(cls, stock_data):
+        """
+        Build only the state for an OHLCV history, without collecting the feature rows.
+
+        Args:
+            stock_data (pd.DataFrame): Historical stock data with OHLCV columns
+
+        Returns:
+            StreamingFeatures: State positioned after the last bar
+        """
+        state = cls()
+        for bar in stock_data[OHLCV_FIELDS].itertuples(index=False):
+            state._advance(*bar)
+        return state
+
+    def _shifted_close(self, periods):
+        return self.closes[-1 - periods] if len(self.closes) > periods else NAN
+
+    def update(self, open_, high, low, close, volume, date=None):
+        """
+        Absorb one new daily bar.
+
+        Returns:
+            pd.Series: The engineer_features row for this bar (OHLCV + FEATURE_COLUMNS)
+        """
+        return pd.Series(self._advance(open_, high, low, close, volume),
+                         index=OHLCV_FIELDS + FEATURE_COLUMNS, name=date)
+
+    def _advance(self, open_, high, low, close, volume):
+        """Absorb one bar and return its features as a dict."""
+        open_, high, low, close, volume = map(float, (open_, high, low, close, volume))
+        self.closes.append(close)
+        self.bars += 1
+        f = {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}
+
+        # 1. PAST PRICES
+        prev_close = self._shifted_close(1)
+        f['Prev_Close_1'] = prev_close
+        f['Prev_Close_2'] = self._shifted_close(2)
+        f['Prev_Close_5'] = self._shifted_close(5)
+
+        # 2. MOVING AVERAGES
+        for window, rolling in self.close_windows.items():
+            rolling.push(close)
+            f[f'MA_{window}'] = rolling.mean()
+        f['EMA_12'] = self.ema_12.push(close)
+        f['EMA_26'] = self.ema_26.push(close)
+        f['MA_5_10_Cross'] = int(f['MA_5'] > f['MA_10'])
+        f['MA_50_200_Cross'] = int(f['MA_50'] > f['MA_200'])
+
+        # 3. MOMENTUM INDICATORS
+        diff = close - prev_close
+        daily_return = (close / prev_close - 1) * 100
+        f['Price_Change'] = diff
+        f['Daily_Return'] = daily_return
+
+        ema_up = self.rsi_up.push(diff if diff > 0 else 0.0)
+        ema_down = self.rsi_down.push(-diff if diff < 0 else 0.0)
+        if ema_down == 0:
+            f['RSI_14'] = 100.0
+        elif math.isnan(ema_up) or math.isnan(ema_down):
+            f['RSI_14'] = NAN
+        else:
+            f['RSI_14'] = 100 - (100 / (1 + ema_up / ema_down))
+
+        macd = self.macd_fast.push(close) - self.macd_slow.push(close)
+        f['MACD'] = macd
+        f['MACD_Signal'] = self.macd_signal.push(macd)
+        f['MACD_Diff'] = macd - f['MACD_Signal']
+
+        self.low_14.push(low)
+        self.high_14.push(high)
+        lowest, highest = self.low_14.value(), self.high_14.value()
+        f['Stoch_K'] = 100 * (close - lowest) / (highest - lowest) if highest != lowest else NAN
+        self.stoch_k_window.push(f['Stoch_K'])
+        f['Stoch_D'] = self.stoch_k_window.mean()
+
+        close_10 = self._shifted_close(10)
+        f['ROC_10'] = ((close - close_10) / close_10) * 100
+
+        # 4. VOLATILITY MEASURES
+        f['High_Low_Range'] = high - low
+        for window, rolling in self.return_windows.items():
+            rolling.push(daily_return)
+            f[f'Volatility_{window}'] = rolling.std(ddof=1)
+
+        true_range = high - low
+        if not math.isnan(prev_close):
+            true_range = max(true_range, abs(high - prev_close), abs(low - prev_close))
+        if len(self.atr_seed) < 14:
+            self.atr_seed.append(true_range)
+            if len(self.atr_seed) == 14:
+                self.atr = sum(self.atr_seed) / 14
+        else:
+            self.atr = (self.atr * 13 + true_range) / 14.0
+        f['ATR_14'] = self.atr
+
+        bb_mid = f['MA_20']
+        bb_std = self.close_windows[20].std(ddof=0)
+        f['BB_High'] = bb_mid + 2 * bb_std
+        f['BB_Mid'] = bb_mid
+        f['BB_Low'] = bb_mid - 2 * bb_std
+        f['BB_Width'] = f['BB_High'] - f['BB_Low']
+        band = f['BB_High'] - f['BB_Low']
+        f['BB_Position'] = (close - f['BB_Low']) / band if band != 0 else NAN
+
+        # 5. VOLUME INDICATORS
+        for window, rolling in self.volume_windows.items():
+            rolling.push(volume)
+            f[f'Avg_Volume_{window}'] = rolling.mean()
+        f['Volume_Ratio'] = volume / f['Avg_Volume_10']
+
+        self.obv += -volume if close < prev_close else volume
+        f['OBV'] = self.obv
+
+        if not math.isnan(prev_close):
+            step = (close / prev_close - 1) * volume
+            self.vpt = step if math.isnan(self.vpt) else self.vpt + step
+            f['VPT'] = self.vpt
+        else:
+            f['VPT'] = NAN
+
+        # 6. PATTERN RECOGNITION
+        self.low_20.push(low)
+        self.high_20.push(high)
+        support, resistance = self.low_20.value(), self.high_20.value()
+        f['Support_20'] = support
+        f['Resistance_20'] = resistance
+        f['Distance_Support'] = ((close - support) / support) * 100
+        f['Distance_Resistance'] = ((resistance - close) / close) * 100
+
+        for window in (5, 10, 20, 50, 200):
+            f[f'Price_Above_MA{window}'] = int(close > f[f'MA_{window}'])
+
+        return f
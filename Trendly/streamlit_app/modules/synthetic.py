@@ -0,0 +1,115 @@
+"""
+Seeded synthetic market data shaped like fetch_stock_history output.
+
+Prices follow a geometric Brownian motion split into an overnight and an
+intraday leg, so opens gap away from the previous close; occasional news days
+add a larger overnight jump and a volume spike. Volume is lognormal around a
+per-ticker level and rises with the size of the day's move. Optionally a few
+sessions are dropped, like a source that missed days.
+
+The same ticker and seed always produce the same frame, so benchmarks and
+development runs need no network access and are reproducible.
+"""
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from modules.price_store import OHLCV_COLUMNS
+from modules.trading_calendar import SESSIONS_PER_YEAR, trading_sessions, latest_completed_session
+
+
+def ticker_seed(ticker, seed=0):
+    """Stable per-ticker random seed (independent of PYTHONHASHSEED)."""
+    return zlib.crc32(f"{ticker.upper()}:{seed}".encode())
+
+
+def synthetic_history(ticker="SYN", sessions=504, end=None, seed=0, drift=0.08, volatility=0.30,
+                      overnight_share=0.3, jump_probability=0.02, jump_size=0.05,
+                      missing_probability=0.0):
+    """
+    Daily OHLCV bars for one synthetic ticker.
+
+    Args:
+        ticker (str): Ticker symbol (mixed into the seed, so tickers differ)
+        sessions (int): Number of trading sessions (504 is about fetch_stock_history's 2y)
+        end (date, optional): Last session (default: the latest completed session)
+        seed (int): Base random seed
+        drift (float): Annualised drift of the log price
+        volatility (float): Annualised volatility of the log price
+        overnight_share (float): Share of the daily variance realised overnight (open gaps)
+        jump_probability (float): Chance per session of a news jump at the open
+        jump_size (float): Standard deviation of a news jump (log return)
+        missing_probability (float): Chance per session that the bar is missing
+
+    Returns:
+        pd.DataFrame: Open, High, Low, Close, Volume indexed by Date
+    """
+    rng = np.random.default_rng(ticker_seed(ticker, seed))
+    end = pd.Timestamp(end) if end is not None else latest_completed_session()
+    index = trading_sessions(start=None, end=end, periods=sessions)
+
+    daily_sigma = volatility / np.sqrt(SESSIONS_PER_YEAR)
+    daily_mu = drift / SESSIONS_PER_YEAR - 0.5 * daily_sigma ** 2
+
+    # Overnight leg (with occasional jumps) then intraday leg
+    jumps = rng.random(sessions) < jump_probability
+    overnight = (rng.normal(daily_mu * overnight_share, daily_sigma * np.sqrt(overnight_share), sessions)
+                 + jumps * rng.normal(0.0, jump_size, sessions))
+    intraday = rng.normal(daily_mu * (1 - overnight_share), daily_sigma * np.sqrt(1 - overnight_share), sessions)
+
+    start_price = np.exp(rng.uniform(np.log(10), np.log(500)))
+    log_open = np.log(start_price) + np.cumsum(overnight) + np.concatenate([[0.0], np.cumsum(intraday)[:-1]])
+    open_ = np.exp(log_open)
+    close = np.exp(log_open + intraday)
+
+    # Intraday range beyond the open-close body
+    body_high = np.maximum(open_, close)
+    body_low = np.minimum(open_, close)
+    high = body_high * np.exp(np.abs(rng.normal(0.0, daily_sigma * 0.5, sessions)))
+    low = body_low * np.exp(-np.abs(rng.normal(0.0, daily_sigma * 0.5, sessions)))
+
+    # Volume: lognormal around a per-ticker level, heavier on large moves and news days
+    move = np.abs(overnight + intraday) / daily_sigma
+    base_volume = np.exp(rng.uniform(np.log(5e5), np.log(5e7)))
+    volume = base_volume * np.exp(rng.normal(0.0, 0.3, sessions) + 0.25 * move + jumps * 1.0)
+
+    data = pd.DataFrame({
+        'Open': open_,
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Volume': np.round(volume),
+    }, index=pd.DatetimeIndex(index.values, name='Date'))[OHLCV_COLUMNS]
+
+    if missing_probability > 0:
+        keep = rng.random(sessions) >= missing_probability
+        keep[[0, -1]] = True
+        data = data[keep]
+    return data
+
+
+def synthetic_tickers(n):
+    """n synthetic ticker symbols (SYN0000, SYN0001, ...)."""
+    return [f"SYN{i:04d}" for i in range(n)]
+
+
+def synthetic_universe(n, sessions=504, end=None, seed=0, **kwargs):
+    """
+    Synthetic histories for n tickers.
+
+    Args:
+        n (int): Number of tickers
+        sessions (int): Sessions per ticker
+        end (date, optional): Last session
+        seed (int): Base random seed
+        **kwargs: Passed to synthetic_history
+
+    Returns:
+        dict: {ticker: OHLCV DataFrame}
+    """
+    end = pd.Timestamp(end) if end is not None else latest_completed_session()
+    return {
+        ticker: synthetic_history(ticker, sessions=sessions, end=end, seed=seed, **kwargs)
+        for ticker in synthetic_tickers(n)
+    }
@@ -0,0 +1,190 @@
+"""
+Lightweight nested timing spans.
+
+    with start_trace(True) as tracer:
+        with span("fetch"):
+            ...
+        with span("ml"):
+            with span("train"):
+                ...
+    tracer.records()   # [{'span': 'fetch', 'depth': 0, 'start', 'wall', 'cpu'}, ...]
+
+The active tracer lives in a ContextVar, so spans opened anywhere below a
+start_trace block (including helper functions) nest under it, and concurrent
+Streamlit sessions / threads do not mix their spans. Each start_trace block gets
+its own tracer; spans recorded elsewhere (e.g. by scan worker processes) are
+merged in with Tracer.extend. Without an active tracer, span() returns a shared
+no-op context manager: one ContextVar lookup per span.
+
+CPU time is process CPU time (time.process_time), so it includes the worker
+threads of n_jobs-parallel models; CPU above wall time means parallel work.
+Tracing is enabled per call (trace=True) or for the whole process with the
+TRENDLY_TRACE=1 environment variable.
+"""
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import pandas as pd
+
+_active_tracer = ContextVar("trendly_tracer", default=None)
+
+
+def tracing_enabled(trace=None):
+    """Resolve a trace argument: None means the TRENDLY_TRACE environment variable."""
+    if trace is None:
+        return os.environ.get("TRENDLY_TRACE", "").lower() in ("1", "true", "yes")
+    return bool(trace)
+
+
+class Tracer:
+    """Collects finished spans with their nesting path, wall time and CPU time."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.stack = []
+        self.spans = []
+
+    def records(self):
+        """Finished spans in start order, as plain (JSON-serialisable) dicts."""
+        return sorted(self.spans, key=lambda record: record['start'])
+
+    def extend(self, records):
+        """
+        Add spans recorded elsewhere (e.g. by a worker process) under the current span.
+
+        Their start times are shifted onto this tracer's clock as if they just ended.
+        """
+        if not records:
+            return
+        prefix = "/".join(self.stack)
+        shift = (time.perf_counter() - self.origin) - max(record['start'] + record['wall'] for record in records)
+        for record in records:
+            self.spans.append({
+                **record,
+                'span': f"{prefix}/{record['span']}" if prefix else record['span'],
+                'depth': record['depth'] + len(self.stack),
+                'start': round(record['start'] + shift, 6),
+            })
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'path', 'wall_start', 'cpu_start')
+
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        tracer = self.tracer
+        tracer.stack.append(self.name)
+        self.path = "/".join(tracer.stack)
+        self.cpu_start = time.process_time()
+        self.wall_start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.process_time() - self.cpu_start
+        tracer = self.tracer
+        tracer.stack.pop()
+        tracer.spans.append({
+            'span': self.path,
+            'depth': len(tracer.stack),
+            'start': round(self.wall_start - tracer.origin, 6),
+            'wall': round(wall, 6),
+            'cpu': round(cpu, 6),
+        })
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name):
+    """Context manager timing a stage under the active tracer (no-op without one)."""
+    tracer = _active_tracer.get()
+    if tracer is None:
+        return _NO_SPAN
+    return _Span(tracer, name)
+
+
+def current_tracer():
+    """The active Tracer, or None when tracing is off."""
+    return _active_tracer.get()
+
+
+@contextmanager
+def start_trace(trace=None):
+    """
+    Activate a new tracer for the enclosed block.
+
+    Args:
+        trace (bool, optional): Enable tracing (None: TRENDLY_TRACE environment variable)
+
+    Yields:
+        Tracer | None: The new tracer (None when tracing is off; spans then go to an
+                       enclosing tracer, if any)
+    """
+    if not tracing_enabled(trace):
+        yield None
+        return
+
+    tracer = Tracer()
+    token = _active_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _active_tracer.reset(token)
+
+
+def aggregate_spans(record_lists):
+    """
+    Aggregate span records from many traces (e.g. every ticker of a scan) by span path.
+
+    Args:
+        record_lists (list): Lists of records from Tracer.records()
+
+    Returns:
+        pd.DataFrame: One row per span path (in first-seen order) with calls,
+                      total/mean/max wall time, total CPU time and the share of the
+                      total top-level wall time
+    """
+    records = [record for records in record_lists for record in records]
+    if not records:
+        return pd.DataFrame(columns=['depth', 'calls', 'wall_total', 'wall_mean', 'wall_max',
+                                     'cpu_total', 'share'])
+
+    spans = pd.DataFrame(records)
+    summary = spans.groupby('span', sort=False).agg(
+        depth=('depth', 'first'),
+        calls=('wall', 'size'),
+        wall_total=('wall', 'sum'),
+        wall_mean=('wall', 'mean'),
+        wall_max=('wall', 'max'),
+        cpu_total=('cpu', 'sum'),
+    )
+    top_level_wall = spans.loc[spans['depth'] == 0, 'wall'].sum()
+    summary['share'] = summary['wall_total'] / top_level_wall if top_level_wall > 0 else 0.0
+    return summary
+
+
+def format_span_table(summary):
+    """Span summary with names indented by depth, for display."""
+    table = summary.reset_index()
+    table['span'] = [
+        " " * int(depth) + path.rsplit("/", 1)[-1]
+        for path, depth in zip(table['span'], table['depth'])
+    ]
+    return table.drop(columns='depth').set_index('span')
@@ -0,0 +1,123 @@
+"""
+Local NYSE trading calendar.
+
+Time-series models index prices by trading session instead of calendar day:
+weekends and exchange holidays are skipped instead of forward-filled, and forecast
+steps map to real trading dates. The holiday rules follow the NYSE schedule
+(ad-hoc closures such as national days of mourning are not included).
+"""
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+from pandas.tseries.holiday import (AbstractHolidayCalendar, Holiday, GoodFriday,
+                                    USMartinLutherKingJr, USPresidentsDay, USMemorialDay,
+                                    USLaborDay, USThanksgivingDay, nearest_workday,
+                                    sunday_to_monday)
+from pandas.tseries.offsets import CustomBusinessDay
+
+# Average number of trading sessions per calendar year
+SESSIONS_PER_YEAR = 252
+
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+
+# Daily bars keep settling for a while after the close
+CLOSE_SETTLE = timedelta(minutes=30)
+
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """Full-day NYSE holidays."""
+    rules = [
+        # A Saturday New Year's Day is not observed on the Friday before
+        Holiday('New Years Day', month=1, day=1, observance=sunday_to_monday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-06-19', observance=nearest_workday),
+        Holiday('Independence Day', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas', month=12, day=25, observance=nearest_workday),
+    ]
+
+
+# Date offset of one NYSE trading session
+TRADING_DAY = CustomBusinessDay(calendar=NYSEHolidayCalendar())
+
+
+def trading_sessions(start, end=None, periods=None):
+    """
+    NYSE trading sessions between two dates (inclusive) or a number of sessions from start.
+
+    Returns:
+        pd.DatetimeIndex: Session dates with freq=TRADING_DAY
+    """
+    return pd.date_range(start=start, end=end, periods=periods, freq=TRADING_DAY)
+
+
+def to_sessions(series):
+    """
+    Index a daily series by trading session.
+
+    Bars on non-session dates are dropped and sessions without a bar (e.g. a missed
+    download day) take the previous session's value, so the index has a fixed
+    TRADING_DAY frequency for time-series models.
+
+    Args:
+        series (pd.Series): Daily values indexed by date
+
+    Returns:
+        pd.Series: The series on the session index
+    """
+    sessions = trading_sessions(series.index[0], series.index[-1])
+    return series.reindex(sessions, method='ffill')
+
+
+def next_sessions(last_date, periods):
+    """The `periods` trading sessions after last_date."""
+    return trading_sessions(pd.Timestamp(last_date) + TRADING_DAY, periods=periods)
+
+
+def calendar_days_to_sessions(days):
+    """Number of trading sessions spanning roughly `days` calendar days."""
+    return max(1, round(days * SESSIONS_PER_YEAR / 365))
+
+
+def market_now():
+    """Current time in New York."""
+    return datetime.now(MARKET_TIMEZONE)
+
+
+def session_open(session):
+    """Opening time of a session date, in New York time."""
+    return datetime.combine(pd.Timestamp(session).date(), MARKET_OPEN, MARKET_TIMEZONE)
+
+
+def session_settled(session):
+    """Time after which a session's daily bar is final (close + CLOSE_SETTLE)."""
+    return datetime.combine(pd.Timestamp(session).date(), MARKET_CLOSE, MARKET_TIMEZONE) + CLOSE_SETTLE
+
+
+def is_session(date):
+    """Whether NYSE trades on this date."""
+    return TRADING_DAY.is_on_offset(pd.Timestamp(pd.Timestamp(date).date()))
+
+
+def latest_completed_session(now=None):
+    """
+    The most recent session whose daily bar is final at `now`.
+
+    Args:
+        now (datetime, optional): Current time (default: now in New York)
+
+    Returns:
+        pd.Timestamp: Session date
+    """
+    now = now.astimezone(MARKET_TIMEZONE) if now is not None else market_now()
+    today = pd.Timestamp(now.date())
+    if is_session(today) and now >= session_settled(today):
+        return today
+    return TRADING_DAY.rollback(today - pd.Timedelta(days=1))
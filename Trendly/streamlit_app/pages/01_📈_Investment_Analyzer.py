@@ -1,9 +1,16 @@
+from time import perf_counter
+_page_started = perf_counter()
+
 import streamlit as st
-from modules.helper import (fetch_sp_tickers, fetch_stock_history, 
-                            generate_investment_analysis)
+from modules.helper import fetch_sp_tickers
+from modules.analysis_cache import cached_investment_analysis
+from modules.tracing import aggregate_spans, format_span_table, tracing_enabled
+from modules.lazy_imports import start_warm_up, record_startup, import_report
 import plotly.graph_objects as go
 from datetime import datetime
 
+record_startup("Investment Analyzer page: imports", _page_started)
+
 # Page Configuration
 st.set_page_config(
     page_title="Investment Analyzer - Trendly", 
@@ -240,7 +247,7 @@ with st.sidebar:
         value=30,
         label_visibility="collapsed"
     )
-    st.caption(f"Forecasting **{days_to_forecast} days** ahead")
+    st.caption(f"Forecasting **{days_to_forecast} trading days** ahead")
     
     st.markdown("---")
     
@@ -315,7 +322,7 @@ if run_analysis:
     with st.spinner('🔄 Analyzing market data and generating predictions... Please wait...'):
         try:
             # Generate analysis
-            analysis = generate_investment_analysis(stock_symbol, forecast_days=days_to_forecast)
+            analysis = cached_investment_analysis(stock_symbol, forecast_days=days_to_forecast)
             
             # Success message
             st.markdown("""
@@ -546,7 +553,7 @@ if run_analysis:
             
             # Simple price chart
             st.markdown("## Price Forecast")
-            st.caption(f"Predicted prices for the next {days_to_forecast} days")
+            st.caption(f"Predicted prices for the next {days_to_forecast} trading days")
             
             fig = go.Figure()
             
@@ -613,6 +620,12 @@ if run_analysis:
                     st.text(f"Volume Ratio: {indicators['Volume_Ratio']:.2f}x")
                     st.text(f"Momentum: {indicators['Momentum']:.2f}%")
             
+            # Per-stage timings (only when tracing is enabled, TRENDLY_TRACE=1)
+            if analysis.get('trace'):
+                with st.expander("⏱️ Timing Breakdown"):
+                    st.dataframe(format_span_table(aggregate_spans([analysis['trace']])),
+                                 use_container_width=True)
+            
             # Download option
             st.markdown('<div class="divider"></div>', unsafe_allow_html=True)
             
@@ -665,3 +678,13 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+record_startup("Investment Analyzer page: render", _page_started)
+
+# Import / startup timings of this server process (only when tracing is enabled, TRENDLY_TRACE=1)
+if tracing_enabled():
+    with st.expander("⏱️ Startup Import Times", expanded=False):
+        st.dataframe(import_report(), use_container_width=True)
+
+# The page is rendered: load the ML libraries in the background for the first analysis
+start_warm_up()
+
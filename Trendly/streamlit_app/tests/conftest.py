@@ -0,0 +1,7 @@
+"""Make the app's `modules` package importable when pytest runs from any directory."""
+import os
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.ar_model import ARModel, fit_ar_many, forecast_many
+from modules.trading_calendar import trading_sessions
+
+# Reference values from statsmodels 0.15 AutoReg(series, lags=p).fit() on the series below:
+# params, predict(start=80, end=84), predict(start=70, end=79, dynamic=True) and
+# predict(start=p, end=p + 4)
+EXPECTED = {
+    2: {
+        'params': [2.185347665326, 0.646592924801, -0.300284718606],
+        'forecast': [3.662166908246, 3.460959238153, 3.323486662209, 3.295017455844, 3.317890382218],
+        'dynamic': [2.870827564605, 3.244538869323, 3.421177895068, 3.423171645381, 3.371418790086,
+                    3.337357067263, 3.330873589868, 3.33690963411, 3.342759386795, 3.344729263647],
+        'in_sample': [5.971726189674, 3.133796682975, 2.389898580933, 3.011526605379, 3.389310472531],
+    },
+    5: {
+        'params': [1.177717565487, 1.473007706207, -1.755337976866, 1.625828827693, -0.965664418686,
+                   0.269526919971],
+        'forecast': [3.298058063882, 2.923336758323, 3.443128887481, 3.752979565202, 3.210493009386],
+        'dynamic': [2.545124549189, 3.421885966103, 3.670042194392, 3.077090934186, 3.089219542768,
+                    3.675273640012, 3.549883946316, 2.99565670718, 3.180672157472, 3.659532680862],
+        'in_sample': [2.433881658927, 2.937158952917, 2.692169707998, 3.37125884385, 3.788656085569],
+    },
+}
+
+
+def reference_series(n=80):
+    """Deterministic AR(2) process with a periodic disturbance."""
+    t = np.arange(n)
+    noise = 0.5 * np.sin(1.7 * t) + 0.3 * np.cos(0.45 * t ** 1.1)
+    y = np.empty(n)
+    y[:2] = 10.0, 10.5
+    for i in range(2, n):
+        y[i] = 2 + 0.6 * y[i - 1] - 0.2 * y[i - 2] + noise[i]
+    return pd.Series(y)
+
+
+@pytest.mark.parametrize("lags", sorted(EXPECTED))
+def test_matches_statsmodels_autoreg(lags):
+    series = reference_series()
+    expected = EXPECTED[lags]
+    model = ARModel.fit(series, lags)
+
+    np.testing.assert_allclose(model.params, expected['params'], rtol=1e-9)
+    np.testing.assert_allclose(model.predict(start=80, end=84), expected['forecast'], rtol=1e-9)
+    np.testing.assert_allclose(model.predict(start=70, end=79, dynamic=True), expected['dynamic'], rtol=1e-9)
+    np.testing.assert_allclose(model.predict(start=lags, end=lags + 4), expected['in_sample'], rtol=1e-9)
+
+
+def test_session_labels_select_the_same_predictions():
+    series = reference_series()
+    series.index = trading_sessions("2024-01-02", periods=len(series))
+    model = ARModel.fit(series, 2)
+
+    dynamic = model.predict(start=series.index[70], end=series.index[-1], dynamic=True)
+    assert dynamic.index.equals(series.index[70:])
+    np.testing.assert_allclose(dynamic.values, EXPECTED[2]['dynamic'], rtol=1e-9)
+
+
+def test_batched_fit_matches_single_fits():
+    series = {f"S{i}": reference_series() * (1 + i / 10) + i for i in range(4)}
+    models = fit_ar_many(series, 5)
+    forecasts = forecast_many(models, 5)
+
+    for name, values in series.items():
+        single = ARModel.fit(values, 5)
+        np.testing.assert_allclose(models[name].params, single.params, rtol=1e-8)
+        np.testing.assert_allclose(np.asarray(forecasts[name]), np.asarray(single.forecast(5)), rtol=1e-8)
@@ -0,0 +1,212 @@
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import pytest
+
+from modules.async_fetch import AsyncFetchClient, HTTPCSVSource, SyncSource
+from modules.source_health import SourceHealth
+from modules.synthetic import synthetic_history
+
+
+class FakeMarketServer:
+    """
+    Local HTTP server serving synthetic CSV histories at /<source>/<ticker>.csv?start=.
+
+    Tickers listed in `failures` answer 503 for their first n requests; unknown
+    tickers answer 404. Every request is logged with its arrival time.
+    """
+
+    def __init__(self, tickers, delay=0.2):
+        self.data = {ticker: synthetic_history(ticker, sessions=300) for ticker in tickers}
+        self.delay = delay
+        self.failures = {}
+        self.requests = defaultdict(list)  # (source, ticker) -> arrival times
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.handle(self)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def url(self, source):
+        return f"http://127.0.0.1:{self.httpd.server_port}/{source}/{{ticker}}.csv?start={{start}}"
+
+    def count(self, ticker, source="primary"):
+        return len(self.requests[(source, ticker)])
+
+    def handle(self, request):
+        url = urlparse(request.path)
+        source, filename = url.path.strip("/").split("/")
+        ticker = filename.split(".")[0]
+        with self.lock:
+            self.requests[(source, ticker)].append(time.monotonic())
+            attempt = len(self.requests[(source, ticker)])
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if ticker not in self.data:
+                request.send_response(404)
+                request.end_headers()
+                return
+            if attempt <= self.failures.get(ticker, 0):
+                request.send_response(503)
+                request.end_headers()
+                return
+            data = self.data[ticker]
+            start = parse_qs(url.query).get("start", [""])[0]
+            if start:
+                data = data[data.index >= start]
+            body = data.to_csv().encode()
+            request.send_response(200)
+            request.send_header("Content-Length", str(len(body)))
+            request.end_headers()
+            request.wfile.write(body)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = FakeMarketServer([f"T{i}" for i in range(8)] + ["FLAKY", "DOWN"])
+    yield server
+    server.close()
+
+
+def make_client(server, sources=("primary",), **kwargs):
+    return AsyncFetchClient([HTTPCSVSource(name, server.url(name), rate=100) for name in sources],
+                            health=SourceHealth(), **kwargs)
+
+
+def test_concurrent_requests_for_a_ticker_share_one_fetch(server):
+    client = make_client(server)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.fetch_sync("T1"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert server.count("T1") == 1
+    assert len(results) == 8
+    for data in results:
+        pd.testing.assert_frame_equal(data, results[0])
+    pd.testing.assert_series_equal(results[0]['Close'], server.data["T1"]['Close'],
+                                   check_freq=False, check_exact=False)
+
+
+def test_different_start_dates_are_not_coalesced(server):
+    client = make_client(server)
+    start = server.data["T2"].index[-10]
+    results = client.fetch_many_sync(["T2"], starts={"T2": start})
+    full = client.fetch_sync("T2")
+
+    assert server.count("T2") == 2
+    assert len(results["T2"]) == 10
+    assert len(full) == len(server.data["T2"])
+
+
+def test_transient_errors_are_retried_with_backoff(server):
+    server.failures["FLAKY"] = 2
+    client = make_client(server, retries=3, backoff=0.2)
+
+    data = client.fetch_sync("FLAKY")
+
+    assert len(data) == len(server.data["FLAKY"])
+    arrivals = server.requests[("primary", "FLAKY")]
+    assert len(arrivals) == 3
+    # Each gap is the request time plus a jittered delay of 0.5-1x backoff * 2**attempt
+    gaps = [later - earlier - server.delay for earlier, later in zip(arrivals, arrivals[1:])]
+    assert gaps[0] >= 0.1 - 0.02
+    assert gaps[1] >= 0.2 - 0.02
+
+
+def test_retries_are_bounded(server):
+    server.failures["DOWN"] = 100
+    client = make_client(server, retries=2, backoff=0.01)
+
+    with pytest.raises(Exception, match="DOWN"):
+        client.fetch_sync("DOWN")
+    assert server.count("DOWN") == 3
+
+
+def test_missing_data_moves_to_the_next_source_without_retrying(server):
+    client = make_client(server, sources=("primary", "backup"), retries=3, backoff=0.5)
+    del server.data["T3"]
+
+    with pytest.raises(Exception, match="No data"):
+        client.fetch_sync("T3")
+    assert server.count("T3", "primary") == 1
+    assert server.count("T3", "backup") == 1
+
+
+def test_concurrency_is_capped(server):
+    client = make_client(server, max_concurrency=2)
+
+    results = client.fetch_many_sync([f"T{i}" for i in range(6)] + ["NOPE"])
+
+    assert server.max_active <= 2
+    assert all(isinstance(results[f"T{i}"], pd.DataFrame) for i in range(6))
+    assert isinstance(results["NOPE"], Exception)
+
+
+class HungProvider:
+    """Blocking fetch function that never answers until released."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+    def __call__(self, ticker, start):
+        self.calls += 1
+        self.release.wait(5)
+        raise ValueError("released")
+
+
+def test_timeouts_move_to_the_next_source_without_retrying(server):
+    hung = HungProvider()
+    client = AsyncFetchClient([SyncSource("hung", hung, rate=100, timeout=0.1),
+                               HTTPCSVSource("backup", server.url("backup"), rate=100)],
+                              health=SourceHealth(), retries=3, backoff=0.01)
+    try:
+        data = client.fetch_sync("T4")
+    finally:
+        hung.release.set()
+
+    assert hung.calls == 1
+    assert len(data) == len(server.data["T4"])
+
+
+def test_hung_threads_are_capped_per_source():
+    hung = HungProvider()
+    source = SyncSource("hung", hung, rate=100, timeout=0.1, max_threads=2)
+    client = AsyncFetchClient([source], health=SourceHealth(), retries=0)
+    try:
+        results = client.fetch_many_sync([f"T{i}" for i in range(5)])
+        time.sleep(0.1)  # Let the worker threads pick up their calls
+        calls = hung.calls
+    finally:
+        hung.release.set()
+
+    assert calls == 2
+    assert all(isinstance(result, Exception) for result in results.values())
+    assert sum("still running" in str(result) for result in results.values()) == 3
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from modules.backtest import walk_forward
+from modules.helper import engineer_features, ENSEMBLE_PARAMS
+from modules.synthetic import synthetic_history
+
+# Small ensembles keep the walk-forward quick
+TEST_PARAMS = {name: {**params, 'n_estimators': 10} for name, params in ENSEMBLE_PARAMS.items()}
+
+
+def backtest(history):
+    return walk_forward(engineer_features(history), horizon=5, step=21, min_train=150, params=TEST_PARAMS)
+
+
+def test_folds_do_not_see_future_bars():
+    history = synthetic_history("SYN0000", sessions=504)
+    trades = backtest(history)
+
+    # Perturb every bar from the middle of a fold on
+    cut = trades.index[21 * 3 + 10]
+    perturbed = history.copy()
+    future = perturbed.index >= cut
+    perturbed.loc[future, ['Open', 'High', 'Low', 'Close']] *= 1.5
+    perturbed.loc[future, 'Volume'] *= 3
+    perturbed_trades = backtest(perturbed)
+
+    before = trades.index < cut
+    assert before.sum() > 21 * 3
+    pd.testing.assert_index_equal(perturbed_trades.index, trades.index)
+    for column in ['predicted_return', 'confidence', 'score']:
+        np.testing.assert_array_equal(perturbed_trades.loc[before, column], trades.loc[before, column])
+    assert not np.array_equal(perturbed_trades.loc[~before, 'score'], trades.loc[~before, 'score'])
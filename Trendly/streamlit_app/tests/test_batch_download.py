@@ -0,0 +1,79 @@
+import pandas as pd
+import pytest
+
+from modules import helper
+from modules.batch_download import LocalBatchBackend
+from modules.price_store import OHLCV_COLUMNS, PriceStore
+from modules.providers import LocalDirectoryProvider
+from modules.synthetic import synthetic_history, synthetic_tickers
+
+
+class CountingBackend:
+    """LocalBatchBackend that records the symbols of every request."""
+
+    def __init__(self, directory):
+        self.backend = LocalBatchBackend(directory)
+        self.calls = []
+
+    def __call__(self, symbols, period=None, start=None):
+        self.calls.append(list(symbols))
+        return self.backend(symbols, period=period, start=start)
+
+
+@pytest.fixture
+def files(tmp_path):
+    directory = str(tmp_path / "bars")
+    provider = LocalDirectoryProvider(directory)
+    tickers = synthetic_tickers(5)
+    for ticker in tickers:
+        provider.save(ticker, synthetic_history(ticker, sessions=120))
+    provider.save("EMPTY", pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([], name='Date'), dtype=float))
+    return directory, tickers
+
+
+def test_histories_are_split_per_ticker(files):
+    directory, tickers = files
+    histories = helper.fetch_stock_histories(tickers, period="max", backend=LocalBatchBackend(directory),
+                                             use_cache=False)
+
+    assert list(histories) == tickers
+    for ticker in tickers:
+        expected = synthetic_history(ticker, sessions=120)
+        assert list(histories[ticker].columns) == OHLCV_COLUMNS
+        assert len(histories[ticker]) == 120
+        pd.testing.assert_series_equal(histories[ticker]['Close'], expected['Close'],
+                                       check_freq=False, check_names=False, check_index_type=False)
+
+
+def test_missing_and_empty_symbols_are_left_out(files):
+    directory, tickers = files
+    requested = [tickers[0], "MISSING", "EMPTY", tickers[1]]
+    histories = helper.fetch_stock_histories(requested, period="max", backend=LocalBatchBackend(directory),
+                                             use_cache=False)
+
+    assert list(histories) == [tickers[0], tickers[1]]
+
+
+def test_requests_are_chunked(files):
+    directory, tickers = files
+    backend = CountingBackend(directory)
+    histories = helper.fetch_stock_histories(tickers, period="max", backend=backend, batch_size=2,
+                                             use_cache=False)
+
+    assert backend.calls == [tickers[0:2], tickers[2:4], tickers[4:5]]
+    assert len(histories) == 5
+
+
+def test_cached_histories_skip_the_backend(files, tmp_path, monkeypatch):
+    directory, tickers = files
+    store = PriceStore(root=str(tmp_path / "cache"))
+    monkeypatch.setattr(helper, "get_price_store", lambda: store)
+    backend = CountingBackend(directory)
+
+    first = helper.fetch_stock_histories(tickers, period="max", backend=backend, batch_size=2)
+    second = helper.fetch_stock_histories(tickers, period="max", backend=backend, batch_size=2)
+
+    assert len(backend.calls) == 3
+    assert list(second) == tickers
+    for ticker in tickers:
+        pd.testing.assert_frame_equal(second[ticker], first[ticker], check_freq=False)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.compact import (compact_frame, frame_nbytes, prepare_compact_universe,
+                             FULL_PRECISION_COLUMNS, SCORING_COLUMNS)
+from modules.helper import engineer_features, prepare_ml_features
+from modules.panel_features import engineer_features_universe
+from modules.pooled_model import score_universe_pooled
+from modules.synthetic import synthetic_history, synthetic_tickers
+
+END = "2024-12-31"
+
+
+@pytest.fixture(scope="module")
+def histories():
+    return {ticker: synthetic_history(ticker, sessions=400, end=END) for ticker in synthetic_tickers(8)}
+
+
+def test_compact_universe_keeps_float64_model_inputs(histories):
+    universe = prepare_compact_universe(histories, chunk_size=3)
+    frames = engineer_features_universe(histories)
+
+    for ticker, frame in frames.items():
+        X, y, _, close = prepare_ml_features(frame)
+        X_compact, y_compact, _, close_compact = universe.ml_features(ticker)
+        assert X_compact.dtype == np.float64
+        np.testing.assert_array_equal(X_compact, X)
+        np.testing.assert_array_equal(y_compact, y)
+        np.testing.assert_array_equal(close_compact, close)
+    assert universe.nbytes() < 0.8 * frame_nbytes(frames)
+
+
+def test_compact_pooled_scan_ranks_like_the_full_scan(histories):
+    full = score_universe_pooled(engineer_features_universe(histories))
+    universe = prepare_compact_universe(histories, chunk_size=3)
+    compact = score_universe_pooled(universe.tails, features=universe)
+
+    ranking = lambda results: [(r['ticker'], r['score'], r['recommendation'])
+                               for r in sorted(results, key=lambda r: -r['score'])]
+    assert ranking(compact) == ranking(full)
+
+
+def test_compact_frames_keep_prices_and_scoring_indicators_exact():
+    full = engineer_features(synthetic_history("COMPACT", end=END))
+    compact = compact_frame(full)
+
+    exact = FULL_PRECISION_COLUMNS + SCORING_COLUMNS
+    pd.testing.assert_frame_equal(compact[exact], full[exact])
+    assert compact.memory_usage(index=False).sum() < 0.75 * full.memory_usage(index=False).sum()
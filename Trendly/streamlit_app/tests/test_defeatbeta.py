@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+from modules import helper
+from modules.providers import ProviderChain, SyntheticProvider, DefeatBetaProvider
+from modules.source_health import SourceHealth, StaleDataError
+from modules.trading_calendar import latest_completed_session, trading_sessions
+
+
+class FakeTicker:
+    """defeatbeta_api Ticker serving a fixed frame in its own column layout."""
+
+    frame = None
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    def price(self):
+        return self.frame.copy()
+
+
+class FakeModule:
+    Ticker = FakeTicker
+
+
+def defeatbeta_frame(last_session, sessions=10):
+    dates = trading_sessions(None, last_session, periods=sessions)
+    return pd.DataFrame({'report_date': dates.values, 'open': 1.0, 'high': 1.0, 'low': 1.0,
+                         'close': 1.0, 'volume': 1.0})
+
+
+@pytest.fixture
+def defeatbeta(monkeypatch):
+    monkeypatch.setattr(helper, 'optional_import', lambda name, *args, **kwargs: FakeModule)
+    FakeTicker.frame = defeatbeta_frame(latest_completed_session())
+    return FakeTicker
+
+
+def test_incremental_refresh_from_a_newer_cache_is_stale(defeatbeta):
+    cached_until = latest_completed_session() + pd.Timedelta(days=1)
+
+    with pytest.raises(StaleDataError) as error:
+        helper._download_defeatbeta("AAA", start=cached_until)
+
+    assert error.value.latest_date == latest_completed_session()
+
+
+def test_incremental_refresh_returns_the_new_bars(defeatbeta):
+    data = helper._download_defeatbeta("AAA", start=latest_completed_session())
+
+    assert list(data.columns) == ['Open', 'High', 'Low', 'Close', 'Volume']
+    assert len(data) == 1
+
+
+def test_chain_falls_back_when_defeatbeta_is_behind_the_cache(defeatbeta):
+    health = SourceHealth()
+    chain = ProviderChain([DefeatBetaProvider(), SyntheticProvider()], timeouts={}, health=health)
+    FakeTicker.frame = defeatbeta_frame(trading_sessions(None, latest_completed_session(), periods=2)[0])
+
+    data = chain.fetch("AAA", start=latest_completed_session())
+
+    assert data.index[-1] == latest_completed_session()
+    assert health.summary().loc['defeatbeta', 'stale'] == 1
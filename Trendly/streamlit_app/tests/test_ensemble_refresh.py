@@ -0,0 +1,28 @@
+import numpy as np
+
+from modules import helper
+from modules.helper import (engineer_features, prepare_ml_features, fit_ensemble_artifacts,
+                            refresh_ensemble_artifacts, ENSEMBLE_PARAMS)
+from modules.synthetic import synthetic_history
+
+TEST_PARAMS = {name: {**params, 'n_estimators': 10} for name, params in ENSEMBLE_PARAMS.items()}
+
+
+def test_drift_scaler_learns_the_new_rows_not_the_train_tail(monkeypatch):
+    monkeypatch.setitem(helper.INCREMENTAL_TRAINING, 'drift_threshold', np.inf)
+    X, y, _, _ = prepare_ml_features(engineer_features(synthetic_history("SYN0000", sessions=504)))
+    n_new_rows = 5
+
+    # Yesterday's fit on the train split of the rows known then
+    previous_train = int(0.85 * (len(X) - n_new_rows))
+    artifacts = fit_ensemble_artifacts(X[:previous_train], y[:previous_train], params=TEST_PARAMS)
+
+    # Today the new bars land in the test rows, after X_train
+    train_size = int(0.85 * len(X))
+    artifacts, mode = refresh_ensemble_artifacts(artifacts, X[:train_size], y[:train_size],
+                                                 X[-n_new_rows:], params=TEST_PARAMS)
+
+    assert mode == 'warm'
+    expected = np.vstack([X[:previous_train], X[-n_new_rows:]])
+    assert artifacts['drift_scaler'].n_samples_seen_ == len(expected)
+    np.testing.assert_allclose(artifacts['drift_scaler'].mean_, expected.mean(axis=0))
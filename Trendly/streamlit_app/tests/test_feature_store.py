@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.compact import compact_dtypes
+from modules.feature_store import FeatureStore
+from modules.helper import engineer_features, prepare_ml_features
+from modules.synthetic import synthetic_history
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FeatureStore(root=str(tmp_path))
+
+
+def universe_frames(end):
+    return {ticker: engineer_features(synthetic_history(ticker, sessions=300, end=end))
+            for ticker in ("AAA", "BBB")}
+
+
+def universe_dirs(store):
+    return sorted(name for name in os.listdir(store.root) if name.startswith(FeatureStore.PREFIX))
+
+
+def test_writing_a_new_session_prunes_older_universes(store):
+    store.write(universe_frames("2024-12-30"))
+    store.write(universe_frames("2024-12-31"))
+
+    assert universe_dirs(store) == ["universe_2024-12-31"]
+    assert store.open_latest().session.date().isoformat() == "2024-12-31"
+
+
+def test_keep_retains_recent_universes(tmp_path):
+    store = FeatureStore(root=str(tmp_path), keep=2)
+    for end in ("2024-12-27", "2024-12-30", "2024-12-31"):
+        store.write(universe_frames(end))
+
+    assert universe_dirs(store) == ["universe_2024-12-30", "universe_2024-12-31"]
+
+
+def test_frames_keep_their_dtypes_and_values(store):
+    frames = universe_frames("2024-12-31")
+    universe = store.write(frames)
+
+    # Columns come back grouped by dtype (float64 first)
+    stored = universe.frame("AAA")
+    assert sorted(stored.columns) == sorted(frames["AAA"].columns)
+    pd.testing.assert_frame_equal(stored, frames["AAA"][stored.columns], check_freq=False)
+
+
+def test_compact_write_stores_compact_frames_and_float64_model_inputs(store):
+    frames = universe_frames("2024-12-31")
+    universe = store.write(frames, compact=True)
+
+    stored = universe.frame("AAA")
+    assert stored.dtypes.to_dict() == {column: np.dtype(dtype)
+                                       for column, dtype in compact_dtypes(stored.columns).items()}
+    X, y, _, close = prepare_ml_features(frames["AAA"])
+    np.testing.assert_array_equal(universe.ml_features("AAA")[0], X)
+    np.testing.assert_array_equal(universe.ml_features("AAA")[1], y)
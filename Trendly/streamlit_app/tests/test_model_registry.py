@@ -0,0 +1,91 @@
+import os
+
+import joblib
+import pytest
+
+from modules.model_registry import ModelRegistry
+
+PARAMS = {'n_estimators': 10}
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(root=str(tmp_path), max_entries=10)
+
+
+def save_day(registry, ticker, day):
+    key = ModelRegistry.make_key(ticker, 'ensemble', f"2026-10-{day:02d}", PARAMS, ['f1'], data=([day],))
+    registry.save(key, {'ticker': ticker, 'day': day})
+    return key
+
+
+def test_save_supersedes_older_artifacts_of_the_same_spec(registry):
+    for day in (13, 14, 15):
+        save_day(registry, "AAA", day)
+    save_day(registry, "BBB", 15)
+
+    assert len(registry.entries()) == 2
+    prefix = ModelRegistry.spec_prefix("AAA", 'ensemble', PARAMS, ['f1'])
+    assert registry.latest(prefix, before="2026-10-16") == {'ticker': 'AAA', 'day': 15}
+
+
+def test_previous_day_survives_a_universe_larger_than_max_entries_per_day(registry):
+    # Two daily scans of 8 tickers with max_entries=10: without pruning, day 2
+    # would evict most of day 1's artifacts before they are used as warm-start bases
+    tickers = [f"T{i}" for i in range(8)]
+    for ticker in tickers:
+        save_day(registry, ticker, 15)
+
+    for ticker in tickers:
+        prefix = ModelRegistry.spec_prefix(ticker, 'ensemble', PARAMS, ['f1'])
+        assert registry.latest(prefix, before="2026-10-16") == {'ticker': ticker, 'day': 15}
+        save_day(registry, ticker, 16)
+
+    assert len(registry.entries()) == len(tickers)
+
+
+def test_saving_older_data_keeps_the_newer_artifact(registry):
+    newer = save_day(registry, "AAA", 15)
+    older = save_day(registry, "AAA", 10)
+
+    assert os.path.exists(registry.path(newer))
+    assert os.path.exists(registry.path(older))
+
+
+def test_other_configurations_are_kept(registry):
+    save_day(registry, "AAA", 15)
+    other = ModelRegistry.make_key("AAA", 'ensemble', "2026-10-16", {'n_estimators': 60}, ['f1'], data=([1],))
+    registry.save(other, 'lite')
+
+    assert len(registry.entries()) == 2
+
+
+def evict_during_load(monkeypatch, before):
+    """Let another process evict the file just before or just after joblib.load reads it."""
+    load = joblib.load
+
+    def racing_load(path):
+        if before:
+            os.remove(path)
+            return load(path)
+        artifact = load(path)
+        os.remove(path)
+        return artifact
+
+    monkeypatch.setattr(joblib, "load", racing_load)
+
+
+def test_artifact_evicted_before_loading_is_a_miss(registry, monkeypatch):
+    save_day(registry, "AAA", 15)
+    evict_during_load(monkeypatch, before=True)
+
+    prefix = ModelRegistry.spec_prefix("AAA", 'ensemble', PARAMS, ['f1'])
+    assert registry.latest(prefix) is None
+
+
+def test_artifact_evicted_after_loading_is_still_returned(registry, monkeypatch):
+    save_day(registry, "AAA", 15)
+    evict_during_load(monkeypatch, before=False)
+
+    prefix = ModelRegistry.spec_prefix("AAA", 'ensemble', PARAMS, ['f1'])
+    assert registry.latest(prefix) == {'ticker': 'AAA', 'day': 15}
@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from modules.helper import engineer_features
+from modules.panel_features import engineer_features_universe
+from modules.synthetic import synthetic_history, synthetic_tickers
+
+END = "2024-12-31"
+
+
+@pytest.fixture(scope="module")
+def histories():
+    histories = {ticker: synthetic_history(ticker, sessions=504, end=END) for ticker in synthetic_tickers(6)}
+    # Shorter history (NaN-padded in the panel) and one with missed sessions
+    histories['SHORT'] = synthetic_history('SHORT', sessions=300, end=END)
+    histories['GAPS'] = synthetic_history('GAPS', sessions=504, end=END, missing_probability=0.02)
+    return histories
+
+
+def test_panel_matches_per_ticker_features(histories):
+    panel = engineer_features_universe(histories)
+
+    assert set(panel) == set(histories)
+    for ticker, data in histories.items():
+        pd.testing.assert_frame_equal(panel[ticker], engineer_features(data),
+                                      check_dtype=False, check_freq=False, rtol=1e-9, atol=1e-9)
+
+
+def test_panel_of_a_chunk_matches_the_whole_panel_exactly(histories):
+    # Compact scans (modules.compact) engineer the universe a chunk of tickers at a time
+    whole = engineer_features_universe(histories)
+    chunk = engineer_features_universe({ticker: histories[ticker] for ticker in ('GAPS', 'SHORT')})
+
+    for ticker, frame in chunk.items():
+        pd.testing.assert_frame_equal(frame, whole[ticker], check_exact=True)
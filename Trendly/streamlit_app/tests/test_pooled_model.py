@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+from modules.panel_features import engineer_features_universe
+from modules.pooled_model import build_pooled_dataset, load_ticker_metadata
+from modules.synthetic import synthetic_history, synthetic_tickers
+
+
+@pytest.fixture(scope="module")
+def frames():
+    histories = {ticker: synthetic_history(ticker, sessions=320) for ticker in synthetic_tickers(4)}
+    return engineer_features_universe(histories)
+
+
+def score_codes(dataset):
+    column = dataset['feature_names'].index('Ticker_Code')
+    return dict(zip(dataset['tickers'], dataset['X_score'][:, column]))
+
+
+def test_ticker_codes_do_not_depend_on_the_universe(frames):
+    tickers = sorted(frames)
+    everything = score_codes(build_pooled_dataset(frames))
+    subset = score_codes(build_pooled_dataset({ticker: frames[ticker] for ticker in tickers[2:]}))
+
+    assert len(set(everything.values())) == len(tickers)
+    assert all(subset[ticker] == everything[ticker] for ticker in subset)
+
+
+def test_sector_code_needs_a_sector_map(frames):
+    assert load_ticker_metadata()['Sector'].nunique() == 1  # The bundled CSV has no sectors
+    assert build_pooled_dataset(frames)['feature_names'][-1] == 'Ticker_Code'
+
+    tickers = sorted(frames)
+    metadata = pd.DataFrame({'Security': tickers, 'Sector': ['Energy', 'Energy', 'Utilities', 'Utilities']},
+                            index=pd.Index(tickers, name='Symbol'))
+    dataset = build_pooled_dataset(frames, metadata)
+
+    assert dataset['feature_names'][-2:] == ['Ticker_Code', 'Sector_Code']
+    assert list(dataset['X_score'][:, -1]) == [0, 0, 1, 1]
@@ -0,0 +1,142 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from modules import price_store
+from modules.price_store import PriceStore
+from modules.trading_calendar import MARKET_TIMEZONE, trading_sessions, latest_completed_session
+
+
+def ny(*args):
+    return datetime(*args, tzinfo=MARKET_TIMEZONE)
+
+
+def history(last_session, sessions=5):
+    index = pd.DatetimeIndex(trading_sessions(None, last_session, periods=sessions).values, name='Date')
+    return pd.DataFrame({'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': 1.0, 'Volume': 1.0}, index=index)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PriceStore(root=str(tmp_path))
+
+
+def write(store, ticker, data, written_at):
+    store.save(ticker, data)
+    os.utime(store.path(ticker), (written_at.timestamp(), written_at.timestamp()))
+
+
+# 2026-10-15 is a Thursday, 2026-10-16 a Friday; the close settles at 16:30 New York time
+
+def test_previous_session_is_fresh_before_the_close(store):
+    assert store.is_fresh(history("2026-10-15"), now=ny(2026, 10, 16, 15, 0))
+
+
+@pytest.mark.parametrize("hour", [17, 23])
+def test_previous_session_is_stale_after_the_close(store, hour):
+    data = history("2026-10-15")
+    now = ny(2026, 10, 16, hour, 0)
+    write(store, "AAA", data, written_at=ny(2026, 10, 16, 10, 0))
+
+    assert not store.is_fresh(data, now=now)
+    assert store.needs_refresh("AAA", data, now=now)
+
+
+def test_stale_data_checked_after_the_close_waits_for_refresh_interval(store):
+    # The source did not have the new session yet when asked at 16:45
+    data = history("2026-10-15")
+    write(store, "AAA", data, written_at=ny(2026, 10, 16, 16, 45))
+
+    assert not store.needs_refresh("AAA", data, now=ny(2026, 10, 16, 20, 0))
+    assert store.needs_refresh("AAA", data, now=ny(2026, 10, 16, 23, 0))
+
+
+def test_partial_bar_written_during_the_session_is_refreshed_after_the_close(store):
+    data = history("2026-10-16")
+    write(store, "AAA", data, written_at=ny(2026, 10, 16, 14, 0))
+
+    assert not store.needs_refresh("AAA", data, now=ny(2026, 10, 16, 15, 0))
+    assert store.needs_refresh("AAA", data, now=ny(2026, 10, 16, 17, 0))
+
+
+def test_final_bar_is_fresh_over_the_weekend(store):
+    data = history("2026-10-16")
+    write(store, "AAA", data, written_at=ny(2026, 10, 16, 18, 0))
+
+    assert not store.needs_refresh("AAA", data, now=ny(2026, 10, 18, 12, 0))
+
+
+def test_exchange_holiday_does_not_make_data_stale(store):
+    # Thanksgiving (2026-11-26) is not a session: Wednesday's bar stays current until Friday's close
+    data = history("2026-11-25")
+    write(store, "AAA", data, written_at=ny(2026, 11, 25, 18, 0))
+
+    assert store.is_fresh(data, now=ny(2026, 11, 26, 20, 0))
+    assert not store.needs_refresh("AAA", data, now=ny(2026, 11, 26, 20, 0))
+    assert store.is_fresh(data, now=ny(2026, 11, 27, 12, 0))
+    assert not store.is_fresh(data, now=ny(2026, 11, 27, 17, 0))
+
+
+def test_max_staleness_sessions_tolerates_lagging_bars(tmp_path):
+    store = PriceStore(root=str(tmp_path), max_staleness_sessions=1)
+
+    assert store.is_fresh(history("2026-10-15"), now=ny(2026, 10, 16, 17, 0))
+    assert not store.is_fresh(history("2026-10-14"), now=ny(2026, 10, 16, 17, 0))
+
+
+def stale_history():
+    """Cached history ending three sessions before the latest one, written long ago."""
+    return history(trading_sessions(None, latest_completed_session(), periods=4)[0])
+
+
+def source_history(close):
+    return history(latest_completed_session(), sessions=8).assign(Close=close)
+
+
+def test_refresh_merges_new_bars_when_the_overlap_bar_matches(store):
+    cached = stale_history()
+    write(store, "AAA", cached, written_at=ny(2026, 1, 2, 18, 0))
+    starts = []
+
+    def fetch(start):
+        starts.append(start)
+        data = source_history(1.0)
+        return data if start is None else data[data.index >= start]
+
+    data = store.get("AAA", "max", fetch)
+
+    assert starts == [cached.index[-2]]
+    assert data.index[-1] == latest_completed_session()
+    assert len(data) == len(cached) + 3
+
+
+def test_refresh_downloads_everything_again_after_a_readjustment(store):
+    # A split halved every historical (adjusted) close at the source
+    cached = stale_history()
+    write(store, "AAA", cached, written_at=ny(2026, 1, 2, 18, 0))
+    starts = []
+
+    def fetch(start):
+        starts.append(start)
+        data = source_history(0.5)
+        return data if start is None else data[data.index >= start]
+
+    data = store.get("AAA", "max", fetch)
+
+    assert starts == [cached.index[-2], None]
+    assert (data['Close'] == 0.5).all()
+    assert (store.load("AAA")['Close'] == 0.5).all()
+
+
+def test_shared_store_reads_staleness_settings_from_the_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("TRENDLY_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("TRENDLY_MAX_STALENESS_SESSIONS", "2")
+    monkeypatch.setenv("TRENDLY_REFRESH_INTERVAL_HOURS", "1.5")
+    monkeypatch.setattr(price_store, '_price_store', None)
+
+    store = price_store.get_price_store()
+
+    assert store.max_staleness_sessions == 2
+    assert store.refresh_interval.total_seconds() == 5400
@@ -0,0 +1,56 @@
+import os
+import time
+
+import pytest
+
+from modules.scanner import scan_tickers
+
+
+def _sleepy_task(ticker, forecast_days):
+    """Sleeps for the number of seconds in the ticker ("0.1", "30", ...), or raises for "FAIL"."""
+    if ticker == "FAIL":
+        raise ValueError("no data")
+    pid_dir = os.environ.get("SCANNER_TEST_PID_DIR")
+    if pid_dir:
+        with open(os.path.join(pid_dir, ticker), "w") as f:
+            f.write(str(os.getpid()))
+    time.sleep(float(ticker))
+    return {'ticker': ticker, 'pid': os.getpid()}
+
+
+def _collect(scan):
+    return {ticker: (result, error) for ticker, result, error in scan}
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def test_sequential_without_timeout_runs_in_process():
+    results = _collect(scan_tickers(["0", "FAIL"], max_workers=1, timeout=None, task=_sleepy_task))
+
+    assert results["0"][0]['pid'] == os.getpid()
+    assert isinstance(results["FAIL"][1], ValueError)
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_timeout_is_enforced_and_the_worker_stopped(max_workers, tmp_path, monkeypatch):
+    monkeypatch.setenv("SCANNER_TEST_PID_DIR", str(tmp_path))
+    started = time.monotonic()
+    results = _collect(scan_tickers(["30", "0.1", "0.2"], max_workers=max_workers, timeout=2,
+                                    task=_sleepy_task))
+
+    # The 30s ticker is reported, the others still complete
+    assert isinstance(results["30"][1], TimeoutError)
+    assert results["0.1"][0]['ticker'] == "0.1"
+    assert results["0.2"][0]['ticker'] == "0.2"
+    assert time.monotonic() - started < 25
+
+    # The process that ran it was terminated rather than left running
+    pid = int((tmp_path / "30").read_text())
+    assert pid != os.getpid()
+    assert not _alive(pid)
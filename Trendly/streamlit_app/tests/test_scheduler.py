@@ -0,0 +1,113 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+import pytest
+
+from modules import helper, scheduler
+from modules.scheduler import SnapshotStore, is_current, run_scan
+from modules.trading_calendar import MARKET_TIMEZONE
+
+# 2026-10-16 is a Friday; its bar is final at 16:30 New York time
+AFTER_CLOSE = datetime(2026, 10, 16, 17, 0, tzinfo=MARKET_TIMEZONE)
+
+
+def recommendation(data_session):
+    return {'recommended_stock': 'AAA', 'all_analyses': [{'ticker': 'AAA'}], 'data_session': data_session}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(scheduler, 'latest_completed_session',
+                        lambda now=None: pd.Timestamp("2026-10-16"))
+    return SnapshotStore(root=str(tmp_path))
+
+
+def test_snapshot_is_labelled_with_the_session_its_data_reaches(store, monkeypatch):
+    monkeypatch.setattr(helper, 'get_smart_investment_recommendation',
+                        lambda **kwargs: recommendation("2026-10-15"))
+
+    snapshot = run_scan(store=store)
+
+    assert snapshot['session'] == "2026-10-15"
+    assert not is_current(snapshot, now=AFTER_CLOSE)
+
+
+def test_snapshot_with_the_latest_session_is_current(store, monkeypatch):
+    monkeypatch.setattr(helper, 'get_smart_investment_recommendation',
+                        lambda **kwargs: recommendation("2026-10-16"))
+
+    snapshot = run_scan(store=store)
+
+    assert snapshot['session'] == "2026-10-16"
+    assert is_current(store.load_latest(), now=AFTER_CLOSE)
+
+
+def test_scheduled_scan_opts_in_to_scan_lite(store, monkeypatch):
+    calls = []
+    monkeypatch.setattr(helper, 'get_smart_investment_recommendation',
+                        lambda **kwargs: calls.append(kwargs) or recommendation("2026-10-16"))
+
+    run_scan(store=store)
+
+    assert calls[0]['profile'] == 'scan-lite'
+
+
+def histories_until(last_session):
+    index = pd.DatetimeIndex(pd.bdate_range(end=last_session, periods=5), name='Date')
+    data = pd.DataFrame({'Open': 1.0, 'High': 1.0, 'Low': 1.0, 'Close': 1.0, 'Volume': 1.0}, index=index)
+    return lambda tickers, period=None: {ticker: data for ticker in tickers}
+
+
+class StopLoop(BaseException):  # Not caught by the loop's retry handler
+    pass
+
+
+def run_loop(store, monkeypatch, iterations):
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) >= iterations:
+            raise StopLoop
+
+    monkeypatch.setattr(scheduler.time, 'sleep', sleep)
+    with pytest.raises(StopLoop):
+        scheduler.run_forever(["AAA", "BBB", "CCC"], store=store)
+    return sleeps
+
+
+def test_lagging_data_backs_off_without_rescanning(store, monkeypatch):
+    store.save(recommendation("2026-10-15"), "2026-10-15")
+    scans = []
+    monkeypatch.setattr(helper, 'get_smart_investment_recommendation',
+                        lambda **kwargs: scans.append(kwargs) or recommendation("2026-10-15"))
+    monkeypatch.setattr(helper, 'fetch_stock_histories', histories_until("2026-10-15"))
+
+    sleeps = run_loop(store, monkeypatch, iterations=5)
+
+    assert scans == []
+    assert sleeps == [900, 1800, 3600, 7200, 7200]
+
+
+def test_new_bars_trigger_the_rescan(store, monkeypatch):
+    store.save(recommendation("2026-10-15"), "2026-10-15")
+    scans = []
+    monkeypatch.setattr(helper, 'get_smart_investment_recommendation',
+                        lambda **kwargs: scans.append(kwargs) or recommendation("2026-10-16"))
+    monkeypatch.setattr(helper, 'fetch_stock_histories', histories_until("2026-10-16"))
+    monkeypatch.setattr(scheduler, 'next_run_time', lambda now=None: scheduler.market_now())
+
+    run_loop(store, monkeypatch, iterations=1)
+
+    assert len(scans) == 1
+    assert store.load_latest()['session'] == "2026-10-16"
+
+
+def test_old_session_snapshots_are_pruned(tmp_path):
+    store = SnapshotStore(root=str(tmp_path), keep=2)
+    for day in (13, 14, 15, 16):
+        store.save(recommendation(f"2026-10-{day}"), f"2026-10-{day}")
+
+    assert sorted(os.listdir(tmp_path)) == ["latest.json", "recommendation_2026-10-15.json",
+                                            "recommendation_2026-10-16.json"]
@@ -0,0 +1,44 @@
+from datetime import datetime
+
+import pandas as pd
+
+from modules.source_health import SourceHealth, StaleDataError
+
+NOW = datetime(2026, 10, 16, 18, 0)
+FRESH = pd.Timestamp("2026-10-16")
+OLD = pd.Timestamp("2026-06-30")
+
+
+def observe(health, ticker, latest_date):
+    health.record('defeatbeta', ticker, 0.1, error=StaleDataError("old", latest_date=latest_date))
+
+
+def test_one_old_ticker_does_not_mark_the_whole_source_stale():
+    health = SourceHealth(quorum=3)
+    observe(health, "DELISTED", OLD)
+
+    assert health.is_stale('defeatbeta', "DELISTED", now=NOW)
+    assert not health.is_stale('defeatbeta', "AAA", now=NOW)
+    assert health.route(['defeatbeta', 'yfinance'], "AAA") == ['defeatbeta', 'yfinance']
+
+
+def test_source_is_stale_when_the_median_of_a_quorum_lags():
+    health = SourceHealth(quorum=3)
+    observe(health, "AAA", OLD)
+    observe(health, "BBB", OLD)
+    assert not health.is_stale('defeatbeta', "CCC", now=NOW)
+
+    observe(health, "DDD", FRESH)
+    observe(health, "EEE", OLD)
+
+    assert health.is_stale('defeatbeta', "CCC", now=NOW)
+
+
+def test_mostly_fresh_source_stays_routable():
+    health = SourceHealth(quorum=3)
+    for ticker in ("AAA", "BBB", "CCC"):
+        observe(health, ticker, FRESH)
+    observe(health, "DELISTED", OLD)
+
+    assert not health.is_stale('defeatbeta', "DDD", now=NOW)
+    assert health.is_stale('defeatbeta', "DELISTED", now=NOW)
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.helper import engineer_features
+from modules.panel_features import FEATURE_COLUMNS, OHLCV_FIELDS
+from modules.streaming_features import StreamingFeatures
+from modules.synthetic import synthetic_history
+
+
+@pytest.fixture(scope="module")
+def stock_data():
+    return synthetic_history("STREAM", sessions=600, end="2024-12-31")
+
+
+def test_history_replay_matches_engineer_features(stock_data):
+    _, features = StreamingFeatures.from_history(stock_data)
+
+    pd.testing.assert_frame_equal(features, engineer_features(stock_data)[OHLCV_FIELDS + FEATURE_COLUMNS],
+                                  check_dtype=False, check_freq=False, rtol=1e-9, atol=1e-9)
+
+
+def test_one_bar_updates_match_engineer_features(stock_data):
+    expected = engineer_features(stock_data)
+    state = StreamingFeatures.replay(stock_data.iloc[:-5])
+
+    for date, bar in stock_data.iloc[-5:].iterrows():
+        row = state.update(*bar[OHLCV_FIELDS], date=date)
+        assert row.name == date
+        np.testing.assert_allclose(row[FEATURE_COLUMNS].to_numpy(float),
+                                   expected.loc[date, FEATURE_COLUMNS].to_numpy(float),
+                                   rtol=1e-9, atol=1e-9)
+
+
+def test_features_are_nan_until_windows_fill(stock_data):
+    _, features = StreamingFeatures.from_history(stock_data.iloc[:30])
+    expected = engineer_features(stock_data.iloc[:30])
+
+    assert features['MA_200'].isna().all()
+    pd.testing.assert_series_equal(features['MA_20'], expected['MA_20'], check_freq=False,
+                                   check_dtype=False, rtol=1e-9)